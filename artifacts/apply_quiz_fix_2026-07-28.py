@@ -1,48 +1,17 @@
-"""Apply scripts/sql/fix_question_issue_reports_2026-07-28.sql via Supabase REST (service role)."""
+"""Apply scripts/sql/fix_question_issue_reports_2026-07-28.sql via Supabase REST (service role).
+
+Writes go through scripts/supabase_apply_fixes.py (bulk PATCH, concurrent).
+--dry-run prints the diff against the current rows.
+"""
 from __future__ import annotations
 
-import json
-import re
 import sys
-import urllib.error
-import urllib.request
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-env_text = (ROOT / ".env.local").read_text(encoding="utf-8")
-
-
-def env_get(key: str) -> str:
-    m = re.search(rf"^{re.escape(key)}=(.+)$", env_text, re.M)
-    if not m:
-        raise SystemExit(f"missing {key} in .env.local")
-    return m.group(1).strip().strip('"').strip("'")
-
+sys.path.insert(0, str(ROOT / "scripts"))
 
-URL = env_get("VITE_SUPABASE_URL").rstrip("/")
-KEY = env_get("SUPABASE_SERVICE_ROLE_KEY")
-
-
-def patch(table: str, row_id: str, payload: dict) -> None:
-    body = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        f"{URL}/rest/v1/{table}?id=eq.{row_id}",
-        data=body,
-        headers={
-            "apikey": KEY,
-            "Authorization": f"Bearer {KEY}",
-            "Content-Type": "application/json",
-            "Prefer": "return=minimal",
-        },
-        method="PATCH",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            if resp.status not in (200, 204):
-                raise RuntimeError(f"HTTP {resp.status}")
-    except urllib.error.HTTPError as e:
-        detail = e.read().decode(errors="replace")
-        raise RuntimeError(f"PATCH {table} {row_id}: {e.code} {detail}") from e
+from supabase_apply_fixes import Fix, PostgrestClient, apply_fixes, load_env  # noqa: E402
 
 
 def main() -> None:
@@ -147,17 +116,15 @@ def main() -> None:
     ]
     note = "2026-07-28: Fact-checked; see scripts/sql/fix_question_issue_reports_2026-07-28.sql."
 
-    for table, row_id, payload in updates:
-        patch(table, row_id, payload)
-        print("ok", table, row_id)
+    fixes = [Fix(table, row_id, payload) for table, row_id, payload in updates]
+    fixes += [Fix("question_issue_reports", rid, {"status": "resolved", "admin_note": note}) for rid in report_ids]
 
-    for rid in report_ids:
-        patch(
-            "question_issue_reports",
-            rid,
-            {"status": "resolved", "admin_note": note},
-        )
-        print("ok report", rid)
+    db = PostgrestClient(*load_env(ROOT / ".env.local"))
+    result = apply_fixes(db, fixes, dry_run="--dry-run" in sys.argv[1:])
+    print(db.http.metrics_line(), file=sys.stderr)
+    if result["errors"] or result["missing"]:
+        raise RuntimeError(f"{len(result['errors'])} errors, missing rows: {result['missing']}")
+    print(f"ok {result['fixes']} fixes ({result['unchanged']} already applied)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Analyze CPL master CSVs for 中・小分類 distribution by 重要度.
+
+Streams each `_master_<CODE>.csv` row by row, counts per file in parallel,
+merges the counters and writes text + JSON distributions.
+
+    python scripts/analyze_master_tags.py --csv-dir <Master dir> --files AD CM NV RG WX
+    python scripts/analyze_master_tags.py path/to/_master_AD.csv path/to/_master_WX.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CSV_DIR = r"C:\Users\y_kag\Desktop\4ChoiceQuiz\problem\01_CPL\Master2017-2023"
+DEFAULT_CODES = ["AD", "CM", "NV", "RG", "WX"]
+IMPORTANCE_LEVELS = ("S", "A", "B", "C")
+CODE_RE = re.compile(r"_master_([A-Za-z0-9]+)\.csv$")
+
+TagCounts = Tuple[Counter, Counter]
+
+
+def code_for_path(path: Path) -> str:
+    m = CODE_RE.search(path.name)
+    return m.group(1).upper() if m else path.stem
+
+
+def count_file(path: Path) -> Tuple[str, Counter, Counter]:
+    """1ファイルを1行ずつ読み、(tag) と (tag, 重要度) の件数を数える。"""
+    totals: Counter = Counter()
+    by_importance: Counter = Counter()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            tag = (row.get("中・小分類") or "").strip()
+            if not tag:
+                continue
+            totals[tag] += 1
+            imp = (row.get("重要度") or "").strip()
+            if imp in IMPORTANCE_LEVELS:
+                by_importance[(tag, imp)] += 1
+    return code_for_path(path), totals, by_importance
+
+
+def count_files(paths: List[Path], jobs: int) -> Dict[str, TagCounts]:
+    if jobs <= 1 or len(paths) <= 1:
+        results: Iterable[Tuple[str, Counter, Counter]] = map(count_file, paths)
+        return {code: (totals, by_imp) for code, totals, by_imp in results}
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        return {code: (totals, by_imp) for code, totals, by_imp in pool.map(count_file, paths)}
+
+
+def merge_counts(per_file: Dict[str, TagCounts]) -> TagCounts:
+    totals: Counter = Counter()
+    by_importance: Counter = Counter()
+    for file_totals, file_by_imp in per_file.values():
+        totals.update(file_totals)
+        by_importance.update(file_by_imp)
+    return totals, by_importance
+
+
+def distribution(counts: TagCounts) -> List[Dict[str, Any]]:
+    totals, by_importance = counts
+    out: List[Dict[str, Any]] = []
+    # 件数降順、同数はタグ名順で安定させる
+    for tag, count in sorted(totals.items(), key=lambda x: (-x[1], x[0])):
+        entry: Dict[str, Any] = {"tag": tag, "count": count}
+        for imp in IMPORTANCE_LEVELS:
+            entry[imp] = by_importance.get((tag, imp), 0)
+        out.append(entry)
+    return out
+
+
+def format_text(dist: List[Dict[str, Any]]) -> str:
+    return "".join(
+        f"{d['tag']}|{d['count']}|S:{d['S']} A:{d['A']} B:{d['B']} C:{d['C']}\n" for d in dist
+    )
+
+
+def resolve_paths(args: argparse.Namespace) -> List[Path]:
+    if args.paths:
+        return [Path(p) for p in args.paths]
+    csv_dir = Path(args.csv_dir)
+    paths: List[Path] = []
+    for code in args.files:
+        path = csv_dir / f"_master_{code}.csv"
+        if not path.exists():
+            print(f"SKIP: {path.name} not found")
+            continue
+        paths.append(path)
+    return paths
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Master CSV の中・小分類×重要度分布を集計")
+    parser.add_argument("paths", nargs="*", help="集計する CSV（指定時は --csv-dir/--files を無視）")
+    parser.add_argument("--csv-dir", default=DEFAULT_CSV_DIR)
+    parser.add_argument("--files", nargs="*", default=DEFAULT_CODES, help="科目コード（_master_<CODE>.csv）")
+    parser.add_argument("--out-dir", default=str(PROJECT_ROOT / "docs"))
+    parser.add_argument("--json-name", default="tag_distribution.json")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="並列プロセス数（1=逐次）")
+    args = parser.parse_args(argv)
+
+    paths = resolve_paths(args)
+    if not paths:
+        print("ERROR: 集計対象の CSV がありません")
+        return 1
+
+    per_file = count_files(paths, args.jobs)
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    report: Dict[str, Any] = {"files": {}, "merged": []}
+    for code, counts in per_file.items():
+        dist = distribution(counts)
+        report["files"][code] = dist
+        out_path = out_dir / f"{code.lower()}_tag_distribution.txt"
+        out_path.write_text(format_text(dist), encoding="utf-8")
+        print(f"{code}: {sum(counts[0].values())} rows, {len(dist)} tags → {out_path}")
+
+    merged = distribution(merge_counts(per_file))
+    report["merged"] = merged
+    if len(per_file) > 1:
+        merged_path = out_dir / "all_tag_distribution.txt"
+        merged_path.write_text(format_text(merged), encoding="utf-8")
+        print(f"merged: {len(merged)} tags → {merged_path}")
+
+    json_path = out_dir / args.json_name
+    json_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Written to {json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
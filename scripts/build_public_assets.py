@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+public/ の PNG 資産パイプライン（再実行可）。
+1. 透過対象 PNG（既定: F2favicon.png と airplane.png）の白〜薄灰背景をアルファ透過
+   （transparent_public_png と同じ判定）
+2. --icon-source 指定時のみ、1枚のソースから favicon / apple-touch / PWA のサイズ違いを
+   public/icons/ に生成（index.html / manifest.webmanifest はまだ参照していない）
+内容ハッシュをマニフェストに記録し、前回から変わっていない画像は処理しない。
+
+例: python scripts/build_public_assets.py
+    python scripts/build_public_assets.py --dry-run
+    python scripts/build_public_assets.py --icon-source F2favicon.png
+    python scripts/build_public_assets.py --transparent-glob F2favicon.png "images/airport-icon.png" --force
+Pillow 必須: pip install Pillow（NumPy 推奨）
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from PIL import Image
+
+from transparent_public_png import PUBLIC_DIR, apply_transparency
+
+ROOT = PUBLIC_DIR.parent
+DEFAULT_MANIFEST = ROOT / ".asset-pipeline-manifest.json"
+MANIFEST_VERSION = 1
+ICON_DIR = "icons"
+# 出力名 → 一辺 px
+ICON_SIZES: Dict[str, int] = {
+    "favicon-16x16.png": 16,
+    "favicon-32x32.png": 32,
+    "favicon-48x48.png": 48,
+    "apple-touch-icon.png": 180,
+    "icon-192.png": 192,
+    "icon-512.png": 512,
+}
+ICO_NAME = "favicon.ico"
+ICO_SIZES = [(16, 16), (32, 32), (48, 48)]
+# 従来 transparent_public_png.py で手作業透過していた対象
+DEFAULT_TRANSPARENT = ["F2favicon.png", "airplane.png"]
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(path: Path) -> Dict[str, Any]:
+    if path.is_file():
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    return {"version": MANIFEST_VERSION, "files": {}, "icons": {}}
+
+
+def save_manifest(path: Path, manifest: Dict[str, Any]) -> None:
+    path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def rel(path: Path, public: Path) -> str:
+    return path.relative_to(public).as_posix()
+
+
+def find_transparent_targets(public: Path, globs: List[str]) -> List[Path]:
+    seen: Dict[Path, None] = {}
+    for pattern in globs:
+        for path in sorted(public.glob(pattern)):
+            if path.is_file() and path.suffix.lower() == ".png" and ICON_DIR not in path.relative_to(public).parts[:1]:
+                seen[path] = None
+    return list(seen)
+
+
+def key_transparency(path: Path) -> Tuple[Path, str]:
+    """透過処理して保存し、処理後の内容ハッシュを返す（プロセスプールのワーカー）。"""
+    with Image.open(path) as src:
+        img = apply_transparency(src)
+    img.save(path, "PNG", optimize=True)
+    return path, file_hash(path)
+
+
+def square(img: Image.Image) -> Image.Image:
+    """非正方形は透明キャンバス中央に置いて正方形化する。"""
+    w, h = img.size
+    if w == h:
+        return img
+    side = max(w, h)
+    canvas = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    canvas.paste(img, ((side - w) // 2, (side - h) // 2))
+    return canvas
+
+
+def render_icon(source: Path, out_path: Path, size: int) -> Tuple[str, str]:
+    with Image.open(source) as src:
+        img = square(src.convert("RGBA"))
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    img.resize((size, size), Image.LANCZOS).save(out_path, "PNG", optimize=True)
+    return out_path.name, file_hash(out_path)
+
+
+def render_ico(source: Path, out_path: Path) -> Tuple[str, str]:
+    with Image.open(source) as src:
+        img = square(src.convert("RGBA"))
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    img.save(out_path, format="ICO", sizes=ICO_SIZES)
+    return out_path.name, file_hash(out_path)
+
+
+def icons_up_to_date(public: Path, source_hash: str, recorded: Dict[str, Any]) -> bool:
+    if recorded.get("sourceHash") != source_hash:
+        return False
+    outputs = recorded.get("outputs") or {}
+    expected = set(ICON_SIZES) | {ICO_NAME}
+    if set(outputs) != expected:
+        return False
+    icon_dir = public / ICON_DIR
+    return all((icon_dir / name).is_file() and file_hash(icon_dir / name) == h for name, h in outputs.items())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="public/ PNG の透過＋アイコン生成（ハッシュで差分のみ）")
+    parser.add_argument("--public-dir", default=str(PUBLIC_DIR))
+    parser.add_argument("--manifest", default=str(DEFAULT_MANIFEST))
+    parser.add_argument(
+        "--transparent-glob",
+        nargs="*",
+        default=DEFAULT_TRANSPARENT,
+        help="public/ からの glob（既定: F2favicon.png airplane.png。F2.png 等は明示したときだけ）",
+    )
+    parser.add_argument(
+        "--icon-source",
+        default="",
+        help="アイコン生成元（public/ からの相対。既定は生成しない。出力はまだ index.html から未参照）",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="マニフェストを無視して全件処理")
+    parser.add_argument("--dry-run", action="store_true", help="処理予定の表示のみ")
+    args = parser.parse_args()
+
+    public = Path(args.public_dir).resolve()
+    manifest_path = Path(args.manifest)
+    manifest = {"version": MANIFEST_VERSION, "files": {}, "icons": {}} if args.force else load_manifest(manifest_path)
+
+    targets = find_transparent_targets(public, args.transparent_glob)
+    pending: List[Path] = []
+    for path in targets:
+        if manifest["files"].get(rel(path, public)) == file_hash(path):
+            print(f"SKIP (unchanged): {rel(path, public)}")
+        else:
+            pending.append(path)
+
+    source = public / args.icon_source if args.icon_source else None
+    if source is not None and not source.is_file():
+        raise SystemExit(f"見つかりません: {source}")
+
+    if args.dry_run:
+        for path in pending:
+            print(f"[DRY] transparent: {rel(path, public)}")
+        if source is not None:
+            print(f"[DRY] icons from {rel(source, public)} → {ICON_DIR}/ ({', '.join(ICON_SIZES)}, {ICO_NAME})")
+        return 0
+
+    jobs = max(1, args.jobs)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for path, digest in pool.map(key_transparency, pending):
+            manifest["files"][rel(path, public)] = digest
+            print(f"OK: {rel(path, public)}")
+
+        if source is not None:
+            # 透過処理後のソース内容でキャッシュ判定する
+            source_hash = file_hash(source)
+            if icons_up_to_date(public, source_hash, manifest.get("icons") or {}):
+                print(f"SKIP (unchanged): icons from {rel(source, public)}")
+            else:
+                icon_dir = public / ICON_DIR
+                futures = [pool.submit(render_icon, source, icon_dir / name, size) for name, size in ICON_SIZES.items()]
+                futures.append(pool.submit(render_ico, source, icon_dir / ICO_NAME))
+                outputs = dict(f.result() for f in futures)
+                manifest["icons"] = {
+                    "source": rel(source, public),
+                    "sourceHash": source_hash,
+                    "outputs": dict(sorted(outputs.items())),
+                }
+                print(f"OK: {len(outputs)} icons → {rel(icon_dir, public)}/")
+
+    save_manifest(manifest_path, manifest)
+    print(f"manifest: {manifest_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in cProfile capture shared by the ingestion / telemetry CLIs.
+
+A CLI adds the option to its parser and runs main through run_profiled:
+
+    add_profile_argument(parser)                 # --profile PREFIX (shows in --help)
+    raise SystemExit(run_profiled(main))
+
+With --profile PREFIX the whole main() runs under cProfile and writes
+PREFIX.pstats (snakeviz / `python -m pstats`) and PREFIX.collapsed
+(`frame;frame;frame microseconds` lines for flamegraph.pl, speedscope or
+inferno). Without it main() is called directly: no profiler, no wrapper.
+
+cProfile keeps caller -> callee edges, not full stacks, so collapsed
+stacks are rebuilt from the call graph: each callee's time is split across
+call paths in proportion to the caller's time on that path. Recursive calls
+are folded into the first frame of the cycle.
+
+    python scripts/cli_profile.py PREFIX.pstats > PREFIX.collapsed
+    python scripts/cli_profile.py --self-test
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import io
+import pstats
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable
+
+MAX_DEPTH = 96
+# pstats key: (filename, lineno, funcname)
+Func = tuple[str, int, str]
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        metavar="PREFIX",
+        help="run under cProfile; write PREFIX.pstats and PREFIX.collapsed (flamegraph input)",
+    )
+
+
+def _profile_prefix(argv: list[str]) -> str | None:
+    pre = argparse.ArgumentParser(add_help=False)
+    pre.add_argument("--profile")
+    known, _rest = pre.parse_known_args(argv)
+    return known.profile
+
+
+def run_profiled(main: Callable[[], Any], argv: list[str] | None = None) -> Any:
+    """Call main(), under cProfile when --profile PREFIX is on the command line."""
+    prefix = _profile_prefix(sys.argv[1:] if argv is None else argv)
+    if not prefix:
+        return main()
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(main)
+    finally:
+        pstats_path, collapsed_path = write_profile(profiler, Path(prefix))
+        print(f"profile: {pstats_path} {collapsed_path}", file=sys.stderr)
+
+
+def write_profile(profiler: cProfile.Profile, prefix: Path) -> tuple[Path, Path]:
+    prefix.parent.mkdir(parents=True, exist_ok=True)
+    pstats_path = prefix.with_name(prefix.name + ".pstats")
+    collapsed_path = prefix.with_name(prefix.name + ".collapsed")
+    profiler.dump_stats(str(pstats_path))
+    lines = collapsed_stacks(pstats.Stats(profiler).stats)  # type: ignore[attr-defined]
+    collapsed_path.write_text("".join(f"{stack} {us}\n" for stack, us in lines), encoding="utf-8")
+    return pstats_path, collapsed_path
+
+
+def _label(func: Func) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name.replace(";", ":")  # built-ins: "<built-in method time.sleep>"
+    return f"{Path(filename).name}:{lineno}({name})".replace(";", ":")
+
+
+def collapsed_stacks(stats: dict[Func, tuple[Any, ...]]) -> list[tuple[str, int]]:
+    """pstats.Stats.stats -> sorted (stack, self microseconds) pairs."""
+    callees: dict[Func, dict[Func, tuple[float, float]]] = defaultdict(dict)
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = (edge[2], edge[3])  # (tt, ct) of this caller -> func edge
+    roots = [f for f, row in stats.items() if not row[4]]
+    out: dict[str, float] = defaultdict(float)
+
+    def walk(func: Func, path: list[str], on_path: set[Func], tt: float, ct: float, depth: int) -> None:
+        total_ct = stats[func][3]
+        scale = ct / total_ct if total_ct > 0 else 0.0
+        stack = path + [_label(func)]
+        if tt > 0:
+            out[";".join(stack)] += tt
+        if depth >= MAX_DEPTH or scale <= 0:
+            return
+        on_path.add(func)
+        for callee, (edge_tt, edge_ct) in callees.get(func, {}).items():
+            if callee in on_path:
+                out[";".join(stack)] += edge_ct * scale
+                continue
+            walk(callee, stack, on_path, edge_tt * scale, edge_ct * scale, depth + 1)
+        on_path.discard(func)
+
+    for root in roots:
+        _cc, _nc, tt, ct, _callers = stats[root]
+        walk(root, [], set(), tt, ct, 0)
+    return sorted((stack, round(sec * 1e6)) for stack, sec in out.items() if round(sec * 1e6) > 0)
+
+
+def self_test() -> None:
+    import time
+
+    def leaf(n: int) -> int:
+        end = time.perf_counter() + n / 1000
+        x = 0
+        while time.perf_counter() < end:
+            x += 1
+        return x
+
+    def left() -> None:
+        leaf(20)
+
+    def right() -> None:
+        leaf(10)
+        left()
+
+    def main() -> int:
+        left()
+        right()
+        return 7
+
+    assert run_profiled(main, argv=["--other", "x"]) == 7
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = Path(tmp) / "nested" / "run"
+        argv = ["--profile", str(prefix), "--other", "x"]
+        with contextlib.redirect_stderr(io.StringIO()):
+            assert run_profiled(main, argv=argv) == 7
+        stats = pstats.Stats(str(prefix.with_name("run.pstats")))
+        assert any(name == "leaf" for (_f, _l, name) in stats.stats)  # type: ignore[attr-defined]
+        lines = prefix.with_name("run.collapsed").read_text(encoding="utf-8").splitlines()
+    weights: dict[str, int] = defaultdict(int)
+    for line in lines:
+        stack, us = line.rsplit(" ", 1)
+        frames = [f.split("(")[-1].rstrip(")") for f in stack.split(";")]
+        if "leaf" in frames:
+            key = "/".join(f for f in frames if f in {"main", "left", "right", "leaf"})
+            weights[key] += int(us)
+    # leaf time is split by path: main/left 20ms, main/right 10ms, main/right/left 20ms
+    total = sum(weights.values())
+    assert total > 40_000, weights
+    assert 0.25 < weights["main/left/leaf"] / total < 0.55, weights
+    assert weights["main/right/leaf"] > 0 and weights["main/right/left/leaf"] > 0, weights
+    print("self-test ok")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Collapse a cProfile .pstats file into flamegraph stacks")
+    parser.add_argument("pstats", nargs="?", type=Path)
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args()
+    if args.self_test:
+        self_test()
+        return 0
+    if not args.pstats:
+        parser.error("pstats path required")
+    for stack, us in collapsed_stacks(pstats.Stats(str(args.pstats)).stats):  # type: ignore[attr-defined]
+        sys.stdout.write(f"{stack} {us}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the CPL ingestion hot paths.
+
+Corpora come from the repository: cpl_exam_data/converted_md/*.md and the
+MLIT 2024-08 sample blocks in real_exam_data_insert.sql (reassembled into
+the "## 科目 / 例題N" sample layout, plus the 2026-06 webfetch text when
+present). --scale N adds synthetic copies: text corpora are repeated N
+times and question records get N variants each (every other variant an
+exact duplicate, so dedupe has work to do).
+
+Each benchmark reports best-of --repeat wall time, questions/s (or items/s)
+and the tracemalloc peak of one extra run. --save writes the results as a
+JSON baseline; --baseline compares against one and exits 1 when any
+benchmark is slower than --threshold (default 1.25x).
+
+    python scripts/cpl_exam/bench_ingestion.py --scale 1 --scale 10
+    python scripts/cpl_exam/bench_ingestion.py --save data/bench_baseline.json
+    python scripts/cpl_exam/bench_ingestion.py --baseline data/bench_baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parents[1]
+sys.path.insert(0, str(HERE))
+from convert_new_pdfs_to_unified import classify_subject, extract_questions_from_text  # noqa: E402
+from import_cpl_master_csv import dedup_in_memory, record_to_sql, row_to_record  # noqa: E402
+from import_mlit_sample_to_unified import (  # noqa: E402
+    is_soft_duplicate,
+    normalize_text,
+    parse_one_question,
+    parse_sample_text,
+    text_hash,
+)
+
+CONVERTED_MD = ROOT / "cpl_exam_data" / "converted_md"
+SAMPLE_SQL = HERE / "real_exam_data_insert.sql"
+SAMPLE_2026 = HERE / "data" / "001761087_202606_webfetch.txt"
+DEFAULT_BASELINE = HERE / "data" / "bench_baseline.json"
+SAMPLE_BLOCK_RE = re.compile(r"\(2024,\s*8,\s*\d+,\s*'([^']*)'.*?'202408_CPLTest\.pdf',\s*'(例題.*?)'\s*,\s*'", re.S)
+SUBJECT_CODES = {"航空工学": "AD", "航空通信": "CM", "空中航法": "NV", "航空法規": "RG", "航空気象": "WX"}
+
+
+@dataclass
+class Corpus:
+    markdown: list[str]
+    sample_text: str
+    sample_blocks: list[tuple[str, int, str]]  # (subject, question_no, content after 例題N)
+    csv_rows: list[tuple[dict[str, str], str]]  # (master CSV row, subject code)
+
+
+def _sample_blocks() -> list[tuple[str, int, str]]:
+    blocks: list[tuple[str, int, str]] = []
+    if SAMPLE_SQL.is_file():
+        for subject, md in SAMPLE_BLOCK_RE.findall(SAMPLE_SQL.read_text(encoding="utf-8")):
+            body = re.match(r"例題\s*([0-9０-９]+)\s*\n?(.*)", md.replace("''", "'"), re.S)
+            if body:
+                no = int(body.group(1).translate(str.maketrans("０１２３４５６７８９", "0123456789")))
+                blocks.append((subject, no, body.group(2)))
+    return blocks
+
+
+def load_corpus(scale: int) -> Corpus:
+    markdown = [p.read_text(encoding="utf-8") for p in sorted(CONVERTED_MD.glob("*.md"))]
+    blocks = _sample_blocks()
+    by_subject: dict[str, list[str]] = {}
+    for subject, no, content in blocks:
+        by_subject.setdefault(subject, []).append(f"例題{no}\n{content}")
+    sample_text = "".join(f"## {subject}\n" + "\n".join(items) + "\n" for subject, items in by_subject.items())
+    if SAMPLE_2026.is_file():
+        sample_text += SAMPLE_2026.read_text(encoding="utf-8")
+
+    csv_rows: list[tuple[dict[str, str], str]] = []
+    for subject, no, content in blocks:
+        q = parse_one_question(content, no, subject, 2024, 8, "202408_CPLTest.pdf")
+        if not q:
+            continue
+        for copy in range(scale):
+            suffix = "" if copy % 2 == 0 else f"（版{copy}）"
+            row = {
+                "No": f"202408_{SUBJECT_CODES.get(subject, 'AD')}_{no:03d}",
+                "問題文": q["question_text"] + suffix,
+                **{f"選択肢{i}": opt for i, opt in enumerate(q["options"], 1)},
+                "正解No": str(q["correct_answer"]),
+                "解説": "",
+                "中・小分類": "CBT例題/未分類",
+                "重要語句": "",
+                "重要度": "B",
+                "タイプ": "知識",
+            }
+            csv_rows.append((row, SUBJECT_CODES.get(subject, "AD")))
+
+    return Corpus(
+        markdown=markdown * scale,
+        sample_text=sample_text * scale,
+        sample_blocks=blocks * scale,
+        csv_rows=csv_rows,
+    )
+
+
+def _quiet(fn: Callable[[], Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+
+    return run
+
+
+def benchmarks(corpus: Corpus) -> dict[str, tuple[Callable[[], Any], int]]:
+    """name -> (callable, items processed per call)."""
+    extracted = [q for text in corpus.markdown for q in _quiet(lambda t=text: extract_questions_from_text(t))()]
+    stems = [content for _subject, _no, content in corpus.sample_blocks]
+    records = [r for row, code in corpus.csv_rows if (r := row_to_record(row, code, "_master.csv"))]
+    prefixes = [normalize_text(s)[:60] for s in stems[: len(stems) // 2]]
+    sample_count = len(_quiet(lambda: parse_sample_text(corpus.sample_text, 2024, 8, "bench"))())
+
+    def extract() -> None:
+        for text in corpus.markdown:
+            extract_questions_from_text(text)
+
+    def parse_one() -> None:
+        for subject, no, content in corpus.sample_blocks:
+            parse_one_question(content, no, subject, 2024, 8, "bench")
+
+    return {
+        "extract_questions_from_text": (_quiet(extract), len(extracted)),
+        "parse_sample_text": (lambda: parse_sample_text(corpus.sample_text, 2024, 8, "bench"), sample_count),
+        "parse_one_question": (parse_one, len(corpus.sample_blocks)),
+        "classify_subject": (lambda: [classify_subject(q["content"]) for q in extracted], len(extracted)),
+        "normalize_text": (lambda: [normalize_text(s) for s in stems], len(stems)),
+        "text_hash": (lambda: [text_hash(s) for s in stems], len(stems)),
+        "dedup_in_memory": (lambda: dedup_in_memory(records), len(records)),
+        "is_soft_duplicate": (lambda: [is_soft_duplicate(s, prefixes) for s in stems], len(stems)),
+        "record_to_sql": (lambda: [record_to_sql(r) for r in records], len(records)),
+    }
+
+
+def measure(fn: Callable[[], Any], items: int, repeat: int) -> dict[str, Any]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "items": items,
+        "seconds": round(best, 6),
+        "items_per_sec": round(items / best, 1) if best > 0 else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(scales: list[int], repeat: int, only: set[str] | None = None) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for scale in scales:
+        corpus = load_corpus(scale)
+        for name, (fn, items) in benchmarks(corpus).items():
+            if only and name not in only:
+                continue
+            results[f"{name}@x{scale}"] = measure(fn, items, repeat)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Lines describing each benchmark vs baseline; regressions are prefixed with 'SLOWER'."""
+    lines: list[str] = []
+    for key, result in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if not base or not base.get("seconds"):
+            lines.append(f"  new     {key}")
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        tag = "SLOWER " if ratio > threshold else "ok     "
+        lines.append(f"  {tag}{key}: {ratio:.2f}x time, peak {result['peak_kib']:.0f} KiB (was {base['peak_kib']:.0f})")
+    return lines
+
+
+def format_results(report: dict[str, Any]) -> str:
+    lines = [f"python {report['python']} ({report['platform']}), best of {report['repeat']}"]
+    for key, r in report["results"].items():
+        lines.append(
+            f"  {key:<36} {r['items']:>7} items {r['seconds'] * 1000:>9.2f} ms "
+            f"{r['items_per_sec'] or 0:>12,.0f}/s  peak {r['peak_kib']:>9.1f} KiB"
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CPL ingestion hot paths over repository corpora")
+    parser.add_argument("--scale", type=int, action="append", help="synthetic copies of the corpora (repeatable; default 1)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", help="benchmark name (repeatable)")
+    parser.add_argument("--save", type=Path, nargs="?", const=DEFAULT_BASELINE, help="write results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, nargs="?", const=DEFAULT_BASELINE, help="compare with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="time ratio counted as a regression")
+    args = parser.parse_args()
+
+    report = run(args.scale or [1], max(1, args.repeat), set(args.only) if args.only else None)
+    print(format_results(report))
+    status = 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        lines = compare(report, baseline, args.threshold)
+        print(f"vs {args.baseline}:")
+        print("\n".join(lines))
+        status = 1 if any(line.lstrip().startswith("SLOWER") for line in lines) else 0
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline -> {args.save}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -17,6 +17,11 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from stage_profile import StageProfiler, write_profile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from cli_profile import add_profile_argument, run_profiled  # noqa: E402
+
 try:
     from markitdown import MarkItDown
 except ImportError:
@@ -34,6 +39,7 @@ class ConversionResult:
     error_message: Optional[str] = None
     conversion_time: Optional[float] = None
     created_at: str = None
+    stages: Optional[Dict[str, Dict]] = None  # ステージ別の秒数・件数（・メモリピーク）
     
     def __post_init__(self):
         if self.created_at is None:
@@ -57,12 +63,14 @@ class QualityReport:
 class CPLExamConverter:
     """CPL試験PDF変換メインクラス"""
     
-    def __init__(self, input_dir: str, output_dir: str, force_overwrite: bool = False):
+    def __init__(self, input_dir: str, output_dir: str, force_overwrite: bool = False, trace_memory: bool = False):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.force_overwrite = force_overwrite
         self.md_converter = MarkItDown()
         self.conversion_log = []
+        self.trace_memory = trace_memory
+        self.stage_totals = StageProfiler()
         
         # 出力ディレクトリの作成
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -78,6 +86,7 @@ class CPLExamConverter:
     def convert_single_pdf(self, pdf_path: Path) -> ConversionResult:
         """単一PDFファイルをMarkdownに変換"""
         start_time = datetime.now()
+        profiler = StageProfiler(trace_memory=self.trace_memory)
         
         try:
             # 出力ファイルパスの決定
@@ -99,16 +108,20 @@ class CPLExamConverter:
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
             # PDF読み込み・変換
-            with open(pdf_path, 'rb') as f:
-                result = self.md_converter.convert(f)
-                markdown_content = result.text_content
+            with profiler.stage("extraction", items=1):
+                with open(pdf_path, 'rb') as f:
+                    result = self.md_converter.convert(f)
+                    markdown_content = result.text_content
             
             # 変換されたMarkdownの前処理
-            processed_content = self.preprocess_markdown(markdown_content, pdf_path)
+            with profiler.stage("parsing", items=1):
+                processed_content = self.preprocess_markdown(markdown_content, pdf_path)
             
             # ファイル保存
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(processed_content)
+            with profiler.stage("io", items=1):
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(processed_content)
+                checksum = self.calculate_file_checksum(pdf_path)
             
             # 変換時間計算
             conversion_time = (datetime.now() - start_time).total_seconds()
@@ -117,9 +130,10 @@ class CPLExamConverter:
                 source_file=str(pdf_path),
                 output_file=str(output_path),
                 file_size=pdf_path.stat().st_size,
-                checksum=self.calculate_file_checksum(pdf_path),
+                checksum=checksum,
                 status='success',
-                conversion_time=conversion_time
+                conversion_time=conversion_time,
+                stages=profiler.snapshot()
             )
             
         except Exception as e:
@@ -129,8 +143,12 @@ class CPLExamConverter:
                 file_size=pdf_path.stat().st_size if pdf_path.exists() else 0,
                 checksum='',
                 status='error',
-                error_message=str(e)
+                error_message=str(e),
+                stages=profiler.snapshot()
             )
+        finally:
+            profiler.close()
+            self.stage_totals.merge(profiler)
     
     def preprocess_markdown(self, content: str, source_path: Path) -> str:
         """Markdownコンテンツの前処理・構造化"""
@@ -277,6 +295,17 @@ converted_at: "{datetime.now().isoformat()}"
             json.dump(log_data, f, indent=2, ensure_ascii=False)
         
         print(f"Conversion log saved to: {log_path}")
+        
+        # ステージ別プロファイル（変換ログと同じ場所）
+        profile_path = log_path.with_name(f"{log_path.stem}_stages.json")
+        write_profile(
+            profile_path,
+            self.stage_totals.snapshot(),
+            {r.source_file: r.stages for r in self.conversion_log if r.stages},
+            pipeline="convert_cpl_exam",
+            trace_memory=self.trace_memory,
+        )
+        print(f"Stage profile saved to: {profile_path}")
 
 def main():
     parser = argparse.ArgumentParser(description='Convert CPL exam PDFs to Markdown')
@@ -284,6 +313,8 @@ def main():
     parser.add_argument('--output', '-o', required=True, help='Output directory for Markdown files')
     parser.add_argument('--force', '-f', action='store_true', help='Overwrite existing files')
     parser.add_argument('--log', '-l', help='Path to save conversion log (default: output_dir/conversion_log.json)')
+    parser.add_argument('--trace-memory', action='store_true', help='Record tracemalloc peaks in the per-stage profile')
+    add_profile_argument(parser)
     
     args = parser.parse_args()
     
@@ -297,7 +328,8 @@ def main():
     converter = CPLExamConverter(
         input_dir=args.input,
         output_dir=args.output,
-        force_overwrite=args.force
+        force_overwrite=args.force,
+        trace_memory=args.trace_memory
     )
     
     print("Starting CPL exam PDF conversion...")
@@ -331,4 +363,4 @@ def main():
                 print(f"  {result.source_file}: {result.error_message}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run_profiled(main)
\ No newline at end of file
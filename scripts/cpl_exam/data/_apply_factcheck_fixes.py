@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
-"""Fact-check fixes for mlit_sample rows."""
+"""Fact-check fixes for mlit_sample rows.
+
+Row updates go through scripts/supabase_apply_fixes.py (one bulk read, grouped
+concurrent writes); --dry-run prints the diff and skips every write.
+"""
 from __future__ import annotations
 
 import json
 import os
 import re
+import sys
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -12,11 +17,18 @@ from supabase import create_client
 
 ROOT = Path(__file__).resolve().parents[3]
 DATA = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(DATA.parent))
+from mcp_dump import read_rows  # noqa: E402
+from supabase_apply_fixes import Fix, PostgrestClient, apply_fixes, fetch_current  # noqa: E402
+
+DRY_RUN = "--dry-run" in sys.argv[1:]
 load_dotenv(ROOT / ".env.local")
 client = create_client(
     os.environ["VITE_SUPABASE_URL"],
     os.environ["SUPABASE_SERVICE_ROLE_KEY"],
 )
+rest = PostgrestClient(os.environ["VITE_SUPABASE_URL"].rstrip("/"), os.environ["SUPABASE_SERVICE_ROLE_KEY"])
 
 PAGE_RE = re.compile(r"\s*=== Page \d+ ===\s*")
 
@@ -27,7 +39,7 @@ def clean(s: str) -> str:
     return s.strip()
 
 
-dump = json.loads((DATA / "db_mlit_sample_dump.json").read_text(encoding="utf-8"))
+dump = list(read_rows(DATA / "db_mlit_sample_dump.jsonl"))
 
 # 1) Strip page markers
 page_ids = []
@@ -38,33 +50,29 @@ for row in dump:
     if "=== Page" in row["question_text"] or any("=== Page" in str(o) for o in opts):
         page_ids.append(row["id"])
 
-fixed_page = []
-for pid in page_ids:
-    row = (
-        client.table("unified_cpl_questions")
-        .select("id,question_text,options")
-        .eq("id", pid)
-        .single()
-        .execute()
-        .data
-    )
-    if not row:
-        continue
-    client.table("unified_cpl_questions").update(
+current = fetch_current(rest, [Fix("unified_cpl_questions", pid, {}) for pid in page_ids])
+fixed_page = [pid for pid in page_ids if ("unified_cpl_questions", pid) in current]
+fixes = [
+    Fix(
+        "unified_cpl_questions",
+        pid,
         {
-            "question_text": clean(row["question_text"]),
-            "options": [clean(o) for o in row["options"]],
-        }
-    ).eq("id", pid).execute()
-    fixed_page.append(pid)
+            "question_text": clean(current[("unified_cpl_questions", pid)]["question_text"]),
+            "options": [clean(o) for o in current[("unified_cpl_questions", pid)]["options"]],
+        },
+    )
+    for pid in fixed_page
+]
 
 # 2) Fix wrong main_subject
 subject_fixes = {
     "44866897-24a8-4ac0-9a8b-c89797a4609d": "航空法規",  # 救急用具
     "6f3aa923-674e-46cb-b60b-8525799e8264": "航空法規",  # 飛行場灯火
 }
-for oid, subj in subject_fixes.items():
-    client.table("unified_cpl_questions").update({"main_subject": subj}).eq("id", oid).execute()
+fixes += [Fix("unified_cpl_questions", oid, {"main_subject": subj}) for oid, subj in subject_fixes.items()]
+apply_result = apply_fixes(rest, fixes, dry_run=DRY_RUN)
+if DRY_RUN:
+    raise SystemExit(0)
 
 # 3) Delete 2024 duplicate of 見張り義務 (keep 2026)
 dup_delete = ["ac2a2a97-f6d6-4e26-ab67-0a184023f404"]
@@ -104,21 +112,12 @@ for i in range(0, len(remaining_ids), 50):
     verified += sum(1 for g in got if g["verification_status"] == "verified")
 
 # ensure no page markers remain
-still_page = []
-for pid in fixed_page:
-    row = (
-        client.table("unified_cpl_questions")
-        .select("question_text,options")
-        .eq("id", pid)
-        .single()
-        .execute()
-        .data
-    )
-    if row and (
-        "=== Page" in row["question_text"]
-        or any("=== Page" in str(o) for o in row["options"])
-    ):
-        still_page.append(pid)
+after = fetch_current(rest, [Fix("unified_cpl_questions", pid, {}) for pid in fixed_page])
+still_page = [
+    pid
+    for (_table, pid), row in after.items()
+    if "=== Page" in row["question_text"] or any("=== Page" in str(o) for o in row["options"])
+]
 
 report = {
     "fixed_page_marker_ids": fixed_page,
@@ -129,6 +128,7 @@ report = {
     "alive": alive,
     "verified": verified,
     "still_has_page_marker": still_page,
+    "apply_errors": apply_result["errors"],
 }
 (DATA / "factcheck_fix_report.json").write_text(
     json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
@@ -1,65 +1,174 @@
 # -*- coding: utf-8 -*-
-"""Apply filtered MLIT sample questions via Supabase service role."""
+"""Apply filtered MLIT sample questions via Supabase service role.
+
+Rows are inserted in chunks (one PostgREST request = one transaction) by a
+bounded pool of writers. A chunk's text hashes are written to the checkpoint
+file (atomic replace) as in flight before its POST and moved to applied after
+it succeeds. The POST is never resent: a failed or interrupted chunk stays in
+flight, and the next run looks its rows up by question_text before queueing
+them again, so a commit whose response was lost is not inserted twice.
+
+usage: python _apply_via_supabase.py [--chunk 25] [--workers 4] [--reset]
+"""
 from __future__ import annotations
 
+import argparse
 import json
+import os
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from dotenv import load_dotenv
-import os
-
 ROOT = Path(__file__).resolve().parents[3]
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-from import_mlit_sample_to_unified import to_source_documents  # noqa: E402
+DATA = Path(__file__).resolve().parent
+sys.path.insert(0, str(DATA.parent))
+sys.path.insert(0, str(ROOT / "scripts"))
+from import_mlit_sample_to_unified import text_hash, to_source_documents  # noqa: E402
+from supabase_apply_fixes import PostgrestClient, load_env  # noqa: E402
 
-load_dotenv(ROOT / ".env.local")
-url = os.getenv("VITE_SUPABASE_URL") or os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-if not url or not key:
-    raise SystemExit("Missing VITE_SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in .env.local")
+TABLE = "unified_cpl_questions"
+INPUTS = ("mlit_sample_insert_202606.json", "mlit_sample_insert_202408.json")
+CHECKPOINT = DATA / "apply_checkpoint.json"
 
-from supabase import create_client
 
-client = create_client(url, key)
-DATA = Path(__file__).resolve().parent
+def to_row(q: dict) -> dict:
+    return {
+        "main_subject": q["main_subject"],
+        "sub_subject": q["sub_subject"],
+        "question_text": q["question_text"],
+        "options": q["options"],
+        "correct_answer": q["correct_answer"],
+        "explanation": None,
+        "source_documents": to_source_documents(q),
+        "difficulty_level": 3,
+        "importance_score": 6.0,
+        "appearance_frequency": 1,
+        "verification_status": "pending" if q.get("has_figure") else "verified",
+        "tags": [
+            "CPL",
+            "例題集",
+            f"{q['year']}年{q['month']}月",
+            q["main_subject"],
+            "mlit_sample",
+        ]
+        + (["要図"] if q.get("has_figure") else []),
+        "exam_type": "CPL",
+        "applicable_exams": ["CPL"],
+    }
+
+
+class Checkpoint:
+    """Text hashes inserted (applied) or sent without a confirmed outcome (inflight)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.applied: set[str] = set()
+        self.inflight: set[str] = set()
+        if path.is_file():
+            saved = json.loads(path.read_text(encoding="utf-8"))
+            self.applied = set(saved.get("applied") or [])
+            self.inflight = set(saved.get("inflight") or []) - self.applied
+
+    def begin(self, hashes: list[str]) -> None:
+        with self.lock:
+            self.inflight.update(hashes)
+            self._save()
+
+    def record(self, hashes: list[str]) -> None:
+        with self.lock:
+            self.applied.update(hashes)
+            self.inflight.difference_update(hashes)
+            self._save()
 
-inserted = 0
-errors = []
-for name in ("mlit_sample_insert_202606.json", "mlit_sample_insert_202408.json"):
-    qs = json.loads((DATA / name).read_text(encoding="utf-8"))
-    for q in qs:
-        row = {
-            "main_subject": q["main_subject"],
-            "sub_subject": q["sub_subject"],
-            "question_text": q["question_text"],
-            "options": q["options"],
-            "correct_answer": q["correct_answer"],
-            "explanation": None,
-            "source_documents": to_source_documents(q),
-            "difficulty_level": 3,
-            "importance_score": 6.0,
-            "appearance_frequency": 1,
-            "verification_status": "pending" if q.get("has_figure") else "verified",
-            "tags": [
-                "CPL",
-                "例題集",
-                f"{q['year']}年{q['month']}月",
-                q["main_subject"],
-                "mlit_sample",
-            ]
-            + (["要図"] if q.get("has_figure") else []),
-            "exam_type": "CPL",
-            "applicable_exams": ["CPL"],
-        }
+    def settle(self, found: list[str], absent: list[str]) -> None:
+        """Resolve in-flight hashes after looking them up in the table."""
+        with self.lock:
+            self.applied.update(found)
+            self.inflight.difference_update(found)
+            self.inflight.difference_update(absent)
+            self._save()
+
+    def _save(self) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            payload = {"applied": sorted(self.applied), "inflight": sorted(self.inflight)}
+            json.dump(payload, handle, ensure_ascii=False, indent=0)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, self.path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Insert MLIT sample questions (chunked, resumable)")
+    parser.add_argument("--chunk", type=int, default=25, help="rows per insert request")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent insert requests")
+    parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT)
+    parser.add_argument("--reset", action="store_true", help="ignore and overwrite the checkpoint")
+    args = parser.parse_args()
+
+    if args.reset and args.checkpoint.exists():
+        args.checkpoint.unlink()
+    checkpoint = Checkpoint(args.checkpoint)
+
+    candidates: list[tuple[str, dict]] = []
+    seen: set[str] = set()
+    for name in INPUTS:
+        for q in json.loads((DATA / name).read_text(encoding="utf-8")):
+            h = q.get("text_hash") or text_hash(q["question_text"])
+            if h in checkpoint.applied or h in seen:
+                continue
+            seen.add(h)
+            candidates.append((h, q))
+
+    db = PostgrestClient(*load_env(ROOT / ".env.local"))
+    uncertain = [(h, q) for h, q in candidates if h in checkpoint.inflight]
+    if uncertain:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            present = list(pool.map(lambda item: db.exists(TABLE, "question_text", item[1]["question_text"]), uncertain))
+        checkpoint.settle(
+            [h for (h, _q), hit in zip(uncertain, present) if hit],
+            [h for (h, _q), hit in zip(uncertain, present) if not hit],
+        )
+    pending = [(h, q) for h, q in candidates if h not in checkpoint.applied]
+    resumed = len(checkpoint.applied)
+    chunks = [pending[i : i + args.chunk] for i in range(0, len(pending), max(1, args.chunk))]
+
+    errors: list[dict] = []
+    errors_lock = threading.Lock()
+
+    def apply_chunk(chunk: list[tuple[str, dict]]) -> int:
+        checkpoint.begin([h for h, _q in chunk])
         try:
-            client.table("unified_cpl_questions").insert(row).execute()
-            inserted += 1
-        except Exception as e:
-            errors.append({"q": q["question_text"][:60], "err": str(e)})
-
-print(json.dumps({"inserted": inserted, "errors": len(errors), "error_samples": errors[:5]}, ensure_ascii=False))
-(DATA / "apply_result.json").write_text(
-    json.dumps({"inserted": inserted, "errors": errors}, ensure_ascii=False, indent=2),
-    encoding="utf-8",
-)
+            db.insert(TABLE, [to_row(q) for _h, q in chunk])
+        except (RuntimeError, OSError) as e:
+            with errors_lock:
+                errors.append({"q": chunk[0][1]["question_text"][:60], "rows": len(chunk), "err": str(e)})
+            return 0
+        checkpoint.record([h for h, _q in chunk])
+        return len(chunk)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        inserted = sum(pool.map(apply_chunk, chunks))
+
+    summary = {
+        "inserted": inserted,
+        "already_applied": resumed,
+        "rechecked": len(uncertain),
+        "chunks": len(chunks),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+    }
+    print(json.dumps(summary, ensure_ascii=False))
+    print(db.http.metrics_line(), file=sys.stderr)
+    (DATA / "apply_result.json").write_text(
+        json.dumps({"inserted": inserted, "already_applied": resumed, "errors": errors}, ensure_ascii=False, indent=2),
+        encoding="utf-8",
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
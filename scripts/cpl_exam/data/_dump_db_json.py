@@ -1,21 +1,18 @@
 # -*- coding: utf-8 -*-
-import json
-import re
+"""Extract the mlit_sample rows from an MCP execute_sql dump as JSON Lines.
+
+usage: python _dump_db_json.py <agent-tools.txt> [out.jsonl]
+"""
+import sys
 from pathlib import Path
 
-raw = Path(
-    r"C:\Users\yusuke\.cursor\projects\c-Users-yusuke-Desktop-project-FlightAcademyTsx\agent-tools\60d8036d-887f-4057-992b-2682512f915c.txt"
-).read_text(encoding="utf-8")
-env = json.loads(raw)
-text = env["result"]
-m = re.search(
-    r"<untrusted-data-[0-9a-f-]+>\s*\n(\[.*?\])\s*\n</untrusted-data-",
-    text,
-    re.S,
-)
-rows = json.loads(m.group(1))
-out = Path(
-    r"c:\Users\yusuke\Desktop\project\FlightAcademyTsx\scripts\cpl_exam\data\db_mlit_sample_dump.json"
-)
-out.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
-print(len(rows), out)
+DATA = Path(__file__).resolve().parent
+sys.path.insert(0, str(DATA.parent))
+from mcp_dump import iter_dump_rows, write_jsonl  # noqa: E402
+
+if len(sys.argv) < 2:
+    raise SystemExit(__doc__)
+dump = Path(sys.argv[1])
+out = Path(sys.argv[2]) if len(sys.argv) > 2 else DATA / "db_mlit_sample_dump.jsonl"
+count = write_jsonl(iter_dump_rows(dump), out)
+print(count, out)
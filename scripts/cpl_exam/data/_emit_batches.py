@@ -1,40 +1,174 @@
 # -*- coding: utf-8 -*-
-"""Emit batched SQL files for MCP apply (10 inserts each)."""
+"""Emit batched SQL files for MCP apply, packed up to a byte / row budget.
+
+Batches are filled greedily in question order until the next INSERT would
+exceed --max-bytes or --max-rows. Only batch files whose content changed
+are rewritten; stale batch files are removed. manifest.json records each
+batch's sha256 and the text hashes of its rows. --mark-applied adds a
+batch's rows to applied_rows, and later runs leave those rows out before
+packing: the INSERTs are plain, so re-emitting an applied row (for
+example after a batch boundary moves) would insert it twice.
+
+usage: python _emit_batches.py [--max-bytes 60000] [--max-rows 40]
+       python _emit_batches.py --mark-applied batch_000.sql batch_001.sql
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
 import json
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-from import_mlit_sample_to_unified import question_to_insert_sql
+from import_mlit_sample_to_unified import question_to_insert_sql, text_hash  # noqa: E402
 
 DATA = Path(__file__).resolve().parent
 OUT = DATA / "apply_batches"
-OUT.mkdir(exist_ok=True)
-
-# clear old
-for p in OUT.glob("*.sql"):
-    p.unlink()
-
-all_q = []
-for name, edition in [
-    ("mlit_sample_insert_202606.json", "202606"),
-    ("mlit_sample_insert_202408.json", "202408"),
-]:
-    qs = json.loads((DATA / name).read_text(encoding="utf-8"))
-    for q in qs:
-        q["_edition"] = edition
-        all_q.append(q)
-
-batch_size = 8
-paths = []
-for i in range(0, len(all_q), batch_size):
-    batch = all_q[i : i + batch_size]
-    n = i // batch_size
-    path = OUT / f"batch_{n:03d}.sql"
-    lines = [question_to_insert_sql(q) for q in batch]
-    path.write_text("\n".join(lines), encoding="utf-8")
-    paths.append(str(path))
-
-manifest = {"total": len(all_q), "batches": len(paths), "batch_size": batch_size, "paths": paths}
-(OUT / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
-print(json.dumps(manifest, ensure_ascii=False))
+MANIFEST = OUT / "manifest.json"
+# execute_sql payloads much beyond ~64 KB have failed in practice; stay under it.
+DEFAULT_MAX_BYTES = 60_000
+DEFAULT_MAX_ROWS = 40
+
+
+def load_questions() -> list[dict]:
+    all_q = []
+    for name, edition in [
+        ("mlit_sample_insert_202606.json", "202606"),
+        ("mlit_sample_insert_202408.json", "202408"),
+    ]:
+        qs = json.loads((DATA / name).read_text(encoding="utf-8"))
+        for q in qs:
+            q["_edition"] = edition
+            all_q.append(q)
+    return all_q
+
+
+def pack(statements: list[tuple[str, str]], max_bytes: int, max_rows: int) -> list[list[tuple[str, str]]]:
+    """Greedy packing of (row hash, SQL) pairs; an oversized statement gets its own batch."""
+    batches: list[list[tuple[str, str]]] = []
+    current: list[tuple[str, str]] = []
+    size = 0
+    for row_hash, sql in statements:
+        n = len(sql.encode("utf-8")) + 1  # joined with "\n"
+        if current and (size + n > max_bytes or len(current) >= max_rows):
+            batches.append(current)
+            current, size = [], 0
+        current.append((row_hash, sql))
+        size += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_manifest() -> dict:
+    if MANIFEST.is_file():
+        return json.loads(MANIFEST.read_text(encoding="utf-8"))
+    return {}
+
+
+def write_manifest(manifest: dict) -> None:
+    MANIFEST.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def emit(max_bytes: int, max_rows: int) -> dict:
+    OUT.mkdir(exist_ok=True)
+    previous = load_manifest()
+    applied = set(previous.get("applied_checksums") or [])
+    applied_rows = set(previous.get("applied_rows") or [])
+
+    questions = load_questions()
+    statements = []
+    for q in questions:
+        row_hash = q.get("text_hash") or text_hash(q["question_text"])
+        if row_hash not in applied_rows:
+            statements.append((row_hash, question_to_insert_sql(q)))
+    batches = pack(statements, max_bytes, max_rows)
+
+    entries = []
+    written = 0
+    names = set()
+    for n, batch in enumerate(batches):
+        name = f"batch_{n:03d}.sql"
+        names.add(name)
+        content = "\n".join(sql for _h, sql in batch)
+        digest = sha256(content)
+        path = OUT / name
+        if not (path.is_file() and sha256(path.read_text(encoding="utf-8")) == digest):
+            path.write_text(content, encoding="utf-8")
+            written += 1
+        entries.append(
+            {
+                "file": name,
+                "sha256": digest,
+                "bytes": len(content.encode("utf-8")),
+                "rows": [h for h, _sql in batch],
+                "applied": digest in applied,
+            }
+        )
+    removed = 0
+    for path in OUT.glob("batch_*.sql"):
+        if path.name not in names:
+            path.unlink()
+            removed += 1
+
+    manifest = {
+        "total": len(questions),
+        "pending": len(statements),
+        "batches": len(entries),
+        "max_bytes": max_bytes,
+        "max_rows": max_rows,
+        "paths": [e["file"] for e in entries],  # relative to this manifest's directory
+        "entries": entries,
+        "applied_checksums": sorted(applied),
+        "applied_rows": sorted(applied_rows),
+    }
+    write_manifest(manifest)
+    return {
+        "total": len(questions),
+        "skipped_applied": len(questions) - len(statements),
+        "batches": len(entries),
+        "written": written,
+        "unchanged": len(entries) - written,
+        "removed": removed,
+    }
+
+
+def mark_applied(names: list[str]) -> dict:
+    manifest = load_manifest()
+    by_name = {e["file"]: e for e in manifest.get("entries") or []}
+    applied = set(manifest.get("applied_checksums") or [])
+    applied_rows = set(manifest.get("applied_rows") or [])
+    for name in names:
+        entry = by_name.get(Path(name).name)
+        if entry is None:
+            raise SystemExit(f"not in manifest: {name}")
+        applied.add(entry["sha256"])
+        applied_rows.update(entry["rows"])
+        entry["applied"] = True
+    manifest["applied_checksums"] = sorted(applied)
+    manifest["applied_rows"] = sorted(applied_rows)
+    write_manifest(manifest)
+    return {"applied": sum(1 for e in by_name.values() if e["applied"]), "batches": len(by_name)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pack MLIT sample INSERTs into SQL batches for MCP apply")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="UTF-8 bytes per batch file")
+    parser.add_argument("--max-rows", type=int, default=DEFAULT_MAX_ROWS, help="INSERT statements per batch file")
+    parser.add_argument("--mark-applied", nargs="+", metavar="BATCH", help="record these batch files as applied")
+    args = parser.parse_args()
+    if args.mark_applied:
+        result = mark_applied(args.mark_applied)
+    else:
+        result = emit(args.max_bytes, args.max_rows)
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -16,6 +16,7 @@ from import_mlit_sample_to_unified import (  # noqa: E402
     parse_202408_sql,
     adapt_to_four_choices,
 )
+from mcp_dump import read_rows  # noqa: E402
 
 DATA = Path(__file__).resolve().parent
 
@@ -31,8 +32,8 @@ for q in gold_2026:
     gold_by_key[normalize_text(q["question_text"])[:80]] = q
 
 # Load DB dump if provided as JSON argv, else expect apply JSON
-db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA / "db_mlit_sample_dump.json"
-db_rows = json.loads(db_path.read_text(encoding="utf-8"))
+db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA / "db_mlit_sample_dump.jsonl"
+db_rows = list(read_rows(db_path))
 
 issues = []
 ok = 0
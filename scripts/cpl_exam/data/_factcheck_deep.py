@@ -10,9 +10,10 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[3]
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from import_mlit_sample_to_unified import normalize_text, parse_sample_text  # noqa: E402
+from mcp_dump import read_rows  # noqa: E402
 
 DATA = Path(__file__).resolve().parent
-rows = json.loads((DATA / "db_mlit_sample_dump.json").read_text(encoding="utf-8"))
+rows = list(read_rows(DATA / "db_mlit_sample_dump.jsonl"))
 gold = parse_sample_text(
     (DATA / "001761087_202606_webfetch.txt").read_text(encoding="utf-8"),
     2026,
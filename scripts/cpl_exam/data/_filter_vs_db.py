@@ -1,34 +1,25 @@
 # -*- coding: utf-8 -*-
-"""Filter insert JSON against DB prefixes, then emit apply batches."""
+"""Filter insert JSON against DB prefixes, then emit apply batches.
+
+usage: python _filter_vs_db.py <agent-tools.txt>  (MCP dump of SELECT left(question_text, 40) AS p ...)
+"""
 import json
 import re
+import sys
 from pathlib import Path
 
 DATA = Path(__file__).resolve().parent
+sys.path.insert(0, str(DATA.parent))
+from mcp_dump import iter_dump_rows  # noqa: E402
+from prefix_index import PrefixIndex, filter_new  # noqa: E402
 
-raw = Path(
-    r"C:\Users\yusuke\.cursor\projects\c-Users-yusuke-Desktop-project-FlightAcademyTsx\agent-tools\304500fc-cfdb-4028-bdf5-f8849ef8d977.txt"
-).read_text(encoding="utf-8")
-
-# File may be raw MCP JSON envelope
-try:
-    envelope = json.loads(raw)
-    text = envelope.get("result", raw)
-except json.JSONDecodeError:
-    text = raw
-
-m = re.search(
-    r"<untrusted-data-[0-9a-f-]+>\s*\n(\[.*?\])\s*\n</untrusted-data-",
-    text,
-    re.S,
-)
-if not m:
-    raise SystemExit("could not find untrusted JSON payload")
-payload = m.group(1)
-
-rows = json.loads(payload)
+if len(sys.argv) < 2:
+    raise SystemExit("usage: python _filter_vs_db.py <agent-tools.txt with {p: prefix} rows>")
+rows = iter_dump_rows(Path(sys.argv[1]))
 prefixes = {re.sub(r"\s+", " ", r["p"]).strip().lower()[:40] for r in rows if r.get("p")}
 print("db_prefixes", len(prefixes))
+# Only prefixes of >= 15 chars count as a match; kept questions join the index.
+index = PrefixIndex(prefixes, min_len=15)
 
 
 def norm_prefix(s: str) -> str:
@@ -39,15 +30,7 @@ def norm_prefix(s: str) -> str:
 
 def filter_qs(path: Path):
     qs = json.loads(path.read_text(encoding="utf-8"))
-    kept = []
-    skipped = []
-    for q in qs:
-        p = norm_prefix(q["question_text"])
-        if any(p.startswith(ep) or ep.startswith(p) for ep in prefixes if len(ep) >= 15):
-            skipped.append(q)
-        else:
-            kept.append(q)
-            prefixes.add(p)
+    kept, skipped = filter_new(qs, lambda q: norm_prefix(q["question_text"]), index)
     path.write_text(json.dumps(kept, ensure_ascii=False, indent=2), encoding="utf-8")
     return kept, skipped
 
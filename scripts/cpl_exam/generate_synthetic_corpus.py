@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic CPL exam corpus for load and scaling tests.
+
+Writes N documents in the formats the ingestion scripts consume:
+  - md:  MLIT sample layout ("## 科目" / "例題N" / （１）… / 正答（k）) for
+         import_mlit_sample_to_unified.parse_sample_text
+  - exam: converted-PDF text ("問N" + options) for extract_questions_from_text
+  - csv: master CSVs (_master_<code>.csv, utf-8-sig) with the load_csv_rows /
+         row_to_record columns, one set per document
+  - pdf: optional simple PDFs of the exam layout whose text extracts back
+         (ToUnicode map; no embedded font, so they are not for viewing)
+
+Subjects follow --subjects weights. --near-dup-rate of the questions are
+variants of an earlier question (spacing, full-width digits, a trailing
+remark, or two of the first four options swapped), --exact-dup-rate are
+verbatim repeats, and
+--five-choice-rate get a 5th option (drop path of adapt_to_four_choices).
+Output is deterministic for a given --seed; manifest.json lists the files
+and the generated duplicate counts.
+
+    python scripts/cpl_exam/generate_synthetic_corpus.py --docs 100 --questions 100 --out /tmp/cpl_synth
+    python scripts/cpl_exam/generate_synthetic_corpus.py --docs 5 --formats md,csv,pdf --near-dup-rate 0.2
+    python scripts/cpl_exam/generate_synthetic_corpus.py --self-test
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import random
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+SUBJECT_CODES = {"航空工学": "AD", "航空気象": "WX", "空中航法": "NV", "航空通信": "CM", "航空法規": "RG"}
+# Weights of the current bank, roughly.
+DEFAULT_SUBJECTS = "航空工学=0.3,航空気象=0.2,空中航法=0.2,航空通信=0.15,航空法規=0.15"
+FORMATS = ("md", "exam", "csv", "pdf")
+FULLWIDTH = str.maketrans("0123456789", "０１２３４５６７８９")
+
+# Per subject: (大分類, 中・小分類, topics, statements). Topics carry the keywords
+# classify_subject looks for, so synthetic text lands in the expected subject.
+VOCAB: dict[str, tuple[str, str, list[str], list[str]]] = {
+    "航空工学": (
+        "航空力学",
+        "空力の基礎理論/揚力",
+        ["揚力", "抗力", "失速", "プロペラ", "ピトー静圧系統", "重心位置", "油圧系統", "翼端渦"],
+        ["迎え角の増加に伴って増加する", "空気密度に比例する", "速度の2乗に比例する", "翼面積に反比例する",
+         "高度によらず一定である", "荷重倍数に比例して増加する", "後退翼では小さくなる", "マッハ数とは無関係である"],
+    ),
+    "航空気象": (
+        "気象現象",
+        "前線/前線の種類と気象状態",
+        ["寒冷前線", "温暖前線", "逆転層", "放射霧", "積乱雲", "標準大気", "露点温度", "乱気流"],
+        ["通過後は気温が下がる", "安定した大気で発生しやすい", "夜間の放射冷却で生じる", "対流が活発になる",
+         "気圧の谷に沿って発達する", "上空ほど気温が低い", "湿度が高いほど発生しやすい", "視程が著しく低下する"],
+    ),
+    "空中航法": (
+        "航法",
+        "航法の実施/機位の確認",
+        ["磁方位", "偏差", "自差", "VOR", "DME", "GPS", "推測航法", "CRM"],
+        ["真方位に偏差を加えて求める", "局の真上では指示が不安定になる", "斜距離を示す", "地表の磁場の影響を受ける",
+         "風の影響を補正して求める", "衛星の配置により精度が変わる", "コンパスの設置位置で変わる", "乗員間の連携を重視する"],
+    ),
+    "航空通信": (
+        "管制業務",
+        "航空交通業務概論/航空交通業務",
+        ["管制圏", "トランスポンダ", "VHF通信", "進入管制", "飛行計画", "コールサイン", "レーダー誘導", "ATC許可"],
+        ["管制官の許可が必要である", "スコークを設定して応答する", "見通し距離内で使用される", "出発前に通報する",
+         "緊急時は7700を設定する", "復唱が求められる", "管制圏外では不要である", "周波数の変更を指示される"],
+    ),
+    "航空法規": (
+        "航空法及び航空法施行規則",
+        "航空法/運航",
+        ["航空法", "耐空証明", "技能証明", "航空身体検査証明", "最低安全高度", "有視界飛行方式", "航空機登録", "飛行規則"],
+        ["国土交通大臣の許可を要する", "有効期間が定められている", "機長が確認しなければならない", "事前に届け出る",
+         "緊急の場合は適用されない", "夜間は別に定める", "携行が義務付けられている", "違反した場合は罰則がある"],
+    ),
+}
+STEMS = [
+    "{topic}に関する説明で正しいものはどれか。",
+    "{topic}について誤りはどれか。",
+    "{topic}の特徴として最も適切なものはどれか。",
+    "次の{topic}に関する記述のうち、正しいものはどれか。",
+]
+NOISE = ["（参考図なし）", "なお、計算は概算でよい。", "ただし無風とする。"]
+
+
+@dataclass
+class Question:
+    subject: str
+    stem: str
+    options: list[str]
+    correct: int
+    kind: str = "original"  # original | near_dup | exact_dup
+    meta: dict[str, Any] = field(default_factory=dict)
+
+
+def parse_weights(spec: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in VOCAB:
+            raise ValueError(f"unknown subject {name!r} (expected one of {', '.join(VOCAB)})")
+        weights[name] = float(value or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("subject weights must be positive")
+    return weights
+
+
+def _original(rng: random.Random, subject: str, five_choice_rate: float) -> Question:
+    _major, _minor, topics, statements = VOCAB[subject]
+    topic = rng.choice(topics)
+    stem = rng.choice(STEMS).format(topic=topic)
+    if rng.random() < 0.3:
+        stem += f"（設問番号{rng.randint(1, 999)}）"
+    count = 5 if rng.random() < five_choice_rate else 4
+    options = [f"{topic}は{s}。" for s in rng.sample(statements, count)]
+    correct = rng.randint(1, 4)
+    return Question(subject, stem, options, correct)
+
+
+def _near_duplicate(rng: random.Random, source: Question) -> Question:
+    stem, options, correct = source.stem, list(source.options), source.correct
+    mode = rng.choice(["spacing", "fullwidth", "remark", "reorder"])
+    if mode == "spacing":
+        cut = rng.randint(1, max(1, len(stem) - 1))
+        stem = stem[:cut] + "　" + stem[cut:]
+    elif mode == "fullwidth":
+        stem = stem.translate(FULLWIDTH) if any(c.isdigit() for c in stem) else stem + "（改）"
+    elif mode == "remark":
+        stem = stem + rng.choice(NOISE)
+    else:
+        # Slot 5 stays put: the 4-choice formats drop it (see _four_choices).
+        i, j = rng.sample(range(4), 2)
+        options[i], options[j] = options[j], options[i]
+        correct = {i + 1: j + 1, j + 1: i + 1}.get(correct, correct)
+    return Question(source.subject, stem, options, correct, "near_dup", {"mode": mode})
+
+
+def generate(
+    docs: int,
+    per_doc: int,
+    weights: dict[str, float],
+    *,
+    near_dup_rate: float = 0.05,
+    exact_dup_rate: float = 0.02,
+    five_choice_rate: float = 0.05,
+    seed: int = 0,
+) -> list[list[Question]]:
+    """docs lists of per_doc questions; duplicates may refer to any earlier document."""
+    rng = random.Random(seed)
+    names = list(weights)
+    cum = [weights[n] for n in names]
+    pool: list[Question] = []
+    corpus: list[list[Question]] = []
+    for _ in range(docs):
+        doc: list[Question] = []
+        for _ in range(per_doc):
+            roll = rng.random()
+            if pool and roll < exact_dup_rate:
+                src = rng.choice(pool)
+                q = Question(src.subject, src.stem, list(src.options), src.correct, "exact_dup")
+            elif pool and roll < exact_dup_rate + near_dup_rate:
+                q = _near_duplicate(rng, rng.choice(pool))
+            else:
+                q = _original(rng, rng.choices(names, cum)[0], five_choice_rate)
+                pool.append(q)
+            doc.append(q)
+        corpus.append(doc)
+    return corpus
+
+
+def _digits(n: int) -> str:
+    return str(n).translate(FULLWIDTH)
+
+
+def _four_choices(q: Question) -> tuple[list[str], int]:
+    """Options and answer as adapt_to_four_choices leaves them for the 4-choice UI."""
+    if len(q.options) <= 4:
+        return q.options, q.correct
+    if q.correct <= 4:
+        return q.options[:4], q.correct
+    return q.options[:3] + [q.options[4]], 4  # correct 5th option: drop the 4th instead
+
+
+def render_md(doc: list[Question], year: int, month: int) -> str:
+    """MLIT sample layout; questions grouped by subject, numbered per subject."""
+    lines = [f"# 事業用操縦士（飛行機）学科試験 例題集 {year}年{month}月", ""]
+    by_subject: dict[str, list[Question]] = {}
+    for q in doc:
+        by_subject.setdefault(q.subject, []).append(q)
+    for subject, questions in by_subject.items():
+        lines += [f"## {_digits(year)}年{_digits(month)}月 {subject}（P{_digits(1)}）", ""]
+        for no, q in enumerate(questions, 1):
+            lines.append(f"例題{_digits(no)}")
+            lines.append(q.stem)
+            lines += [f"（{_digits(i)}）{opt}" for i, opt in enumerate(q.options, 1)]
+            lines += [f"正答（{_digits(q.correct)}）", ""]
+    return "\n".join(lines)
+
+
+def render_exam(doc: list[Question], year: int, month: int) -> str:
+    """Converted-PDF text: 問N lines as extract_questions_from_text sees them."""
+    lines = [f"航空従事者学科試験問題 {year}年{month}月", "資格 事業用操縦士(飛)", ""]
+    for no, q in enumerate(doc, 1):
+        lines.append(f"問{no} {q.stem}")
+        lines += [f"（{_digits(i)}）{opt}" for i, opt in enumerate(q.options, 1)]
+        lines.append("")
+    return "\n".join(lines)
+
+
+CSV_COLUMNS = ["No", "問題文", "選択肢1", "選択肢2", "選択肢3", "選択肢4", "正解No", "解説", "大分類", "中・小分類", "重要語句", "重要度", "タイプ"]
+
+
+def render_csvs(doc: list[Question], year: int, month: int) -> dict[str, str]:
+    """_master_<code>.csv text per subject code (4 options, adapted like adapt_to_four_choices)."""
+    rows: dict[str, list[dict[str, str]]] = {}
+    counters: dict[str, int] = {}
+    for q in doc:
+        code = SUBJECT_CODES[q.subject]
+        counters[code] = counters.get(code, 0) + 1
+        major, minor, _topics, _statements = VOCAB[q.subject]
+        options, correct = _four_choices(q)
+        rows.setdefault(code, []).append(
+            {
+                "No": f"{year:04d}{month:02d}_{code}_{counters[code]:03d}",
+                "問題文": q.stem,
+                **{f"選択肢{i}": opt for i, opt in enumerate(options, 1)},
+                "正解No": str(correct),
+                "解説": f"{options[correct - 1]}が正しい。",
+                "大分類": major,
+                "中・小分類": minor,
+                "重要語句": q.stem[:8],
+                "重要度": "SABC"[counters[code] % 4],
+                "タイプ": "暗記",
+            }
+        )
+    out: dict[str, str] = {}
+    for code, code_rows in rows.items():
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(code_rows)
+        out[f"_master_{code}.csv"] = buf.getvalue()
+    return out
+
+
+def _to_unicode_cmap() -> bytes:
+    """Identity ToUnicode CMap for the 2-byte UCS-2 codes written by render_pdf."""
+    blocks = [hi for hi in range(0x100) if not 0xD8 <= hi <= 0xDF]
+    body = []
+    for i in range(0, len(blocks), 100):
+        chunk = blocks[i : i + 100]
+        body.append(f"{len(chunk)} beginbfrange")
+        body += [f"<{hi:02X}00> <{hi:02X}FF> <{hi:02X}00>" for hi in chunk]
+        body.append("endbfrange")
+    return "\n".join(
+        [
+            "/CIDInit /ProcSet findresource begin 12 dict begin begincmap",
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+            "/CMapName /Adobe-Identity-UCS def /CMapType 2 def",
+            "1 begincodespacerange <0000> <FFFF> endcodespacerange",
+            *body,
+            "endcmap CMapName currentdict /CMap defineresource pop end end",
+        ]
+    ).encode("ascii")
+
+
+_TO_UNICODE = _to_unicode_cmap()
+
+
+def render_pdf(text: str, lines_per_page: int = 50, chars_per_line: int = 40) -> bytes:
+    """Minimal text PDF for extraction load tests (A4, BMP characters only).
+
+    Codes are UCS-2 under Identity-H with an identity ToUnicode map, so
+    PyPDF2 / pdfplumber extract the original text; glyphs are not meaningful
+    in a viewer (nothing is embedded).
+    """
+    wrapped: list[str] = []
+    for line in text.splitlines():
+        wrapped += [line[i : i + chars_per_line] for i in range(0, len(line), chars_per_line)] or [""]
+    pages = [wrapped[i : i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+
+    objects: list[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled once the page tree id is known
+    pages_id = add(b"")
+    to_unicode = add(b"<< /Length %d >>\nstream\n" % len(_TO_UNICODE) + _TO_UNICODE + b"\nendstream")
+    font = add(
+        b"<< /Type /Font /Subtype /Type0 /BaseFont /HeiseiKakuGo-W5 /Encoding /Identity-H "
+        b"/DescendantFonts [<< /Type /Font /Subtype /CIDFontType0 /BaseFont /HeiseiKakuGo-W5 "
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Japan1) /Supplement 2 >> /DW 1000 >> ] "
+        b"/ToUnicode %d 0 R >>" % to_unicode
+    )
+    kids: list[int] = []
+    for page_lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+        for line in page_lines:
+            safe = "".join(c if ord(c) <= 0xFFFF else "?" for c in line)
+            ops.append(f"<{safe.encode('utf-16-be').hex()}> Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("ascii")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)
+            )
+        )
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def write_corpus(corpus: list[list[Question]], out: Path, formats: set[str], start_year: int = 2030) -> dict[str, Any]:
+    """Write every document in the requested formats; returns the manifest."""
+    files: list[str] = []
+    for index, doc in enumerate(corpus):
+        year, month = start_year + index // 12, index % 12 + 1
+        stem = f"synthetic_{year:04d}{month:02d}_{index:05d}"
+        exam_text = render_exam(doc, year, month)
+        targets: dict[Path, str | bytes] = {}
+        if "md" in formats:
+            targets[out / "md" / f"{stem}.md"] = render_md(doc, year, month)
+        if "exam" in formats:
+            targets[out / "exam" / f"{stem}.txt"] = exam_text
+        if "csv" in formats:
+            for name, text in render_csvs(doc, year, month).items():
+                targets[out / "csv" / stem / name] = text
+        if "pdf" in formats:
+            targets[out / "pdf" / f"{stem}.pdf"] = render_pdf(exam_text)
+        for path, payload in targets.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(payload, bytes):
+                path.write_bytes(payload)
+            else:
+                path.write_text(payload, encoding="utf-8-sig" if path.suffix == ".csv" else "utf-8")
+            files.append(str(path.relative_to(out)))
+    kinds: dict[str, int] = {}
+    subjects: dict[str, int] = {}
+    for doc in corpus:
+        for q in doc:
+            kinds[q.kind] = kinds.get(q.kind, 0) + 1
+            subjects[q.subject] = subjects.get(q.subject, 0) + 1
+    manifest = {
+        "documents": len(corpus),
+        "questions": sum(len(doc) for doc in corpus),
+        "kinds": kinds,
+        "subjects": subjects,
+        "five_choice": sum(1 for doc in corpus for q in doc if len(q.options) == 5),
+        "formats": sorted(formats),
+        "files": files,
+    }
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
+
+
+def _check_answers(corpus: list[list[Question]], out: Path) -> list[dict[str, Any]]:
+    """Parse the md and csv output back; each answer must name the generated correct option."""
+    from import_cpl_master_csv import load_csv_rows, row_to_record  # noqa: E402
+    from import_mlit_sample_to_unified import parse_sample_text  # noqa: E402
+
+    for doc, md_path in zip(corpus, sorted((out / "md").glob("*.md"))):
+        with contextlib.redirect_stdout(io.StringIO()):
+            parsed = parse_sample_text(md_path.read_text(encoding="utf-8"), 2030, 1, md_path.name)
+        assert len(parsed) == len(doc), (md_path.name, len(parsed), len(doc))
+        expected = [q for subject in dict.fromkeys(q.subject for q in doc) for q in doc if q.subject == subject]
+        for p, src in zip(parsed, expected):
+            assert p["question_text"] == " ".join(src.stem.split()), (p["question_text"], src.stem)
+            assert (p["options"], p["correct_answer"]) == _four_choices(src), (md_path.name, p, src)
+            assert p["options"][p["correct_answer"] - 1] == src.options[src.correct - 1]
+
+    records: list[dict[str, Any]] = []
+    for doc, doc_dir in zip(corpus, sorted(p for p in (out / "csv").iterdir() if p.is_dir())):
+        for csv_path in sorted(doc_dir.glob("_master_*.csv")):
+            code = csv_path.stem.rsplit("_", 1)[1]
+            found = [r for row in load_csv_rows(csv_path) if (r := row_to_record(row, code, csv_path.name))]
+            expected = [q for q in doc if SUBJECT_CODES[q.subject] == code]
+            assert len(found) == len(expected), (csv_path, len(found), len(expected))
+            for r, src in zip(found, expected):
+                answer = src.options[src.correct - 1]
+                assert r["options"][r["correct_answer"] - 1] == answer, (csv_path.name, r["options"], src)
+                assert r["explanation"] == f"{answer}が正しい。"
+            records += found
+    return records
+
+
+def self_test() -> None:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from convert_new_pdfs_to_unified import extract_questions_from_text  # noqa: E402
+    from import_mlit_sample_to_unified import text_hash  # noqa: E402
+
+    weights = parse_weights(DEFAULT_SUBJECTS)
+    corpus = generate(4, 60, weights, near_dup_rate=0.2, exact_dup_rate=0.1, five_choice_rate=0.1, seed=3)
+    again = generate(4, 60, weights, near_dup_rate=0.2, exact_dup_rate=0.1, five_choice_rate=0.1, seed=3)
+    assert [[(q.stem, q.options) for q in d] for d in corpus] == [[(q.stem, q.options) for q in d] for d in again]
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        manifest = write_corpus(corpus, out, set(FORMATS))
+        assert manifest["questions"] == 240 and manifest["kinds"].get("near_dup") and manifest["kinds"].get("exact_dup")
+
+        exam = sorted((out / "exam").glob("*.txt"))[0].read_text(encoding="utf-8")
+        with contextlib.redirect_stdout(io.StringIO()):
+            found = extract_questions_from_text(exam)
+        assert len(found) >= len(corpus[0]) * 0.9, len(found)
+
+        pdf = sorted((out / "pdf").glob("*.pdf"))[0].read_bytes()
+        assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+        startxref = int(pdf.rsplit(b"startxref", 1)[1].split()[0])
+        assert pdf[startxref : startxref + 4] == b"xref"
+
+        records = _check_answers(corpus, out)
+        assert len(records) == manifest["questions"], len(records)
+        assert {r["main_subject"] for r in records} == set(weights)
+
+    # Several seeds with many 5-choice questions and re-ordered near duplicates.
+    for seed in range(12):
+        small = generate(3, 40, weights, near_dup_rate=0.3, exact_dup_rate=0.05, five_choice_rate=0.3, seed=seed)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_corpus(small, Path(tmp), {"md", "csv"})
+            _check_answers(small, Path(tmp))
+
+    originals = {text_hash(q.stem) for d in corpus for q in d if q.kind == "original"}
+    exact = [q for d in corpus for q in d if q.kind == "exact_dup"]
+    assert all(text_hash(q.stem) in originals for q in exact)
+    print(f"self-test ok ({manifest['kinds']})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic CPL exam corpus for load tests")
+    parser.add_argument("--docs", type=int, default=10, help="documents to generate")
+    parser.add_argument("--questions", type=int, default=100, help="questions per document")
+    parser.add_argument("--out", type=Path, default=Path("artifacts/cpl_synthetic"))
+    parser.add_argument("--formats", default="md,exam,csv", help=f"comma list of {','.join(FORMATS)}")
+    parser.add_argument("--subjects", default=DEFAULT_SUBJECTS, help="subject=weight,... (main_subject names)")
+    parser.add_argument("--near-dup-rate", type=float, default=0.05)
+    parser.add_argument("--exact-dup-rate", type=float, default=0.02)
+    parser.add_argument("--five-choice-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args()
+
+    if args.self_test:
+        self_test()
+        return 0
+    formats = {f.strip() for f in args.formats.split(",") if f.strip()}
+    unknown = formats - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+    corpus = generate(
+        args.docs,
+        args.questions,
+        parse_weights(args.subjects),
+        near_dup_rate=args.near_dup_rate,
+        exact_dup_rate=args.exact_dup_rate,
+        five_choice_rate=args.five_choice_rate,
+        seed=args.seed,
+    )
+    manifest = write_corpus(corpus, args.out, formats)
+    print(json.dumps({k: v for k, v in manifest.items() if k != "files"}, ensure_ascii=False))
+    print(f"{len(manifest['files'])} files -> {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
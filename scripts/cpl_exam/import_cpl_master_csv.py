@@ -4,20 +4,21 @@
 重複排除、正規化、レポート出力を実施
 """
 
+from __future__ import annotations
+
 import csv
 import json
 import os
 import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from supabase import Client
 
-try:
-    from supabase import create_client, Client
-    from dotenv import load_dotenv
-except ImportError:
-    print("ERROR: pip install supabase python-dotenv")
-    sys.exit(1)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from cli_profile import add_profile_argument, run_profiled  # noqa: E402
 
 # 科目コード → main_subject
 CODE_TO_MAIN: Dict[str, str] = {
@@ -57,6 +58,13 @@ SUB_SUBJECT_ALIASES: Dict[str, str] = {
 
 
 def load_supabase_client() -> Client:
+    # Imported here so the pure parsing helpers (and benchmarks) work without supabase installed.
+    try:
+        from supabase import create_client
+        from dotenv import load_dotenv
+    except ImportError:
+        print("ERROR: pip install supabase python-dotenv")
+        sys.exit(1)
     script_dir = Path(__file__).resolve().parent
     project_root = script_dir.parent.parent  # scripts/cpl_exam -> project root
     for name in (".env.local", ".env"):
@@ -308,6 +316,7 @@ def main() -> None:
     parser.add_argument("--output-sql", type=str, metavar="FILE", help="投入用SQLをファイル出力（MCP等で実行可能）")
     parser.add_argument("--output-json", type=str, metavar="FILE", help="全レコードをJSON出力（Node等でinsert用）")
     parser.add_argument("--sql-use-on-conflict", action="store_true", help="SQLにON CONFLICT DO NOTHINGを付与（UNIQUE制約が必要）")
+    add_profile_argument(parser)
     args = parser.parse_args()
 
     csv_dir = Path(args.csv_dir)
@@ -407,4 +416,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    run_profiled(main)
@@ -14,11 +14,19 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import random
 import re
 import sys
+import time
+from bisect import bisect_right
 from pathlib import Path
 from typing import Any
 
+from question_archive import edition_fingerprint, editions as archive_editions, read_questions, write_edition
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from cli_profile import add_profile_argument, run_profiled  # noqa: E402
+
 ROOT = Path(__file__).resolve().parents[2]
 DATA = Path(__file__).resolve().parent / "data"
 SQL_DIR = ROOT / "scripts" / "database"
@@ -142,30 +150,17 @@ def parse_one_question(
     correct = int(ans_m.group(1).translate(NFKC_TABLE))
     before_ans = content[: ans_m.start()].strip()
 
-    # Extract numbered options （１）... — keep the last contiguous run 1..k
-    opt_matches = list(
-        re.finditer(
-            r"[（(]([1-5１-５])[）)]\s*(.+?)(?=(?:[（(][1-5１-５][）)]|正答|$))",
-            before_ans,
-            re.S,
-        )
-    )
-    options_raw: list[tuple[int, str]] = []
-    for m in opt_matches:
-        n = int(m.group(1).translate(NFKC_TABLE))
-        txt = re.sub(r"\s+", " ", m.group(2)).strip()
-        options_raw.append((n, txt))
-
+    # Numbered options （１）... — keep the last contiguous run 1..k
+    options_raw, opt1_positions = tokenize_options(before_ans)
     options_raw = select_final_option_run(options_raw)
     if len(options_raw) < 2:
         return None
 
     # Stem = text before the final option run (last （1） that starts that run)
-    opt1_positions = [m.start() for m in re.finditer(r"[（(][1１][）)]", before_ans)]
     if not opt1_positions:
         return None
     stem_end = opt1_positions[-1]
-    stem = re.sub(r"\s+", " ", before_ans[:stem_end]).strip()
+    stem = " ".join(before_ans[:stem_end].split())
 
     by_num = {n: t for n, t in options_raw}
     max_n = max(by_num)
@@ -199,6 +194,60 @@ def parse_one_question(
     }
 
 
+# Leading char class lets the regex engine skip ahead; same matches as [（(]([1-5１-５])[）)]|正答.
+OPTION_TOKEN_RE = re.compile(r"[（(正](?:(?<=[（(])([1-5１-５])[）)]|(?<=正)答)")
+WHITESPACE_RE = re.compile(r"\s*")
+
+
+def tokenize_options(before_ans: str) -> tuple[list[tuple[int, str]], list[int]]:
+    """One forward scan over option markers; returns ((n, text) options, （1） positions).
+
+    Same result as the former lazy-lookahead finditer: an option runs from its
+    marker (plus whitespace) to the next marker or 正答 after at least one
+    character, so a marker with no text swallows the following one.
+    """
+    starts: list[int] = []
+    ends: list[int] = []
+    digits: list[str | None] = []
+    for m in OPTION_TOKEN_RE.finditer(before_ans):
+        starts.append(m.start())
+        ends.append(m.end())
+        digits.append(m.group(1))
+    size = len(before_ans)
+    count = len(starts)
+    options: list[tuple[int, str]] = []
+    opt1_positions = [start for start, digit in zip(starts, digits) if digit == "1" or digit == "１"]
+    i = 0
+    while i < count:
+        digit = digits[i]
+        if digit is None:
+            i += 1
+            continue
+        text_start = WHITESPACE_RE.match(before_ans, ends[i]).end()
+        if text_start == size:
+            if text_start == ends[i]:
+                break
+            text_start -= 1  # \s* gives one whitespace back to .+?
+        # next boundary strictly after text_start (at least one option character)
+        i = bisect_right(starts, text_start, i + 1)
+        text_end = starts[i] if i < count else size
+        options.append((int(digit.translate(NFKC_TABLE)), " ".join(before_ans[text_start:text_end].split())))
+    return options, opt1_positions
+
+
+def _tokenize_options_regex(before_ans: str) -> tuple[list[tuple[int, str]], list[int]]:
+    """Previous two-regex implementation, kept as the self-test reference."""
+    opt_matches = re.finditer(
+        r"[（(]([1-5１-５])[）)]\s*(.+?)(?=(?:[（(][1-5１-５][）)]|正答|$))",
+        before_ans,
+        re.S,
+    )
+    options = [
+        (int(m.group(1).translate(NFKC_TABLE)), re.sub(r"\s+", " ", m.group(2)).strip()) for m in opt_matches
+    ]
+    return options, [m.start() for m in re.finditer(r"[（(][1１][）)]", before_ans)]
+
+
 def select_final_option_run(options_raw: list[tuple[int, str]]) -> list[tuple[int, str]]:
     """Keep the last run of options numbered 1..k (k>=2)."""
     if not options_raw:
@@ -313,6 +362,37 @@ def parse_202408_sql(sql_path: Path) -> list[dict[str, Any]]:
     return questions
 
 
+def source_fingerprint(source: Path) -> str:
+    """sha256 over a source file and this parser module; archived parses are reused only while it matches."""
+    digest = hashlib.sha256()
+    for path in (source, Path(__file__).resolve()):
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_202408(archive: Path | None) -> list[dict[str, Any]]:
+    """2024-08 edition from the question archive; the restore SQL is parsed to seed or refresh it."""
+    sql_path = ROOT / "scripts" / "cpl_exam" / "real_exam_data_insert.sql"
+    if archive is None:
+        return parse_202408_sql(sql_path)
+    try:
+        fingerprint = source_fingerprint(sql_path)
+        if "202408" in archive_editions(archive):
+            if edition_fingerprint(archive, "202408") == fingerprint:
+                questions = read_questions(archive, editions=["202408"])
+                for q in questions:
+                    q.pop("edition", None)
+                return questions
+            print("[info] question archive 202408 is stale (SQL or parser changed); re-parsing", file=sys.stderr)
+        questions = parse_202408_sql(sql_path)
+        write_edition(archive, "202408", questions, fingerprint=fingerprint)
+        return questions
+    except RuntimeError as e:
+        print(f"[warn] question archive skipped: {e}", file=sys.stderr)
+        return parse_202408_sql(sql_path)
+
+
 def load_existing_hashes(path: Path | None) -> set[str]:
     if not path or not path.exists():
         return set()
@@ -452,6 +532,54 @@ def write_sql(path: Path, questions: list[dict[str, Any]], title: str) -> None:
     path.write_text("\n".join(lines), encoding="utf-8")
 
 
+def self_test() -> None:
+    rng = random.Random(11)
+    pieces = ["（１）", "(1)", "（2）", "(３)", "（4", "5）", "（５）", "正答", "正", "答", " ", "　", "\n", "a", "揚力", "（", ")"]
+    for _ in range(20000):
+        s = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 14)))
+        assert tokenize_options(s) == _tokenize_options_regex(s), repr(s)
+
+    # identical output on the sample editions
+    sql_path = Path(__file__).resolve().parent / "real_exam_data_insert.sql"
+    sample_2026 = DATA / "001761087_202606_webfetch.txt"
+    inputs: list[str] = []
+    if sql_path.is_file():
+        inputs += re.findall(r"'202408_CPLTest\.pdf',\s*'(例題.*?)'\s*,\s*'", sql_path.read_text(encoding="utf-8"), re.S)
+    if sample_2026.is_file():
+        inputs += re.split(r"例題\s*[0-9０-９]+", strip_markdown_noise(sample_2026.read_text(encoding="utf-8")))
+    for block in inputs:
+        assert tokenize_options(block) == _tokenize_options_regex(block)
+    if sql_path.is_file():
+        parsed = parse_202408_sql(sql_path)
+        scan = globals()["tokenize_options"]
+        globals()["tokenize_options"] = _tokenize_options_regex
+        try:
+            assert parse_202408_sql(sql_path) == parsed
+        finally:
+            globals()["tokenize_options"] = scan
+
+    # microbenchmark: long OCR'd blocks
+    stem = "次の記述のうち正しいものはどれか。" * 20
+    adversarial = {
+        "long options": stem + "".join(f"（{n % 4 + 1}）" + "揚力と抗力 " * 400 + "\n" for n in range(200)),
+        "empty markers": "（１）" * 50000,
+        "unclosed parens": ("（１ (2 正 " + "　" * 20) * 20000,
+        "whitespace runs": "".join("（１）" + " \n" * 500 + "x" for _ in range(400)),
+    }
+    for name, block in adversarial.items():
+        assert tokenize_options(block) == _tokenize_options_regex(block), name
+        timings = []
+        for fn in (_tokenize_options_regex, tokenize_options):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                fn(block)
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+        print(f"  {name} ({len(block)} chars): regex {timings[0] * 1000:.1f}ms, scan {timings[1] * 1000:.1f}ms")
+    print(f"self-test ok ({len(inputs)} sample blocks)")
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -460,11 +588,28 @@ def main() -> int:
         default=DATA / "existing_202408_stems.json",
     )
     parser.add_argument("--skip-supabase", action="store_true")
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        default=DATA / "question_archive",
+        help="question_archive.py root; parsed editions are written here and 2024-08 is read back from it",
+    )
+    parser.add_argument("--no-archive", action="store_true", help="parse the 2024-08 SQL and skip the archive")
+    parser.add_argument("--self-test", action="store_true", help="check the option tokenizer and time it")
+    add_profile_argument(parser)
     args = parser.parse_args()
-
-    text_2026 = (DATA / "001761087_202606_webfetch.txt").read_text(encoding="utf-8")
-    q2026 = parse_sample_text(text_2026, 2026, 6, "001761087.pdf")
-    q2024 = parse_202408_sql(ROOT / "scripts" / "cpl_exam" / "real_exam_data_insert.sql")
+    if args.self_test:
+        self_test()
+        return 0
+
+    source_2026 = DATA / "001761087_202606_webfetch.txt"
+    q2026 = parse_sample_text(source_2026.read_text(encoding="utf-8"), 2026, 6, "001761087.pdf")
+    q2024 = load_202408(None if args.no_archive else args.archive)
+    if not args.no_archive:
+        try:
+            write_edition(args.archive, "202606", q2026, fingerprint=source_fingerprint(source_2026))
+        except RuntimeError as e:
+            print(f"[warn] question archive skipped: {e}", file=sys.stderr)
 
     existing = set()
     load_existing_hashes.prefixes = []  # type: ignore[attr-defined]
@@ -557,4 +702,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled(main))
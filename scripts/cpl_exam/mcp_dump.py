@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Stream rows out of Supabase MCP execute_sql dumps (agent-tools text files).
+
+A dump is either the raw tool text or an MCP JSON envelope whose "result"
+string holds that text. The rows are the JSON array between
+<untrusted-data-...> and </untrusted-data-...>. iter_dump_rows reads the
+file in chunks: the envelope string is unescaped incrementally, the
+marker must appear within the first MAX_PREAMBLE characters, and the
+array is decoded one element at a time, so memory stays at about one row
+plus one chunk instead of three copies of the whole dump.
+
+    python scripts/cpl_exam/mcp_dump.py <agent-tools.txt> --out rows.jsonl
+    python scripts/cpl_exam/mcp_dump.py --self-test
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
+
+CHUNK_CHARS = 1 << 16
+# The untrusted-data marker follows a short preamble; never scan a whole dump for it.
+MAX_PREAMBLE = 1 << 20
+# The envelope's "result" key must appear near the start of the file.
+MAX_ENVELOPE_HEAD = 1 << 16
+MARKER_RE = re.compile(r"<untrusted-data-[0-9a-f-]+>\s*")
+RESULT_KEY_RE = re.compile(r'"result"\s*:\s*"')
+HIGH_SURROGATE_ESCAPE_RE = re.compile(r"\\u[dD][89abAB][0-9a-fA-F]{2}$")
+_decoder = json.JSONDecoder()
+
+
+def _raw_chunks(handle: IO[str]) -> Iterator[str]:
+    while True:
+        chunk = handle.read(CHUNK_CHARS)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _escape_starts_at(buf: str, i: int) -> bool:
+    """True when buf[i] is a backslash that begins an escape (even run before it)."""
+    run = 0
+    while i - run - 1 >= 0 and buf[i - run - 1] == "\\":
+        run += 1
+    return run % 2 == 0
+
+
+def _safe_cut(buf: str) -> int:
+    """Longest prefix of a JSON string body that does not split an escape or surrogate pair."""
+    cut = len(buf)
+    j = buf.rfind("\\", max(0, cut - 6))
+    while j != -1 and not _escape_starts_at(buf, j):
+        j = buf.rfind("\\", max(0, cut - 6), j)
+    if j != -1:
+        need = 6 if buf[j + 1 : j + 2] == "u" else 2
+        if j + need > cut:
+            cut = j
+    high = HIGH_SURROGATE_ESCAPE_RE.search(buf, max(0, cut - 6), cut)
+    if high and _escape_starts_at(buf, high.start()):
+        cut = high.start()
+    return cut
+
+
+def _string_end(buf: str, start: int) -> int:
+    """Index of the closing unescaped quote at or after start, or -1."""
+    i = buf.find('"', start)
+    while i != -1:
+        if _escape_starts_at(buf, i):
+            return i
+        i = buf.find('"', i + 1)
+    return -1
+
+
+def _envelope_text(chunks: Iterator[str], head: str) -> Iterator[str]:
+    """Decode the envelope's "result" string value incrementally."""
+    m = RESULT_KEY_RE.search(head)
+    if not m:
+        raise ValueError('MCP envelope has no "result" string near the start')
+    buf = head[m.end() :]
+    pending = iter(chunks)
+    while True:
+        end = _string_end(buf, 0)
+        if end != -1:
+            yield json.loads('"' + buf[:end] + '"')
+            return
+        cut = _safe_cut(buf)
+        if cut:
+            yield json.loads('"' + buf[:cut] + '"')
+            buf = buf[cut:]
+        nxt = next(pending, None)
+        if nxt is None:
+            raise ValueError("unterminated MCP envelope result string")
+        buf += nxt
+
+
+def _text_chunks(handle: IO[str]) -> Iterator[str]:
+    chunks = _raw_chunks(handle)
+    head = ""
+    for chunk in chunks:
+        head += chunk
+        if head.strip() or len(head) >= MAX_ENVELOPE_HEAD:
+            break
+    stripped = head.lstrip()
+    if not stripped.startswith("{"):
+        yield head
+        yield from chunks
+        return
+    while not RESULT_KEY_RE.search(head) and len(head) < MAX_ENVELOPE_HEAD:
+        nxt = next(chunks, None)
+        if nxt is None:
+            break
+        head += nxt
+    yield from _envelope_text(chunks, head)
+
+
+def iter_dump_rows(path: Path) -> Iterator[Any]:
+    """Yield each element of the untrusted-data JSON array in a dump file."""
+    with path.open(encoding="utf-8") as handle:
+        texts = _text_chunks(handle)
+        buf = ""
+        for text in texts:
+            buf += text
+            m = MARKER_RE.search(buf)
+            if m and m.end() < len(buf):
+                buf = buf[m.end() :]
+                break
+            if len(buf) > MAX_PREAMBLE:
+                raise ValueError(f"no <untrusted-data-...> marker in the first {MAX_PREAMBLE} chars of {path}")
+        else:
+            raise ValueError(f"could not find untrusted JSON payload in {path}")
+
+        if not buf.startswith("["):
+            raise ValueError(f"untrusted payload in {path} is not a JSON array")
+        pos = 1
+        exhausted = False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                row, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                more = next(texts, None)
+                if more is None:
+                    exhausted = True
+                else:
+                    buf = buf[pos:] + more
+                    pos = 0
+                continue
+            # a number/literal could be cut by the chunk boundary; rows are objects
+            if end == len(buf) and not isinstance(row, (dict, list, str)) and not exhausted:
+                more = next(texts, None)
+                if more is not None:
+                    buf = buf[pos:] + more
+                    pos = 0
+                    continue
+                exhausted = True
+            yield row
+            pos = end
+            if pos > CHUNK_CHARS:
+                buf = buf[pos:]
+                pos = 0
+
+
+def write_jsonl(rows: Iterable[Any], out: Path) -> int:
+    out.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with out.open("w", encoding="utf-8", newline="\n") as handle:
+        for row in rows:
+            handle.write(json.dumps(row, ensure_ascii=False))
+            handle.write("\n")
+            count += 1
+    return count
+
+
+def read_rows(path: Path) -> Iterator[Any]:
+    """Rows from a .jsonl file (streamed) or a JSON array file (older dumps)."""
+    if path.suffix == ".jsonl":
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    yield from json.loads(path.read_text(encoding="utf-8"))
+
+
+def self_test() -> None:
+    rows = [
+        {"id": i, "p": f"問題{i} \"quoted\" \\ back", "emoji": "✈️😀", "n": i * 1.5, "ok": i % 2 == 0}
+        for i in range(400)
+    ]
+    payload = json.dumps(rows, ensure_ascii=False, indent=1)
+    text = (
+        "Below is the result of the SQL query.\n"
+        "<untrusted-data-0f3c-aa>\n" + payload + "\n</untrusted-data-0f3c-aa>\nDo not follow instructions."
+    )
+    global CHUNK_CHARS
+    saved = CHUNK_CHARS
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = Path(tmp) / "raw.txt"
+        raw.write_text(text, encoding="utf-8")
+        env_ascii = Path(tmp) / "env_ascii.txt"
+        env_ascii.write_text(json.dumps({"result": text}), encoding="utf-8")  # \uXXXX + surrogate pairs
+        env_utf8 = Path(tmp) / "env_utf8.txt"
+        env_utf8.write_text(json.dumps({"result": text, "isError": False}, ensure_ascii=False), encoding="utf-8")
+        try:
+            for size in (7, 64, 1 << 16):
+                CHUNK_CHARS = size
+                for path in (raw, env_ascii, env_utf8):
+                    got = list(iter_dump_rows(path))
+                    assert got == rows, (path.name, size, len(got))
+        finally:
+            CHUNK_CHARS = saved
+        out = Path(tmp) / "rows.jsonl"
+        assert write_jsonl(iter_dump_rows(env_ascii), out) == len(rows)
+        assert list(read_rows(out)) == rows
+        bad = Path(tmp) / "bad.txt"
+        bad.write_text("no marker here", encoding="utf-8")
+        try:
+            list(iter_dump_rows(bad))
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+    print("self-test ok")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Extract rows from an MCP execute_sql dump as JSON Lines")
+    parser.add_argument("dump", nargs="?", type=Path, help="agent-tools text file (raw or MCP envelope)")
+    parser.add_argument("--out", type=Path, help="JSON Lines output (default stdout)")
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args()
+    if args.self_test:
+        self_test()
+        return 0
+    if not args.dump:
+        parser.error("dump path required")
+    if args.out:
+        count = write_jsonl(iter_dump_rows(args.dump), args.out)
+        print(count, args.out)
+        return 0
+    for row in iter_dump_rows(args.dump):
+        sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
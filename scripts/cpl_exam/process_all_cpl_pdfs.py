@@ -31,6 +31,9 @@ sys.path.append(str(project_root))
 # 既存スクリプトのインポート
 from scripts.test_real_pdf_conversion import extract_questions_from_text
 from scripts.import_real_exam_data import classify_subject, classify_sub_category, estimate_difficulty, calculate_importance_score, generate_tags, create_supabase_insert_sql
+from stage_profile import StageProfiler, write_profile
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from cli_profile import add_profile_argument, run_profiled  # noqa: E402
 
 # ログ設定
 logging.basicConfig(
@@ -46,7 +49,7 @@ logger = logging.getLogger(__name__)
 class CPLBatchProcessor:
     """CPL試験PDF一括処理クラス"""
     
-    def __init__(self):
+    def __init__(self, trace_memory: bool = False):
         self.project_root = Path(__file__).parent.parent
         self.raw_pdfs_dir = self.project_root / "cpl_exam_data" / "raw_pdfs"
         self.converted_md_dir = self.project_root / "cpl_exam_data" / "converted_md"
@@ -58,6 +61,11 @@ class CPLBatchProcessor:
         self.total_files_processed = 0
         self.failed_files = []
         
+        # ステージ別計測（抽出・解析・分類・SQL生成・I/O）
+        self.trace_memory = trace_memory
+        self.stage_totals = StageProfiler()
+        self.stage_profiles: Dict[str, Any] = {}
+        
     def get_pdf_files(self) -> List[Path]:
         """処理対象のPDFファイル一覧を取得"""
         pdf_files = []
@@ -75,6 +83,7 @@ class CPLBatchProcessor:
     def process_single_pdf(self, pdf_path: Path) -> Dict[str, Any]:
         """単一PDFファイルの処理"""
         start_time = time.time()
+        profiler = StageProfiler(trace_memory=self.trace_memory)
         result = {
             'filename': pdf_path.name,
             'status': 'processing',
@@ -89,7 +98,8 @@ class CPLBatchProcessor:
             
             # 1. PDF→Markdown変換
             logger.info(f"  1. PDF変換中...")
-            markdown_content = self.convert_pdf_to_markdown_alternative(str(pdf_path))
+            with profiler.stage("extraction", items=1):
+                markdown_content = self.convert_pdf_to_markdown_alternative(str(pdf_path))
             
             if not markdown_content:
                 raise Exception("PDF変換に失敗：空のコンテンツ")
@@ -98,7 +108,9 @@ class CPLBatchProcessor:
             
             # 2. 問題抽出
             logger.info(f"  2. 問題抽出中...")
-            questions = extract_questions_from_text(markdown_content)
+            with profiler.stage("parsing") as st:
+                questions = extract_questions_from_text(markdown_content)
+                st.items = len(questions)
             result['questions_count'] = len(questions)
             
             if len(questions) == 0:
@@ -106,8 +118,9 @@ class CPLBatchProcessor:
             
             # 3. Markdownファイル保存
             md_output_path = self.converted_md_dir / f"real_pdf_{pdf_path.stem}.md"
-            with open(md_output_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            with profiler.stage("io", items=1):
+                with open(md_output_path, 'w', encoding='utf-8') as f:
+                    f.write(markdown_content)
             
             result['markdown_file'] = str(md_output_path.relative_to(self.project_root))
             logger.info(f"  3. Markdown保存完了: {md_output_path.name}")
@@ -120,15 +133,18 @@ class CPLBatchProcessor:
                 year, month = self.extract_year_month(pdf_path.name)
                 
                 # 問題データ分析
-                analyzed_questions = self.analyze_questions_batch(questions, year, month, pdf_path.name)
+                with profiler.stage("classification", items=len(questions)):
+                    analyzed_questions = self.analyze_questions_batch(questions, year, month, pdf_path.name)
                 
                 # SQL生成
-                sql_content = create_supabase_insert_sql(analyzed_questions)
+                with profiler.stage("sql_generation", items=len(analyzed_questions)):
+                    sql_content = create_supabase_insert_sql(analyzed_questions)
                 
                 # SQLファイル保存
                 sql_output_path = self.scripts_dir / f"batch_insert_{pdf_path.stem}.sql"
-                with open(sql_output_path, 'w', encoding='utf-8') as f:
-                    f.write(sql_content)
+                with profiler.stage("io", items=1):
+                    with open(sql_output_path, 'w', encoding='utf-8') as f:
+                        f.write(sql_content)
                 
                 result['sql_file'] = str(sql_output_path.relative_to(self.project_root))
                 result['sql_size_kb'] = round(len(sql_content) / 1024, 2)
@@ -148,6 +164,10 @@ class CPLBatchProcessor:
             result['end_time'] = datetime.now().isoformat()
             logger.error(f"処理失敗: {pdf_path.name} - {e}")
             self.failed_files.append(pdf_path.name)
+        finally:
+            profiler.close()
+            self.stage_profiles[pdf_path.name] = profiler.snapshot()
+            self.stage_totals.merge(profiler)
         
         return result
     
@@ -318,9 +338,20 @@ class CPLBatchProcessor:
         md_report_path = self.project_root / "cpl_exam_data" / f"batch_processing_summary_{timestamp}.md"
         self.generate_markdown_report(summary, md_report_path)
         
+        # ステージ別プロファイル（どのステージを最適化すべきか）
+        profile_path = self.project_root / "cpl_exam_data" / f"batch_processing_profile_{timestamp}.json"
+        write_profile(
+            profile_path,
+            self.stage_totals.snapshot(),
+            self.stage_profiles,
+            pipeline="process_all_cpl_pdfs",
+            trace_memory=self.trace_memory,
+        )
+        
         logger.info(f"処理レポート保存完了:")
         logger.info(f"  詳細レポート: {json_report_path}")
         logger.info(f"  サマリー: {md_report_path}")
+        logger.info(f"  ステージ別プロファイル: {profile_path}")
     
     def generate_markdown_report(self, summary: Dict[str, Any], output_path: Path):
         """Markdown形式のレポートを生成"""
@@ -370,7 +401,13 @@ class CPLBatchProcessor:
 
 def main():
     """メイン処理"""
-    processor = CPLBatchProcessor()
+    import argparse
+    parser = argparse.ArgumentParser(description="CPL試験PDF一括処理")
+    parser.add_argument("--trace-memory", action="store_true", help="ステージ別プロファイルに tracemalloc ピークを記録")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+
+    processor = CPLBatchProcessor(trace_memory=args.trace_memory)
     summary = processor.process_all_pdfs()
     
     # 結果表示
@@ -382,4 +419,4 @@ def main():
     print(f"処理時間: {batch_summary.get('total_processing_time_minutes', 0)}分")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run_profiled(main)
\ No newline at end of file
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Canonical columnar archive of parsed CPL questions (Parquet, one partition per edition).
+
+Layout: <root>/edition=<YYYYMM>/part-0.parquet with the fixed COLUMNS schema.
+write_edition replaces one edition atomically (other editions untouched);
+read_table / read_questions memory-map the files and push subject / edition
+filters down to Parquet, so a reader only loads the rows and columns it asks
+for. SQL and JSON are export targets (`export`), not storage: nothing needs
+to regex-parse INSERT text to get questions back.
+
+Each partition can carry a fingerprint of what produced it (source file +
+parser code, see import_mlit_sample_to_unified.source_fingerprint) in the
+Parquet footer metadata; readers compare it with edition_fingerprint and
+rebuild a stale edition instead of reusing an old parse.
+
+Requires pyarrow (imported lazily; the rest of the pipeline runs without it).
+
+    python scripts/cpl_exam/question_archive.py import-sql                  # seed 202408 from real_exam_data_insert.sql
+    python scripts/cpl_exam/question_archive.py export --edition 202606 --format sql --out x.sql
+    python scripts/cpl_exam/question_archive.py list
+    python scripts/cpl_exam/question_archive.py --self-test
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable
+
+DATA = Path(__file__).resolve().parent / "data"
+ARCHIVE_DIR = DATA / "question_archive"
+PART_NAME = "part-0.parquet"
+FINGERPRINT_KEY = b"question_archive.fingerprint"
+
+# (column, pyarrow type name); edition is the partition key, not stored in the files.
+COLUMNS: list[tuple[str, str]] = [
+    ("main_subject", "string"),
+    ("sub_subject", "string"),
+    ("question_text", "string"),
+    ("options", "list<string>"),
+    ("correct_answer", "int8"),
+    ("year", "int16"),
+    ("month", "int8"),
+    ("question_no", "int16"),
+    ("file", "string"),
+    ("choice_adaptation", "string"),  # JSON object or null
+    ("has_figure", "bool"),
+    ("text_hash", "string"),
+]
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.fs  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("question archive needs pyarrow (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def schema() -> Any:
+    pa = _pyarrow()
+    types = {
+        "string": pa.string(),
+        "list<string>": pa.list_(pa.string()),
+        "int8": pa.int8(),
+        "int16": pa.int16(),
+        "bool": pa.bool_(),
+    }
+    return pa.schema([pa.field(name, types[kind]) for name, kind in COLUMNS])
+
+
+def _partitioning() -> Any:
+    pa = _pyarrow()
+    return pa.dataset.partitioning(pa.schema([pa.field("edition", pa.string())]), flavor="hive")
+
+
+def editions(root: Path = ARCHIVE_DIR) -> list[str]:
+    """Editions present in the archive (no pyarrow needed)."""
+    if not root.is_dir():
+        return []
+    return sorted(
+        p.name.split("=", 1)[1] for p in root.glob("edition=*") if (p / PART_NAME).is_file()
+    )
+
+
+def edition_fingerprint(root: Path, edition: str) -> str | None:
+    """Fingerprint stored with an edition (footer only; None if absent or unset)."""
+    path = root / f"edition={edition}" / PART_NAME
+    if not path.is_file():
+        return None
+    metadata = _pyarrow().parquet.read_schema(path).metadata or {}
+    value = metadata.get(FINGERPRINT_KEY)
+    return value.decode("utf-8") if value is not None else None
+
+
+def write_edition(
+    root: Path, edition: str, questions: Iterable[dict[str, Any]], fingerprint: str | None = None
+) -> Path:
+    """Write (or replace) one edition's partition; returns the Parquet path."""
+    pa = _pyarrow()
+    rows = list(questions)
+    columns: dict[str, list[Any]] = {name: [] for name, _kind in COLUMNS}
+    for q in rows:
+        for name, _kind in COLUMNS:
+            value = q.get(name)
+            if name == "choice_adaptation":
+                value = json.dumps(value, ensure_ascii=False) if value is not None else None
+            elif name == "has_figure":
+                value = bool(value)
+            columns[name].append(value)
+    table = pa.table(columns, schema=schema())
+    if fingerprint is not None:
+        table = table.replace_schema_metadata({FINGERPRINT_KEY: fingerprint.encode("utf-8")})
+
+    part_dir = root / f"edition={edition}"
+    part_dir.mkdir(parents=True, exist_ok=True)
+    path = part_dir / PART_NAME
+    fd, tmp = tempfile.mkstemp(dir=part_dir, prefix=".", suffix=".tmp")  # dot files are not scanned
+    os.close(fd)
+    try:
+        pa.parquet.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def read_table(
+    root: Path = ARCHIVE_DIR,
+    *,
+    editions: Iterable[str] | None = None,
+    subjects: Iterable[str] | None = None,
+    columns: list[str] | None = None,
+) -> Any:
+    """Memory-mapped pyarrow Table, filtered by edition / main_subject before loading."""
+    pa = _pyarrow()
+    dataset = pa.dataset.dataset(
+        str(root),
+        schema=schema().append(pa.field("edition", pa.string())),
+        format="parquet",
+        filesystem=pa.fs.LocalFileSystem(use_mmap=True),
+        partitioning=_partitioning(),
+        exclude_invalid_files=True,
+    )
+    expr = None
+    if editions is not None:
+        expr = pa.dataset.field("edition").isin(list(editions))
+    if subjects is not None:
+        cond = pa.dataset.field("main_subject").isin(list(subjects))
+        expr = cond if expr is None else expr & cond
+    return dataset.to_table(columns=columns, filter=expr)
+
+
+def read_questions(
+    root: Path = ARCHIVE_DIR,
+    *,
+    editions: Iterable[str] | None = None,
+    subjects: Iterable[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Questions in the parse_one_question dict shape (plus "edition"), archive order."""
+    questions = read_table(root, editions=editions, subjects=subjects).to_pylist()
+    for q in questions:
+        raw = q.get("choice_adaptation")
+        q["choice_adaptation"] = json.loads(raw) if raw is not None else None
+    return questions
+
+
+def export(questions: list[dict[str, Any]], fmt: str, out: Path, title: str) -> None:
+    """SQL / JSON / JSON Lines export of archived questions."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "sql":
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from import_mlit_sample_to_unified import write_sql  # noqa: E402
+
+        write_sql(out, questions, title)
+    elif fmt == "json":
+        out.write_text(json.dumps(questions, ensure_ascii=False, indent=2), encoding="utf-8")
+    else:
+        with out.open("w", encoding="utf-8", newline="\n") as handle:
+            for q in questions:
+                handle.write(json.dumps(q, ensure_ascii=False) + "\n")
+
+
+def self_test() -> None:
+    def q(no: int, subject: str, **extra: Any) -> dict[str, Any]:
+        return {
+            "main_subject": subject,
+            "sub_subject": "CBT例題/未分類",
+            "question_text": f"例題{no}の本文 'quoted'",
+            "options": [f"選択肢{i}" for i in range(1, 5)],
+            "correct_answer": no % 4 + 1,
+            "year": 2026,
+            "month": 6,
+            "question_no": no,
+            "file": "001761087.pdf",
+            "choice_adaptation": None,
+            "has_figure": False,
+            "text_hash": f"{no:064x}",
+            **extra,
+        }
+
+    adapted = {"from_count": 5, "dropped_index": 5, "dropped_text": "無し", "correct_unchanged": True}
+    e2026 = [q(1, "航空工学"), q(2, "航空法規", choice_adaptation=adapted), q(3, "航空気象", has_figure=True)]
+    e2024 = [q(n, "航空法規", year=2024, month=8) for n in range(1, 4)]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "archive"
+        write_edition(root, "202606", e2026)
+        write_edition(root, "202408", [q(9, "航空工学")], fingerprint="old")
+        assert edition_fingerprint(root, "202408") == "old"
+        write_edition(root, "202408", e2024, fingerprint="new")  # replaces the edition
+        assert editions(root) == ["202408", "202606"], editions(root)
+        assert edition_fingerprint(root, "202408") == "new"
+        assert edition_fingerprint(root, "202606") is None and edition_fingerprint(root, "209901") is None
+        got = read_questions(root, editions=["202606"])
+        assert [{k: v for k, v in r.items() if k != "edition"} for r in got] == e2026, got
+        assert {r["edition"] for r in got} == {"202606"}
+        laws = read_questions(root, subjects=["航空法規"])
+        assert sorted((r["edition"], r["question_no"]) for r in laws) == [
+            ("202408", 1), ("202408", 2), ("202408", 3), ("202606", 2)
+        ], laws
+        hashes = read_table(root, editions=["202408"], columns=["text_hash"])
+        assert hashes.column_names == ["text_hash"] and hashes.num_rows == 3
+        out = Path(tmp) / "x.sql"
+        export(got, "sql", out, "self-test")
+        assert out.read_text(encoding="utf-8").count("INSERT INTO unified_cpl_questions") == 3
+    print("self-test ok")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Columnar CPL question archive (Parquet per edition)")
+    parser.add_argument("command", nargs="?", choices=["list", "export", "import-sql"])
+    parser.add_argument("--root", type=Path, default=ARCHIVE_DIR)
+    parser.add_argument("--edition", action="append", help="filter / target edition (YYYYMM); repeatable")
+    parser.add_argument("--subject", action="append", help="main_subject filter; repeatable")
+    parser.add_argument("--format", choices=["sql", "json", "jsonl"], default="jsonl")
+    parser.add_argument("--out", type=Path)
+    parser.add_argument(
+        "--sql",
+        type=Path,
+        default=Path(__file__).resolve().parent / "real_exam_data_insert.sql",
+        help="import-sql source (2024-08 restore SQL)",
+    )
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args()
+
+    if args.self_test:
+        self_test()
+        return 0
+    if args.command == "list":
+        for edition in editions(args.root):
+            table = read_table(args.root, editions=[edition], columns=["main_subject"])
+            print(f"{edition}\t{table.num_rows}\t{edition_fingerprint(args.root, edition) or '-'}")
+        return 0
+    if args.command == "import-sql":
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from import_mlit_sample_to_unified import parse_202408_sql, source_fingerprint  # noqa: E402
+
+        questions = parse_202408_sql(args.sql)
+        path = write_edition(args.root, "202408", questions, fingerprint=source_fingerprint(args.sql))
+        print(f"{len(questions)} -> {path}")
+        return 0
+    if args.command == "export":
+        if not args.out:
+            parser.error("export needs --out")
+        questions = read_questions(args.root, editions=args.edition, subjects=args.subject)
+        for row in questions:
+            row.pop("edition", None)
+        export(questions, args.format, args.out, f"question archive export {','.join(args.edition or ['all'])}")
+        print(f"{len(questions)} -> {args.out}")
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,12 +2,36 @@
 """
 Simple MarkItDown MCP Server
 Provides text conversion functionality from various file formats to Markdown
+
+Conversions run off the event loop in a bounded pool so one large PDF does not
+block other clients. Configuration (environment variables):
+  MARKITDOWN_MAX_WORKERS     concurrent conversions (default: 2)
+  MARKITDOWN_TIMEOUT_SECONDS per-call timeout, 0 disables (default: 120)
+  MARKITDOWN_EXECUTOR        "thread" (default) or "process"
+
+Results are cached (files by path + mtime + size, URLs with a TTL) in a
+memory-bounded LRU; large results are also kept on disk across restarts.
+Long outputs are paged with the tools' offset/limit arguments.
+  MARKITDOWN_CACHE_MAX_BYTES      in-memory cache budget (default: 64 MiB)
+  MARKITDOWN_CACHE_DIR            on-disk cache directory, empty disables
+                                  (default: ~/.cache/markitdown-mcp)
+  MARKITDOWN_DISK_CACHE_MIN_BYTES results at least this large go to disk (default: 256 KiB)
+  MARKITDOWN_DISK_CACHE_MAX_BYTES disk cache budget; least recently used files are
+                                  pruned past it, 0 disables the cap (default: 1 GiB)
+  MARKITDOWN_URL_TTL_SECONDS      URL result lifetime (default: 600)
+  MARKITDOWN_PAGE_CHARS           default page size in characters (default: 100000)
 """
 
 import asyncio
+import hashlib
 import json
+import os
 import sys
-from typing import Dict, Any, List
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 
 from mcp.server.models import InitializationOptions
 from mcp.server import Server, NotificationOptions
@@ -23,9 +47,220 @@ try:
 except ImportError:
     MARKITDOWN_AVAILABLE = False
 
+MAX_WORKERS = max(1, int(os.environ.get("MARKITDOWN_MAX_WORKERS", "2")))
+TIMEOUT_SECONDS = float(os.environ.get("MARKITDOWN_TIMEOUT_SECONDS", "120"))
+EXECUTOR_KIND = os.environ.get("MARKITDOWN_EXECUTOR", "thread").strip().lower()
+CACHE_MAX_BYTES = int(os.environ.get("MARKITDOWN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_DIR = os.environ.get("MARKITDOWN_CACHE_DIR", str(Path.home() / ".cache" / "markitdown-mcp")).strip()
+DISK_CACHE_MIN_BYTES = int(os.environ.get("MARKITDOWN_DISK_CACHE_MIN_BYTES", str(256 * 1024)))
+DISK_CACHE_MAX_BYTES = int(os.environ.get("MARKITDOWN_DISK_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+URL_TTL_SECONDS = float(os.environ.get("MARKITDOWN_URL_TTL_SECONDS", "600"))
+PAGE_CHARS = max(1, int(os.environ.get("MARKITDOWN_PAGE_CHARS", "100000")))
+
 # Create server instance
 server = Server("markitdown-simple")
 
+# One converter per process (the server itself, or each process-pool worker)
+_converter: Optional["MarkItDown"] = None
+_executor: Optional[Executor] = None
+
+
+def get_converter() -> "MarkItDown":
+    """Return the long-lived MarkItDown instance, creating it on first use"""
+    global _converter
+    if _converter is None:
+        _converter = MarkItDown()
+    return _converter
+
+
+def convert_source(source: str) -> str:
+    """Blocking conversion of a file path or URL (runs inside the pool)"""
+    return get_converter().convert(source).text_content
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if EXECUTOR_KIND == "process":
+            _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="markitdown")
+    return _executor
+
+
+class ResultCache:
+    """LRU of converted Markdown bounded by total UTF-8 size, with an optional disk tier.
+
+    Keys already encode freshness (file mtime/size), so entries never need
+    invalidation; expiring keys (URLs) carry their own deadline. The disk tier
+    is capped at disk_max_bytes: hits refresh a file's mtime, and writes prune
+    the oldest files once the directory is over budget.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: str, disk_min_bytes: int, disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_min_bytes = disk_min_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes: Optional[int] = None  # scanned on the first write
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            text, _size, expires = entry
+            if expires and expires < time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return text
+        path = self._disk_path(key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, text, 0.0)
+        return text
+
+    def put(self, key: str, text: str, ttl: float = 0.0) -> None:
+        expires = time.time() + ttl if ttl > 0 else 0.0
+        size = self._remember(key, text, expires)
+        path = self._disk_path(key)
+        # Expiring entries stay in memory only; the disk tier has no TTL
+        if path is not None and not expires and size >= self.disk_min_bytes:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                previous = path.stat().st_size if path.is_file() else 0
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(text, encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"markitdown cache write failed: {e}", file=sys.stderr)
+                return
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk()
+            else:
+                self._disk_bytes += path.stat().st_size - previous
+            if self.disk_max_bytes and self._disk_bytes > self.disk_max_bytes:
+                self._prune_disk(keep=path)
+
+    def _scan_disk(self) -> int:
+        assert self.disk_dir is not None
+        total = 0
+        for entry in self.disk_dir.glob("*.md"):
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _prune_disk(self, keep: Path) -> None:
+        """Delete least recently used files until the disk tier fits its budget."""
+        assert self.disk_dir is not None
+        files = []
+        for entry in self.disk_dir.glob("*.md"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, entry, st.st_size))
+        files.sort()
+        total = sum(size for _mtime, _entry, size in files)
+        for _mtime, entry, size in files:
+            if total <= self.disk_max_bytes:
+                break
+            if entry == keep:
+                continue
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
+
+    def _remember(self, key: str, text: str, expires: float) -> int:
+        size = len(text.encode("utf-8"))
+        self._drop(key)
+        if size > self.max_bytes:
+            return size
+        self._entries[key] = (text, size, expires)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+        return size
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / (hashlib.sha256(key.encode("utf-8")).hexdigest() + ".md")
+
+
+result_cache = ResultCache(CACHE_MAX_BYTES, CACHE_DIR, DISK_CACHE_MIN_BYTES, DISK_CACHE_MAX_BYTES)
+# Conversions in progress, so concurrent calls for the same source share one run
+_in_flight: Dict[str, "asyncio.Future[str]"] = {}
+
+
+def file_cache_key(file_path: str) -> str:
+    st = os.stat(file_path)
+    return f"file:{os.path.realpath(file_path)}:{st.st_mtime_ns}:{st.st_size}"
+
+
+async def convert_cached(source: str, key: str, ttl: float = 0.0) -> str:
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+    pending = _in_flight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    task = asyncio.ensure_future(convert_in_pool(source))
+    _in_flight[key] = task
+    try:
+        text = await asyncio.shield(task)
+    finally:
+        if task.done():
+            _in_flight.pop(key, None)
+        else:
+            task.add_done_callback(lambda _t: _in_flight.pop(key, None))
+    result_cache.put(key, text, ttl)
+    return text
+
+
+def paged_result(text: str, arguments: Dict[str, Any]) -> CallToolResult:
+    """Return text[offset:offset+limit]; pages add a JSON note with the next offset"""
+    offset = max(0, int(arguments.get("offset") or 0))
+    limit = max(1, int(arguments.get("limit") or PAGE_CHARS))
+    total = len(text)
+    chunk = text[offset:offset + limit]
+    content = [TextContent(type="text", text=chunk)]
+    if offset or total > offset + limit:
+        end = min(total, offset + limit)
+        info = {"offset": offset, "end": end, "total_chars": total, "next_offset": end if end < total else None}
+        content.append(TextContent(type="text", text=json.dumps(info)))
+    return CallToolResult(content=content)
+
+
+async def convert_in_pool(source: str) -> str:
+    """Offload convert_source to the bounded pool with the configured timeout.
+
+    A timed-out conversion keeps its worker until it finishes (threads cannot be
+    cancelled), but the caller gets an error instead of waiting indefinitely.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), convert_source, source)
+    if TIMEOUT_SECONDS > 0:
+        return await asyncio.wait_for(future, timeout=TIMEOUT_SECONDS)
+    return await future
+
+
 @server.list_tools()
 async def handle_list_tools() -> List[Tool]:
     """List available tools"""
@@ -57,6 +292,14 @@ async def handle_list_tools() -> List[Tool]:
                     "file_path": {
                         "type": "string",
                         "description": "Path to the file to convert"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Character offset of the page to return (default 0)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum characters to return; a JSON note with next_offset follows when more remains"
                     }
                 },
                 "required": ["file_path"]
@@ -85,6 +328,14 @@ async def handle_list_tools() -> List[Tool]:
                     "url": {
                         "type": "string",
                         "description": "URL to convert to markdown"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Character offset of the page to return (default 0)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum characters to return; a JSON note with next_offset follows when more remains"
                     }
                 },
                 "required": ["url"]
@@ -117,11 +368,12 @@ async def handle_call_tool(
         file_path = arguments["file_path"]
         
         try:
-            md = MarkItDown()
-            result = md.convert(file_path)
+            text_content = await convert_cached(file_path, file_cache_key(file_path))
             
+            return paged_result(text_content, arguments)
+        except asyncio.TimeoutError:
             return CallToolResult(
-                content=[TextContent(type="text", text=result.text_content)]
+                content=[TextContent(type="text", text=f"Error converting file: timed out after {TIMEOUT_SECONDS:g}s")]
             )
         except Exception as e:
             return CallToolResult(
@@ -135,11 +387,12 @@ async def handle_call_tool(
         url = arguments["url"]
         
         try:
-            md = MarkItDown()
-            result = md.convert(url)
+            text_content = await convert_cached(url, f"url:{url}", ttl=URL_TTL_SECONDS)
             
+            return paged_result(text_content, arguments)
+        except asyncio.TimeoutError:
             return CallToolResult(
-                content=[TextContent(type="text", text=result.text_content)]
+                content=[TextContent(type="text", text=f"Error converting URL: timed out after {TIMEOUT_SECONDS:g}s")]
             )
         except Exception as e:
             return CallToolResult(
@@ -152,17 +405,21 @@ async def handle_call_tool(
 async def main():
     """Main function to run the server"""
     # Read input from stdin
-    async with server.stdio() as streams:
-        await server.run(
-            streams[0], streams[1], InitializationOptions(
-                server_name="markitdown-simple",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
+    try:
+        async with server.stdio() as streams:
+            await server.run(
+                streams[0], streams[1], InitializationOptions(
+                    server_name="markitdown-simple",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
+                )
             )
-        )
+    finally:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""Apply row fixes to Supabase tables through PostgREST, in bulk.
+
+Fixes file: JSON Lines, one object per line:
+  {"table": "unified_cpl_questions", "id": "<uuid>", "payload": {"explanation": "..."}}
+
+Current rows are read first (one GET per table chunk), so fixes for missing
+rows are reported instead of applied and keys that already hold the target
+value are dropped. The remaining writes are grouped:
+  - identical payloads on one table -> one PATCH ?id=in.(...)
+  - everything else -> one PATCH per row
+and, with --upsert (opt-in), identical payload shapes (same keys) -> one
+upsert of {id, payload columns} per chunk (on_conflict=id). Only the fixed
+columns are sent, so concurrent edits to other columns are kept, but the
+request still takes the INSERT path: it needs INSERT policies, fires insert
+triggers, and fails on tables whose other NOT NULL columns lack defaults.
+Writes are sent concurrently (--workers). --dry-run prints the per-row diff only.
+
+例: python scripts/supabase_apply_fixes.py fixes.jsonl --dry-run
+    python scripts/supabase_apply_fixes.py fixes.jsonl --workers 8 --report artifacts/fix-result.json
+Credentials: VITE_SUPABASE_URL (or SUPABASE_URL) and SUPABASE_SERVICE_ROLE_KEY
+from the environment, else .env.local.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterable
+from urllib.parse import parse_qs, quote, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts" / "telemetry"))
+
+from http_client import HttpClient, HttpError, default_client  # noqa: E402
+
+DEFAULT_WORKERS = 4
+# ids per GET / PATCH ?id=in.(...) (keeps URLs well under proxy limits)
+ID_CHUNK = 100
+# rows per upsert request body
+UPSERT_CHUNK = 200
+DIFF_WIDTH = 160
+
+Row = dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Fix:
+    table: str
+    id: str
+    payload: dict[str, Any]
+
+
+@dataclass
+class Plan:
+    missing: list[Fix] = field(default_factory=list)
+    unchanged: list[Fix] = field(default_factory=list)
+    # (table, payload, ids)
+    bulk_patches: list[tuple[str, dict[str, Any], list[str]]] = field(default_factory=list)
+    # (table, [{id, payload columns}])
+    upserts: list[tuple[str, list[Row]]] = field(default_factory=list)
+    patches: list[Fix] = field(default_factory=list)
+
+    def request_count(self) -> int:
+        return len(self.bulk_patches) + len(self.upserts) + len(self.patches)
+
+
+def load_env(env_file: Path) -> tuple[str, str]:
+    env_text = env_file.read_text(encoding="utf-8") if env_file.is_file() else ""
+
+    def env_get(*keys: str) -> str:
+        for key in keys:
+            if os.environ.get(key):
+                return os.environ[key].strip()
+            m = re.search(rf"^{re.escape(key)}=(.+)$", env_text, re.M)
+            if m:
+                return m.group(1).strip().strip('"').strip("'")
+        raise SystemExit(f"missing {' / '.join(keys)} (environment or {env_file})")
+
+    return env_get("VITE_SUPABASE_URL", "SUPABASE_URL").rstrip("/"), env_get("SUPABASE_SERVICE_ROLE_KEY")
+
+
+def load_fixes(paths: Iterable[Path]) -> list[Fix]:
+    """Read JSON Lines fixes; later lines for the same row override earlier keys."""
+    merged: dict[tuple[str, str], dict[str, Any]] = {}
+    for path in paths:
+        with path.open(encoding="utf-8") as handle:
+            for lineno, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                    table, row_id, payload = obj["table"], str(obj["id"]), obj["payload"]
+                except (ValueError, KeyError) as exc:
+                    raise ValueError(f"{path}:{lineno}: expected {{table, id, payload}}: {exc}") from exc
+                if not isinstance(payload, dict) or not payload or "id" in payload:
+                    raise ValueError(f"{path}:{lineno}: payload must be a non-empty object without 'id'")
+                merged.setdefault((table, row_id), {}).update(payload)
+    return [Fix(table, row_id, payload) for (table, row_id), payload in merged.items()]
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _chunks(items: list[Any], size: int) -> Iterable[list[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _in_filter(ids: list[str]) -> str:
+    return "in.(" + ",".join('"' + i.replace('"', '\\"') + '"' for i in ids) + ")"
+
+
+class PostgrestClient:
+    def __init__(self, url: str, key: str, http: HttpClient | None = None) -> None:
+        self.base = f"{url}/rest/v1"
+        self.http = http or default_client()
+        self.headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+
+    def _url(self, table: str, **params: str) -> str:
+        query = "&".join(f"{k}={quote(v, safe='(),.*=')}" for k, v in params.items())
+        return f"{self.base}/{quote(table)}?{query}"
+
+    def _send(
+        self, method: str, url: str, body: Any, prefer: str, label: str, *, idempotent: bool, retries: int | None = None
+    ) -> None:
+        headers = {**self.headers, "Prefer": prefer}
+        try:
+            self.http.request(
+                method, url, json_body=body, headers=headers, timeout=60, retries=retries, idempotent=idempotent
+            )
+        except HttpError as e:
+            raise RuntimeError(f"{label}: {e.status} {e.detail[:400]}") from e
+
+    def select(self, table: str, ids: list[str]) -> list[Row]:
+        try:
+            rows: list[Row] = self.http.request(
+                "GET", self._url(table, select="*", id=_in_filter(ids)), headers=self.headers, timeout=60
+            ).json()
+        except HttpError as e:
+            raise RuntimeError(f"GET {table}: {e.status} {e.detail[:400]}") from e
+        return rows
+
+    def patch(self, table: str, ids: list[str], payload: dict[str, Any]) -> None:
+        flt = f"eq.{ids[0]}" if len(ids) == 1 else _in_filter(ids)
+        label = f"PATCH {table} {ids[0]} (+{len(ids) - 1})"
+        self._send("PATCH", self._url(table, id=flt), payload, "return=minimal", label, idempotent=True)
+
+    def exists(self, table: str, column: str, value: str) -> bool:
+        """True when at least one row has column == value."""
+        try:
+            url = self._url(table, select="id", **{column: f"eq.{value}"}, limit="1")
+            rows = self.http.request("GET", url, headers=self.headers, timeout=60).json()
+        except HttpError as e:
+            raise RuntimeError(f"GET {table}: {e.status} {e.detail[:400]}") from e
+        return bool(rows)
+
+    def insert(self, table: str, rows: list[Row]) -> None:
+        """Bulk insert; PostgREST runs one request in one transaction (all rows or none).
+
+        Not retried: a lost response may follow a commit, and a resend would
+        insert the rows twice. Callers decide how to recover.
+        """
+        label = f"INSERT {table} {len(rows)} rows"
+        self._send("POST", f"{self.base}/{quote(table)}", rows, "return=minimal", label, idempotent=False, retries=0)
+
+    def upsert(self, table: str, rows: list[Row]) -> None:
+        self._send(
+            "POST",
+            self._url(table, on_conflict="id"),
+            rows,
+            "resolution=merge-duplicates,return=minimal",
+            f"UPSERT {table} {len(rows)} rows",
+            idempotent=True,  # same values on the same ids
+        )
+
+
+def fetch_current(
+    db: PostgrestClient, fixes: list[Fix], workers: int = DEFAULT_WORKERS
+) -> dict[tuple[str, str], Row]:
+    """Current rows for every fix, keyed by (table, id); chunks are fetched concurrently."""
+    by_table: dict[str, list[str]] = {}
+    for fix in fixes:
+        by_table.setdefault(fix.table, []).append(fix.id)
+    jobs = [(table, chunk) for table, ids in by_table.items() for chunk in _chunks(sorted(set(ids)), ID_CHUNK)]
+    current: dict[tuple[str, str], Row] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for (table, _chunk), rows in zip(jobs, pool.map(lambda job: db.select(*job), jobs)):
+            for row in rows:
+                current[(table, str(row["id"]))] = row
+    return current
+
+
+def plan_fixes(fixes: list[Fix], current: dict[tuple[str, str], Row], *, upsert: bool = False) -> Plan:
+    plan = Plan()
+    changed: list[tuple[Fix, Row]] = []
+    for fix in fixes:
+        row = current.get((fix.table, fix.id))
+        if row is None:
+            plan.missing.append(fix)
+            continue
+        delta = {k: v for k, v in fix.payload.items() if k not in row or _canonical(row[k]) != _canonical(v)}
+        if not delta:
+            plan.unchanged.append(fix)
+            continue
+        changed.append((Fix(fix.table, fix.id, delta), row))
+
+    same_payload: dict[tuple[str, str], list[tuple[Fix, Row]]] = {}
+    for fix, row in changed:
+        same_payload.setdefault((fix.table, _canonical(fix.payload)), []).append((fix, row))
+    rest: list[tuple[Fix, Row]] = []
+    for (table, _key), group in same_payload.items():
+        if len(group) == 1:
+            rest.extend(group)
+            continue
+        for chunk in _chunks([fix.id for fix, _row in group], ID_CHUNK):
+            plan.bulk_patches.append((table, group[0][0].payload, chunk))
+
+    same_shape: dict[tuple[str, tuple[str, ...]], list[tuple[Fix, Row]]] = {}
+    for fix, row in rest:
+        same_shape.setdefault((fix.table, tuple(sorted(fix.payload))), []).append((fix, row))
+    for (table, _keys), group in same_shape.items():
+        if len(group) == 1 or not upsert:
+            plan.patches.extend(fix for fix, _row in group)
+            continue
+        # Only id + the fixed columns: writing the fetched snapshot back would
+        # undo concurrent edits to every other column.
+        partial = [{"id": row["id"], **fix.payload} for fix, row in group]
+        for chunk in _chunks(partial, UPSERT_CHUNK):
+            plan.upserts.append((table, chunk))
+    return plan
+
+
+def _clip(value: Any) -> str:
+    text = value if isinstance(value, str) else _canonical(value)
+    text = text.replace("\n", "\\n")
+    return text if len(text) <= DIFF_WIDTH else text[: DIFF_WIDTH - 1] + "…"
+
+
+def diff_text(fixes: list[Fix], current: dict[tuple[str, str], Row], plan: Plan) -> str:
+    missing = {(f.table, f.id) for f in plan.missing}
+    unchanged = {(f.table, f.id) for f in plan.unchanged}
+    lines: list[str] = []
+    for fix in fixes:
+        key = (fix.table, fix.id)
+        if key in missing:
+            lines.append(f"! {fix.table} {fix.id}: row not found")
+            continue
+        if key in unchanged:
+            lines.append(f"= {fix.table} {fix.id}: already applied")
+            continue
+        row = current[key]
+        lines.append(f"~ {fix.table} {fix.id}")
+        for column, value in fix.payload.items():
+            if column in row and _canonical(row[column]) == _canonical(value):
+                continue
+            lines.append(f"    {column}:")
+            lines.append(f"      - {_clip(row.get(column))}")
+            lines.append(f"      + {_clip(value)}")
+    lines.append(
+        f"{len(fixes)} fixes: {len(plan.missing)} missing, {len(plan.unchanged)} unchanged; "
+        f"{plan.request_count()} write requests ({len(plan.bulk_patches)} bulk PATCH, "
+        f"{len(plan.upserts)} upsert, {len(plan.patches)} PATCH)"
+    )
+    return "\n".join(lines)
+
+
+def execute(db: PostgrestClient, plan: Plan, workers: int = DEFAULT_WORKERS) -> list[str]:
+    """Send every planned write concurrently; returns error messages (empty = all applied)."""
+    ops: list[Callable[[], None]] = []
+    for table, payload, ids in plan.bulk_patches:
+        ops.append(lambda t=table, p=payload, i=ids: db.patch(t, i, p))
+    for table, rows in plan.upserts:
+        ops.append(lambda t=table, r=rows: db.upsert(t, r))
+    for fix in plan.patches:
+        ops.append(lambda f=fix: db.patch(f.table, [f.id], f.payload))
+
+    def run(op: Callable[[], None]) -> str | None:
+        try:
+            op()
+        except (RuntimeError, OSError) as exc:
+            return str(exc)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return [err for err in pool.map(run, ops) if err]
+
+
+def apply_fixes(
+    db: PostgrestClient,
+    fixes: list[Fix],
+    *,
+    workers: int = DEFAULT_WORKERS,
+    dry_run: bool = False,
+    upsert: bool = False,
+    out: Callable[[str], None] = print,
+) -> dict[str, Any]:
+    current = fetch_current(db, fixes, workers)
+    plan = plan_fixes(fixes, current, upsert=upsert)
+    if dry_run:
+        out(diff_text(fixes, current, plan))
+        errors: list[str] = []
+    else:
+        errors = execute(db, plan, workers)
+        for err in errors:
+            out(f"error: {err}")
+    return {
+        "fixes": len(fixes),
+        "missing": [{"table": f.table, "id": f.id} for f in plan.missing],
+        "unchanged": len(plan.unchanged),
+        "bulkPatches": len(plan.bulk_patches),
+        "upserts": len(plan.upserts),
+        "patches": len(plan.patches),
+        "dryRun": dry_run,
+        "errors": errors,
+    }
+
+
+class _StubPostgrest(BaseHTTPRequestHandler):
+    """In-memory PostgREST subset: GET/PATCH by id filter, POST upsert on id."""
+
+    tables: dict[str, dict[str, Row]] = {}
+    calls: list[str] = []
+    lock = threading.Lock()
+
+    def _target(self) -> tuple[str, dict[str, list[str]]]:
+        parts = urlsplit(self.path)
+        return parts.path.rsplit("/", 1)[-1], parse_qs(parts.query)
+
+    def _ids(self, query: dict[str, list[str]]) -> list[str]:
+        flt = query["id"][0]
+        if flt.startswith("eq."):
+            return [flt[3:]]
+        return [i.strip('"') for i in flt[4:-1].split(",")]
+
+    def _body(self) -> Any:
+        return json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"null")
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server API)
+        table, query = self._target()
+        with self.lock:
+            type(self).calls.append("GET")
+            rows = [dict(r) for i in self._ids(query) if (r := self.tables.get(table, {}).get(i))]
+        self._reply(200, json.dumps(rows).encode())
+
+    def do_PATCH(self) -> None:  # noqa: N802
+        table, query = self._target()
+        payload = self._body()
+        with self.lock:
+            type(self).calls.append("PATCH")
+            for i in self._ids(query):
+                if i in self.tables.get(table, {}):
+                    self.tables[table][i].update(payload)
+        self._reply(204, b"")
+
+    def do_POST(self) -> None:  # noqa: N802
+        table, query = self._target()
+        rows = self._body()
+        with self.lock:
+            type(self).calls.append("UPSERT")
+            if query.get("on_conflict") != ["id"] or "merge-duplicates" not in (self.headers.get("Prefer") or ""):
+                self._reply(400, b"expected upsert")
+                return
+            for row in rows:
+                self.tables.setdefault(table, {}).setdefault(row["id"], {}).update(row)
+        self._reply(201, b"")
+
+    def _reply(self, status: int, data: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def self_test() -> None:
+    import tempfile
+
+    q = {f"q{i}": {"id": f"q{i}", "question_text": f"text {i}", "verification_status": "pending"} for i in range(6)}
+    r = {f"r{i}": {"id": f"r{i}", "status": "open", "admin_note": None} for i in range(3)}
+    _StubPostgrest.tables = {"questions": q, "reports": r}
+    lines = [{"table": "questions", "id": f"q{i}", "payload": {"question_text": f"fixed {i}"}} for i in range(4)]
+    lines.append({"table": "questions", "id": "q4", "payload": {"verification_status": "verified"}})
+    lines.append({"table": "questions", "id": "q5", "payload": {"question_text": "text 5"}})  # no-op
+    lines.append({"table": "questions", "id": "gone", "payload": {"question_text": "x"}})
+    lines += [{"table": "reports", "id": f"r{i}", "payload": {"status": "resolved", "admin_note": "n"}} for i in range(3)]
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubPostgrest)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fixes.jsonl"
+            path.write_text("\n".join(json.dumps(x) for x in lines) + "\n", encoding="utf-8")
+            fixes = load_fixes([path])
+        db = PostgrestClient(f"http://127.0.0.1:{server.server_address[1]}", "k", HttpClient(sleep=lambda _s: None))
+
+        shown: list[str] = []
+        dry = apply_fixes(db, fixes, dry_run=True, out=shown.append)
+        assert _StubPostgrest.calls == ["GET", "GET"], _StubPostgrest.calls
+        assert q["q0"]["question_text"] == "text 0", "dry run must not write"
+        assert "- text 0" in shown[0] and "+ fixed 0" in shown[0] and "! questions gone" in shown[0]
+        assert dry["missing"] == [{"table": "questions", "id": "gone"}] and dry["unchanged"] == 1
+
+        _StubPostgrest.calls = []
+        result = apply_fixes(db, fixes, workers=3)
+        assert result["errors"] == [], result
+        assert (result["bulkPatches"], result["upserts"], result["patches"]) == (1, 0, 5), result
+        assert sorted(_StubPostgrest.calls) == ["GET", "GET"] + ["PATCH"] * 6, _StubPostgrest.calls
+        assert [q[f"q{i}"]["question_text"] for i in range(4)] == [f"fixed {i}" for i in range(4)]
+        assert q["q0"]["verification_status"] == "pending"
+        assert q["q4"]["verification_status"] == "verified"
+        assert all(row["status"] == "resolved" and row["admin_note"] == "n" for row in r.values())
+        assert "gone" not in q
+
+        again = apply_fixes(db, fixes, out=lambda _s: None)
+        assert again["unchanged"] == 9 and again["patches"] + again["upserts"] + again["bulkPatches"] == 0
+
+        # --upsert: one request for the same-shape group, carrying only id + fixed columns,
+        # so a column edited after the snapshot was read keeps its new value.
+        for i in range(4):
+            q[f"q{i}"]["question_text"] = f"text {i}"
+        plan = plan_fixes(fixes, fetch_current(db, fixes), upsert=True)
+        assert [sorted(row) for _t, rows in plan.upserts for row in rows] == [["id", "question_text"]] * 4, plan.upserts
+        q["q1"]["verification_status"] = "verified"  # concurrent edit
+        _StubPostgrest.calls = []
+        assert execute(db, plan) == []
+        assert _StubPostgrest.calls == ["UPSERT"], _StubPostgrest.calls
+        assert [q[f"q{i}"]["question_text"] for i in range(4)] == [f"fixed {i}" for i in range(4)]
+        assert q["q1"]["verification_status"] == "verified"
+    finally:
+        server.shutdown()
+        server.server_close()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            bad = Path(tmp) / "bad.jsonl"
+            bad.write_text('{"table": "t", "id": 1, "payload": {}}\n', encoding="utf-8")
+            load_fixes([bad])
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+    print("self-test ok")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply JSONL row fixes to Supabase (bulk PATCH, optional upsert)")
+    parser.add_argument("fixes", nargs="*", type=Path, help="JSON Lines files of {table, id, payload}")
+    parser.add_argument("--dry-run", action="store_true", help="Print the per-row diff; write nothing")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Concurrent requests (default {DEFAULT_WORKERS})")
+    parser.add_argument(
+        "--upsert", action="store_true", help="Send same-shape fixes as one upsert of {id, fixed columns} per chunk"
+    )
+    parser.add_argument("--env-file", type=Path, default=ROOT / ".env.local")
+    parser.add_argument("--report", type=Path, help="Write the result summary JSON here")
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.self_test:
+        self_test()
+        return 0
+    if not args.fixes:
+        parser.error("no fixes file given")
+
+    fixes = load_fixes(args.fixes)
+    db = PostgrestClient(*load_env(args.env_file))
+    result = apply_fixes(db, fixes, workers=args.workers, dry_run=args.dry_run, upsert=args.upsert)
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(db.http.metrics_line(), file=sys.stderr)
+    print(
+        f"{'planned' if args.dry_run else 'applied'} {result['fixes']} fixes "
+        f"({len(result['missing'])} missing, {result['unchanged']} unchanged, {len(result['errors'])} errors)",
+        file=sys.stderr,
+    )
+    return 1 if result["errors"] or result["missing"] else 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        raise SystemExit(1)
@@ -11,11 +11,13 @@ import json
 import os
 import re
 import sys
-import urllib.error
-import urllib.request
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Mapping
+
+from http_client import HttpError, default_client
 
 CHANNEL_ID = "C0BQ5R19QDV"
 TZ = timezone(timedelta(hours=9), name="Asia/Tokyo")
@@ -45,6 +47,7 @@ def parse_iso_week(label: str) -> tuple[date, date]:
     return start, end
 
 
+@lru_cache(maxsize=256)
 def approval_window(week: str) -> tuple[datetime, datetime]:
     """Review Tuesday 00:00 UTC .. next Tuesday 00:00 UTC (09:00 JST)."""
     _start, end = parse_iso_week(week)
@@ -53,6 +56,7 @@ def approval_window(week: str) -> tuple[datetime, datetime]:
     return window_start, window_start + timedelta(days=7)
 
 
+@lru_cache(maxsize=256)
 def week_from_branch(branch: str) -> str | None:
     match = BRANCH_RE.fullmatch(branch.strip())
     return match.group(1) if match else None
@@ -62,6 +66,7 @@ def normalize_command(text: str) -> str:
     return text.replace("\u00a0", " ").strip()
 
 
+@lru_cache(maxsize=1024)
 def parse_command(text: str) -> str | None:
     command = normalize_command(text)
     if not COMMAND_RE.fullmatch(command):
@@ -89,7 +94,7 @@ def actor_allowed(
     *,
     slack_user: str,
     github_actor: str,
-    approvers: dict[str, list[str]],
+    approvers: Mapping[str, Iterable[str]],
 ) -> bool:
     slack_user = slack_user.strip()
     github_actor = github_actor.strip()
@@ -106,18 +111,30 @@ def files_are_docs_only(files: list[str]) -> bool:
     return all(path.replace("\\", "/") in ALLOWED_FILES for path in files)
 
 
-def ack_text(action: str) -> str:
-    messages = {
-        "merge_doc": "記録: 正本PRをマージしました。",
-        "already_merged": "記録: 対象PRは既にマージ済みです。",
-        "record_hold": "記録: 今週は実行しません。",
-        "record_skip": "記録: スキップとして残します。",
-        "record_reject": "記録: 提案は採用しません。",
-        "l1_denied": "記録: 許可リストに無いため実行しません。",
-        "stale": "記録: 火曜を跨いだため無効です。",
-        "refuse": "記録: 条件を満たさないため実行しません。",
+ACK_MESSAGES = {
+    "merge_doc": "記録: 正本PRをマージしました。",
+    "already_merged": "記録: 対象PRは既にマージ済みです。",
+    "record_hold": "記録: 今週は実行しません。",
+    "record_skip": "記録: スキップとして残します。",
+    "record_reject": "記録: 提案は採用しません。",
+    "l1_denied": "記録: 許可リストに無いため実行しません。",
+    "stale": "記録: 火曜を跨いだため無効です。",
+    "refuse": "記録: 条件を満たさないため実行しません。",
+}
+OK_ACTIONS = frozenset(
+    {
+        "merge_doc",
+        "already_merged",
+        "record_hold",
+        "record_skip",
+        "record_reject",
+        "l1_denied",
     }
-    text = messages.get(action, messages["refuse"])
+)
+
+
+def ack_text(action: str) -> str:
+    text = ACK_MESSAGES.get(action, ACK_MESSAGES["refuse"])
     if MENTION_RE.search(text) or "<@" in text:
         raise ValueError("ack refused to emit a Slack mention")
     if text.strip() == "APPROVE-DOC":
@@ -125,6 +142,94 @@ def ack_text(action: str) -> str:
     return text
 
 
+@dataclass(frozen=True)
+class RuleEngine:
+    """Approvers and L1 allowlist compiled once into frozen sets.
+
+    classify() on an engine never touches disk, so replaying a long
+    approval history costs one load per run instead of one per command.
+    """
+
+    slack_approvers: frozenset[str]
+    github_approvers: frozenset[str]
+    l1_allow: frozenset[str]
+
+    @classmethod
+    def from_config(cls, approvers: Mapping[str, Iterable[str]], l1_allow: Iterable[str]) -> RuleEngine:
+        return cls(
+            slack_approvers=frozenset(approvers.get("slack") or ()),
+            github_approvers=frozenset(approvers.get("github") or ()),
+            l1_allow=frozenset(l1_allow),
+        )
+
+    @classmethod
+    def load(cls, approvers_path: Path = APPROVERS_PATH, allowlist_path: Path = ALLOWLIST_PATH) -> RuleEngine:
+        return cls.from_config(load_approvers(approvers_path), load_l1_allowlist(allowlist_path))
+
+    def classify(
+        self,
+        *,
+        command: str,
+        now: datetime,
+        slack_user: str = "",
+        github_actor: str = "",
+        branch: str = "",
+        files: Iterable[str] | None = None,
+        pr_state: str = "",
+    ) -> dict[str, Any]:
+        parsed = parse_command(command)
+        if parsed is None:
+            return _result("refuse", "command_mismatch", command=command)
+
+        approvers = {"slack": self.slack_approvers, "github": self.github_approvers}
+        if not actor_allowed(slack_user=slack_user, github_actor=github_actor, approvers=approvers):
+            return _result("refuse", "actor_not_allowed", command=parsed)
+
+        task_id = parsed.split()[-1] if parsed.startswith(("APPROVE T-", "SKIP T-", "REJECT T-")) else None
+        week = week_from_branch(branch) if branch else None
+
+        if parsed == "HOLD":
+            return _result("record_hold", "hold", command=parsed, week=week)
+        if parsed.startswith("SKIP "):
+            return _result("record_skip", "skip", command=parsed, week=week, task_id=task_id)
+        if parsed.startswith("REJECT "):
+            return _result("record_reject", "reject", command=parsed, week=week, task_id=task_id)
+        if parsed.startswith("APPROVE T-"):
+            assert task_id is not None
+            if task_id not in self.l1_allow:
+                return _result("l1_denied", "not_on_allowlist", command=parsed, week=week, task_id=task_id)
+            return _result("l1_denied", "allowlist_has_no_runner", command=parsed, week=week, task_id=task_id)
+
+        # APPROVE-DOC
+        if not week:
+            return _result("refuse", "missing_telemetry_branch", command=parsed)
+        start, end = approval_window(week)
+        if not (start <= now < end):
+            return _result("stale", "outside_review_window", command=parsed, week=week)
+        state = pr_state.strip().upper()
+        if state == "MERGED":
+            return _result("already_merged", "pr_already_merged", command=parsed, week=week)
+        if state and state != "OPEN":
+            return _result("refuse", f"pr_state_{state.lower()}", command=parsed, week=week)
+        if not files_are_docs_only(list(files or [])):
+            return _result("refuse", "not_docs_only", command=parsed, week=week)
+        return _result("merge_doc", "docs_pr_ok", command=parsed, week=week)
+
+    def classify_many(self, events: Iterable[Mapping[str, Any]], **common: Any) -> list[dict[str, Any]]:
+        """Classify a sequence of commands (e.g. one Slack thread).
+
+        Each event holds classify() keyword arguments; ``common`` supplies
+        shared ones such as branch, files and pr_state for the whole thread.
+        """
+        return [self.classify(**{**common, **event}) for event in events]
+
+
+@lru_cache(maxsize=1)
+def default_engine() -> RuleEngine:
+    """Engine over the committed approvers.json / l1_allowlist.json (loaded once per process)."""
+    return RuleEngine.load()
+
+
 def classify(
     *,
     command: str,
@@ -137,44 +242,26 @@ def classify(
     approvers: dict[str, list[str]] | None = None,
     l1_allow: set[str] | None = None,
 ) -> dict[str, Any]:
-    parsed = parse_command(command)
-    if parsed is None:
-        return _result("refuse", "command_mismatch", command=command)
-
-    approvers = approvers if approvers is not None else load_approvers()
-    l1_allow = l1_allow if l1_allow is not None else load_l1_allowlist()
-    if not actor_allowed(slack_user=slack_user, github_actor=github_actor, approvers=approvers):
-        return _result("refuse", "actor_not_allowed", command=parsed)
-
-    task_id = parsed.split()[-1] if parsed.startswith(("APPROVE T-", "SKIP T-", "REJECT T-")) else None
-    week = week_from_branch(branch) if branch else None
-
-    if parsed == "HOLD":
-        return _result("record_hold", "hold", command=parsed, week=week)
-    if parsed.startswith("SKIP "):
-        return _result("record_skip", "skip", command=parsed, week=week, task_id=task_id)
-    if parsed.startswith("REJECT "):
-        return _result("record_reject", "reject", command=parsed, week=week, task_id=task_id)
-    if parsed.startswith("APPROVE T-"):
-        assert task_id is not None
-        if task_id not in l1_allow:
-            return _result("l1_denied", "not_on_allowlist", command=parsed, week=week, task_id=task_id)
-        return _result("l1_denied", "allowlist_has_no_runner", command=parsed, week=week, task_id=task_id)
-
-    # APPROVE-DOC
-    if not week:
-        return _result("refuse", "missing_telemetry_branch", command=parsed)
-    start, end = approval_window(week)
-    if not (start <= now < end):
-        return _result("stale", "outside_review_window", command=parsed, week=week)
-    state = pr_state.strip().upper()
-    if state == "MERGED":
-        return _result("already_merged", "pr_already_merged", command=parsed, week=week)
-    if state and state != "OPEN":
-        return _result("refuse", f"pr_state_{state.lower()}", command=parsed, week=week)
-    if not files_are_docs_only(files or []):
-        return _result("refuse", "not_docs_only", command=parsed, week=week)
-    return _result("merge_doc", "docs_pr_ok", command=parsed, week=week)
+    """Classify one command; prefer RuleEngine.classify for repeated calls."""
+    if approvers is not None and l1_allow is not None:
+        engine = RuleEngine.from_config(approvers, l1_allow)
+    else:
+        engine = default_engine()
+        if approvers is not None or l1_allow is not None:
+            current = {"slack": engine.slack_approvers, "github": engine.github_approvers}
+            engine = RuleEngine.from_config(
+                current if approvers is None else approvers,
+                engine.l1_allow if l1_allow is None else l1_allow,
+            )
+    return engine.classify(
+        command=command,
+        now=now,
+        slack_user=slack_user,
+        github_actor=github_actor,
+        branch=branch,
+        files=files,
+        pr_state=pr_state,
+    )
 
 
 def _result(
@@ -186,15 +273,7 @@ def _result(
     task_id: str | None = None,
 ) -> dict[str, Any]:
     return {
-        "ok": action
-        in {
-            "merge_doc",
-            "already_merged",
-            "record_hold",
-            "record_skip",
-            "record_reject",
-            "l1_denied",
-        },
+        "ok": action in OK_ACTIONS,
         "action": action,
         "reason": reason,
         "ack": ack_text(action),
@@ -235,18 +314,10 @@ def post_slack_ack(text: str, thread_ts: str = "") -> None:
         print("slack ack skipped (no token/webhook)", file=sys.stderr)
         return
 
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers=headers,
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            body = resp.read().decode("utf-8", "replace")
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", "replace")[:400]
-        raise RuntimeError(f"Slack HTTP {exc.code}: {detail}") from exc
+        body = default_client().post_json(url, payload, headers=headers, timeout=30).text()
+    except HttpError as exc:
+        raise RuntimeError(f"Slack HTTP {exc.status}: {exc.detail[:400]}") from exc
 
     if webhook:
         if body.strip() != "ok":
@@ -257,11 +328,17 @@ def post_slack_ack(text: str, thread_ts: str = "") -> None:
         raise RuntimeError(f"chat.postMessage: {parsed.get('error')}")
 
 
+# Shared with replay_approvals.py's self-test.
+TEST_APPROVERS = {"github": ["ykagesg7"], "slack": ["U0928GWP3AA"]}
+TEST_REVIEW_TIME = datetime(2026, 8, 25, 1, 0, tzinfo=timezone.utc)
+TEST_FILES = ["docs/ops/Weekly_Telemetry_Review.md"]
+
+
 def self_test() -> None:
-    approvers = {"github": ["ykagesg7"], "slack": ["U0928GWP3AA"]}
+    approvers = TEST_APPROVERS
     allow: set[str] = set()
-    review = datetime(2026, 8, 25, 1, 0, tzinfo=timezone.utc)
-    files = ["docs/ops/Weekly_Telemetry_Review.md"]
+    review = TEST_REVIEW_TIME
+    files = TEST_FILES
 
     hold = classify(
         command="  HOLD  ",
@@ -359,6 +436,29 @@ def self_test() -> None:
     assert "ykagesg7" in loaded["github"]
     assert "U0928GWP3AA" in loaded["slack"]
     assert load_l1_allowlist() == set()
+
+    engine = RuleEngine.from_config(approvers, allow)
+    events = [
+        {"command": "HOLD", "now": review, "slack_user": "U0928GWP3AA"},
+        {"command": "APPROVE-DOC", "now": review, "slack_user": "U0928GWP3AA"},
+        {"command": "APPROVE-DOC", "now": review, "slack_user": "U0928GWP3AA", "pr_state": "MERGED"},
+        {"command": "hello", "now": review},
+    ]
+    common = {"branch": "telemetry/2026-W34", "files": files, "pr_state": "OPEN"}
+    thread = engine.classify_many(events, **common)
+    assert [r["action"] for r in thread] == ["record_hold", "merge_doc", "already_merged", "refuse"], thread
+    for event, result in zip(events, thread):
+        assert result == classify(**{**common, **event}, approvers=approvers, l1_allow=allow)
+    nobody = classify(**{**common, **events[0]}, approvers={})  # empty mapping: no one may approve
+    assert (nobody["action"], nobody["reason"]) == ("refuse", "actor_not_allowed"), nobody
+    assert default_engine() is default_engine()
+    assert "ykagesg7" in default_engine().github_approvers
+    assert approval_window("2026-W34") is approval_window("2026-W34")
+    try:
+        engine.l1_allow.add("T-01")  # type: ignore[attr-defined]
+        raise AssertionError("allowlist must be immutable")
+    except AttributeError:
+        pass
     print("self-test ok")
 
 
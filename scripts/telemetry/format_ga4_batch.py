@@ -0,0 +1,120 @@
+"""Render many GA4 ISO-week reports (Slack facts + review Facts) in one run.
+
+Indexes --dir once (backfill ga4-<week>.json and artifact
+ga4-<week>/ga4-iso-week.json), loads each report once, and writes
+<week>.slack.txt and <week>.review.md for every week into --out-dir.
+The review date defaults to each week's review Tuesday (Sunday + 2 days).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from format_ga4_review import format_review_facts
+from format_ga4_slack import format_slack_mrkdwn, index_reports
+
+
+def review_date_for(report: dict[str, Any]) -> date:
+    end = report.get("endDate")
+    try:
+        return date.fromisoformat(str(end)) + timedelta(days=2)
+    except ValueError:
+        return date.today()
+
+
+def render_reports(
+    reports: dict[str, dict[str, Any]],
+    *,
+    run_url: str = "",
+    review_date: date | None = None,
+) -> dict[str, str]:
+    """Output file name -> text for every report (keyed by week label)."""
+    outputs: dict[str, str] = {}
+    for key in sorted(reports):
+        report = reports[key]
+        week = str(report.get("week") or key).replace("/", "_")
+        outputs[f"{week}.slack.txt"] = format_slack_mrkdwn(report, run_url=run_url) + "\n"
+        outputs[f"{week}.review.md"] = format_review_facts(report, review_date or review_date_for(report))
+    return outputs
+
+
+def load_reports(root: Path) -> dict[str, dict[str, Any]]:
+    """First report per index key (a week downloaded twice renders once)."""
+    return {
+        key: json.loads(paths[0].read_text(encoding="utf-8"))
+        for key, paths in sorted(index_reports(root).items())
+    }
+
+
+def write_outputs(outputs: dict[str, str], out_dir: Path) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, text in outputs.items():
+        (out_dir / name).write_text(text, encoding="utf-8")
+
+
+def self_test() -> None:
+    base = {
+        "startDate": "2026-08-10",
+        "endDate": "2026-08-16",
+        "prevWeek": "2026-W32",
+        "totals": {"activeUsers": 1, "sessions": 4, "screenPageViews": 25, "engagedSessions": 3},
+        "prevTotals": {},
+        "pages": [{"d": ["/@x"], "m": ["9"]}],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "in"
+        (root / "ga4-2026-W34").mkdir(parents=True)
+        (root / "ga4-2026-W33.json").write_text(json.dumps({**base, "week": "2026-W33"}), encoding="utf-8")
+        w34 = {**base, "week": "2026-W34", "startDate": "2026-08-17", "endDate": "2026-08-23"}
+        (root / "ga4-2026-W34" / "ga4-iso-week.json").write_text(json.dumps(w34), encoding="utf-8")
+        reports = load_reports(root)
+        assert list(reports) == ["2026-W33", "2026-W34"], list(reports)
+        outputs = render_reports(reports)
+        write_outputs(outputs, Path(tmp) / "out")
+        written = sorted(p.name for p in (Path(tmp) / "out").iterdir())
+    assert written == [
+        "2026-W33.review.md", "2026-W33.slack.txt", "2026-W34.review.md", "2026-W34.slack.txt"
+    ], written
+    assert outputs["2026-W34.slack.txt"] == format_slack_mrkdwn(w34) + "\n"
+    assert "レビュー 2026-08-25" in outputs["2026-W34.review.md"]
+    assert "(at)x" in outputs["2026-W33.slack.txt"]
+    print("self-test ok")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render Slack/review Facts for every GA4 report under a directory")
+    parser.add_argument("--dir", help="Directory with ga4-<week>.json and/or ga4-<week>/ga4-iso-week.json")
+    parser.add_argument("--out-dir", default="artifacts/ga4-rendered")
+    parser.add_argument("--run-url", default="", help="Actions run URL for the Slack text")
+    parser.add_argument("--review-date", help="YYYY-MM-DD for every week (default: each week's review Tuesday)")
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args()
+
+    if args.self_test:
+        self_test()
+        return 0
+    if not args.dir:
+        raise SystemExit("need --dir or --self-test")
+
+    reports = load_reports(Path(args.dir))
+    if not reports:
+        raise SystemExit(f"no GA4 reports under {args.dir}")
+    review = date.fromisoformat(args.review_date) if args.review_date else None
+    outputs = render_reports(reports, run_url=args.run_url, review_date=review)
+    write_outputs(outputs, Path(args.out_dir))
+    print(f"ok {len(reports)} reports -> {len(outputs)} files in {args.out_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        raise SystemExit(1)
@@ -11,13 +11,17 @@ import json
 import os
 import re
 import sys
-import urllib.error
-import urllib.request
 from pathlib import Path
 from typing import Any
 
+from http_client import HttpError, default_client
+
 CHANNEL_ID = "C0BQ5R19QDV"
 MENTION_RE = re.compile(r"(?<![A-Za-z0-9_])@|</?@[A-Z0-9]+>")
+# One pass equivalent to: fullwidth ＠ -> @, then MENTION_RE -> (at), then <@ -> (at).
+SANITIZE_RE = re.compile(r"</?[@＠][A-Z0-9]+>|(?<![A-Za-z0-9_])[@＠]|(?P<keep>＠)")
+REPORT_NAME = "ga4-iso-week.json"
+WEEKLY_NAME_RE = re.compile(r"ga4-(\d{4}-W\d{2})\.json")
 
 
 def _int(value: Any) -> int:
@@ -47,11 +51,14 @@ def _metric(row: dict[str, Any], index: int = 0) -> int:
     return _int(mets[index])
 
 
+def _sanitize_sub(match: re.Match[str]) -> str:
+    return "@" if match.group("keep") else "(at)"
+
+
 def _sanitize(text: str) -> str:
-    text = text.replace("＠", "@")
-    text = MENTION_RE.sub("(at)", text)
-    text = text.replace("<@", "(at)")
-    return text
+    if "@" not in text and "＠" not in text:
+        return text
+    return SANITIZE_RE.sub(_sanitize_sub, text)
 
 
 def format_slack_mrkdwn(report: dict[str, Any], run_url: str = "") -> str:
@@ -123,13 +130,39 @@ def format_slack_mrkdwn(report: dict[str, Any], run_url: str = "") -> str:
     return text
 
 
-def find_report_json(root: Path) -> Path:
-    direct = root / "ga4-iso-week.json"
+def index_reports(root: Path) -> dict[str, list[Path]]:
+    """Walk root once; returns week label -> report paths (sorted).
+
+    Recognises backfill files ``ga4-<week>.json`` and artifact downloads
+    ``ga4-<week>/ga4-iso-week.json``. Reports whose week cannot be read from
+    the path are listed under their path relative to root.
+    """
+    index: dict[str, list[Path]] = {}
+    for dirpath, _dirnames, filenames in os.walk(root):
+        folder = Path(dirpath)
+        for name in filenames:
+            match = WEEKLY_NAME_RE.fullmatch(name)
+            if match:
+                key = match.group(1)
+            elif name == REPORT_NAME:
+                parent = WEEKLY_NAME_RE.fullmatch(folder.name + ".json")
+                key = parent.group(1) if parent else (folder / name).relative_to(root).as_posix()
+            else:
+                continue
+            index.setdefault(key, []).append(folder / name)
+    for paths in index.values():
+        paths.sort()
+    return index
+
+
+def find_report_json(root: Path, index: dict[str, list[Path]] | None = None) -> Path:
+    direct = root / REPORT_NAME
     if direct.is_file():
         return direct
-    matches = sorted(root.rglob("ga4-iso-week.json"))
+    index = index_reports(root) if index is None else index
+    matches = sorted(p for paths in index.values() for p in paths if p.name == REPORT_NAME)
     if not matches:
-        raise FileNotFoundError(f"ga4-iso-week.json not under {root}")
+        raise FileNotFoundError(f"{REPORT_NAME} not under {root}")
     return matches[0]
 
 
@@ -155,18 +188,10 @@ def post_slack(text: str) -> None:
     else:
         raise RuntimeError("set SLACK_WEBHOOK_URL or SLACK_BOT_TOKEN")
 
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers=headers,
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            body = resp.read().decode("utf-8", "replace")
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", "replace")[:400]
-        raise RuntimeError(f"Slack HTTP {exc.code}: {detail}") from exc
+        body = default_client().post_json(url, payload, headers=headers, timeout=30).text()
+    except HttpError as exc:
+        raise RuntimeError(f"Slack HTTP {exc.status}: {exc.detail[:400]}") from exc
 
     if webhook:
         if body.strip() != "ok":
@@ -204,6 +229,27 @@ def self_test() -> None:
     assert not MENTION_RE.search(text)
     assert "APPROVE-DOC" in text
     assert not text.strip().startswith("APPROVE-DOC")
+
+    def legacy_sanitize(value: str) -> str:
+        value = value.replace("＠", "@")
+        value = MENTION_RE.sub("(at)", value)
+        return value.replace("<@", "(at)")
+
+    for case in ["/@x", "a@b", "a＠b", "＠here", "<@U123>", "</@U1>", "<＠U9>", "x<@", "@@", "＠＠a", "/quiz", ""]:
+        assert _sanitize(case) == legacy_sanitize(case), (case, _sanitize(case), legacy_sanitize(case))
+
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "ga4-2026-W34").mkdir()
+        (root / "ga4-2026-W34" / REPORT_NAME).write_text("{}", encoding="utf-8")
+        (root / "backfill").mkdir()
+        (root / "backfill" / "ga4-2026-W33.json").write_text("{}", encoding="utf-8")
+        (root / "backfill" / "trend.csv").write_text("", encoding="utf-8")
+        index = index_reports(root)
+        assert sorted(index) == ["2026-W33", "2026-W34"], index
+        assert find_report_json(root, index) == root / "ga4-2026-W34" / REPORT_NAME
     print("self-test ok")
 
 
@@ -5,21 +5,41 @@ Credentials (first match):
   2. GOOGLE_APPLICATION_CREDENTIALS — path to JSON file
   3. %APPDATA%/FlightAcademy/secrets/ga-mcp-readonly.json (local default)
 
+Reports are planned into batchRunReports calls (this/previous week totals
+share one request with two dateRanges). GA4_API_BASE points the client at a
+local fake server; --self-test starts one. Responses are cached on disk per
+request body (--cache-dir); completed ranges never expire, recent ones use
+--cache-ttl. The OAuth access token is cached too (--token-cache-dir, mode
+0600) and reused until shortly before expiry, so google-auth is only
+imported when a new token has to be minted.
+
 Does not print private keys. Exit 0 on API success even if all metrics are zero.
 """
 
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
+import io
 import json
 import os
 import re
 import sys
-import urllib.error
-import urllib.request
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+from http_client import HttpError, default_client
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from cli_profile import add_profile_argument, run_profiled  # noqa: E402
 
 PROPERTY_ID = "532610432"
 SCOPES = ["https://www.googleapis.com/auth/analytics.readonly"]
@@ -31,6 +51,32 @@ LOCAL_SA = (
     / "secrets"
     / "ga-mcp-readonly.json"
 )
+CACHE_DIR = (
+    Path(os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache"))
+    / "FlightAcademy"
+    / "ga4-report-cache"
+)
+TOKEN_CACHE_DIR = CACHE_DIR.parent / "ga4-token-cache"
+# Re-mint when the cached token has less than this many seconds left.
+TOKEN_MIN_TTL = 300.0
+# GA4 may still revise a day for ~72h; ranges ending earlier than this are immutable.
+SETTLE_DAYS = 3
+DEFAULT_CACHE_TTL = 3600.0
+API_BASE = os.environ.get("GA4_API_BASE", "https://analyticsdata.googleapis.com/v1beta").rstrip("/")
+DEFAULT_WORKERS = 4
+# Data API limits: 5 requests per batchRunReports, 4 dateRanges per request.
+MAX_BATCH_REQUESTS = 5
+MAX_DATE_RANGES = 4
+# Backfill span requests fetch every row, then apply per-week limits locally.
+BACKFILL_ROW_LIMIT = 100000
+# Retries (429/5xx, dropped connections) happen in the shared http_client.
+RETRY_ATTEMPTS = 4
+
+
+class GA4ApiError(RuntimeError):
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(f"GA4 Data API HTTP {status}: {detail}")
+        self.status = status
 
 
 def last_completed_iso_week(today: date) -> tuple[str, date, date]:
@@ -62,40 +108,179 @@ def parse_iso_week(label: str) -> tuple[date, date]:
     return start, end
 
 
-def load_credentials() -> Any:
-    from google.oauth2 import service_account
-
+def load_service_account_info() -> dict[str, Any]:
+    """Service-account JSON from the first configured source (no google-auth import)."""
     raw = os.environ.get("GA4_SA_JSON", "").strip()
     if raw:
-        info = json.loads(raw)
-        return service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
+        info: dict[str, Any] = json.loads(raw)
+        return info
     path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS", "").strip()
     if path:
-        return service_account.Credentials.from_service_account_file(path, scopes=SCOPES)
+        return json.loads(Path(path).read_text(encoding="utf-8"))
     if LOCAL_SA.is_file():
-        return service_account.Credentials.from_service_account_file(str(LOCAL_SA), scopes=SCOPES)
+        return json.loads(LOCAL_SA.read_text(encoding="utf-8"))
     raise FileNotFoundError(
         "No GA4 credentials: set GA4_SA_JSON, GOOGLE_APPLICATION_CREDENTIALS, or local SA JSON"
     )
 
 
-def run_report(token: str, body: dict[str, Any]) -> dict[str, Any]:
-    req = urllib.request.Request(
-        f"https://analyticsdata.googleapis.com/v1beta/properties/{PROPERTY_ID}:runReport",
-        data=json.dumps(body).encode(),
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
+def mint_access_token(info: dict[str, Any]) -> tuple[str, float]:
+    """Fetch a fresh OAuth token; returns (token, expiry as epoch seconds)."""
+    from google.auth.transport.requests import Request
+    from google.oauth2 import service_account
+
+    creds = service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
+    creds.refresh(Request())
+    # google-auth reports expiry as a naive UTC datetime
+    expiry = creds.expiry.replace(tzinfo=timezone.utc).timestamp()
+    return creds.token, expiry
+
+
+class TokenCache:
+    """Access tokens on disk, keyed by service-account identity and scopes.
+
+    Files are created with mode 0600 and hold only the short-lived token,
+    never the private key. A token is reused until min_ttl seconds before
+    its expiry; google-auth is imported only when a new one is minted.
+    """
+
+    def __init__(self, root: Path, *, min_ttl: float = TOKEN_MIN_TTL) -> None:
+        self.root = root
+        self.min_ttl = min_ttl
+        self.hit = False
+
+    def _path(self, info: dict[str, Any]) -> Path:
+        identity = json.dumps(
+            [info.get("client_email"), info.get("private_key_id"), sorted(SCOPES)], separators=(",", ":")
+        )
+        return self.root / f"{hashlib.sha256(identity.encode()).hexdigest()[:32]}.json"
+
+    def get(self, info: dict[str, Any]) -> str | None:
+        try:
+            entry = json.loads(self._path(info).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        # Files from older or foreign versions are a miss, not an error.
+        if not isinstance(entry, dict):
+            return None
+        token = entry.get("token")
+        if not isinstance(token, str) or not token:
+            return None
+        try:
+            expires_at = float(entry.get("expiresAt") or 0)
+        except (TypeError, ValueError):
+            return None
+        if expires_at - self.min_ttl <= time.time():
+            return None
+        return token
+
+    def put(self, info: dict[str, Any], token: str, expires_at: float) -> None:
+        path = self._path(info)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")  # mkstemp creates 0600
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"clientEmail": info.get("client_email"), "expiresAt": expires_at, "token": token}, handle)
+        os.replace(tmp, path)
+
+    def token(self, info: dict[str, Any], mint: Any = mint_access_token) -> str:
+        cached = self.get(info)
+        self.hit = cached is not None
+        if cached is not None:
+            return cached
+        token, expires_at = mint(info)
+        self.put(info, token, expires_at)
+        return token
+
+
+def call_api(token: str, method: str, body: dict[str, Any]) -> dict[str, Any]:
     try:
-        with urllib.request.urlopen(req, timeout=90) as resp:
-            payload: dict[str, Any] = json.load(resp)
-            return payload
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")[:800]
-        raise RuntimeError(f"GA4 Data API HTTP {exc.code}: {detail}") from exc
+        resp = default_client().post_json(
+            f"{API_BASE}/properties/{PROPERTY_ID}:{method}",
+            body,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=90,
+            retries=RETRY_ATTEMPTS - 1,
+            idempotent=True,  # runReport / batchRunReports only read
+        )
+    except HttpError as exc:
+        raise GA4ApiError(exc.status, exc.detail[:800]) from exc
+    payload: dict[str, Any] = resp.json()
+    return payload
+
+
+def run_report(token: str, body: dict[str, Any]) -> dict[str, Any]:
+    return call_api(token, "runReport", body)
+
+
+def batch_run_reports(token: str, bodies: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    payload = call_api(token, "batchRunReports", {"requests": bodies})
+    reports: list[dict[str, Any]] = payload.get("reports") or []
+    if len(reports) != len(bodies):
+        raise RuntimeError(f"batchRunReports returned {len(reports)} reports for {len(bodies)} requests")
+    return reports
+
+
+class ReportCache:
+    """Content-addressed runReport responses on disk.
+
+    Key: property + SHA-256 of the canonical request body (which contains the
+    date range). Ranges that ended at least SETTLE_DAYS ago are stored
+    without expiry; ranges touching recent days expire after ttl seconds.
+    """
+
+    def __init__(self, root: Path, *, ttl: float = DEFAULT_CACHE_TTL, today: date | None = None) -> None:
+        self.root = root / PROPERTY_ID
+        self.ttl = ttl
+        self.today = today
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, body: dict[str, Any]) -> Path:
+        canonical = json.dumps({"propertyId": PROPERTY_ID, "body": body}, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(canonical.encode()).hexdigest()
+        ranges = body.get("dateRanges") or [{}]
+        span = f"{min(r.get('startDate', '') for r in ranges)}_{max(r.get('endDate', '') for r in ranges)}"
+        return self.root / f"{span}_{digest[:32]}.json"
+
+    def _expires_at(self, body: dict[str, Any]) -> float | None:
+        today = self.today or datetime.now(TZ).date()
+        try:
+            last = max(date.fromisoformat(r["endDate"]) for r in body.get("dateRanges") or [])
+        except (KeyError, ValueError):
+            # relative dates ("today", "7daysAgo") are never immutable
+            return time.time() + self.ttl
+        if last <= today - timedelta(days=SETTLE_DAYS):
+            return None
+        return time.time() + self.ttl
+
+    def get(self, body: dict[str, Any]) -> dict[str, Any] | None:
+        path = self._path(body)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        expires = entry.get("expiresAt")
+        if expires is not None and expires < time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        response: dict[str, Any] = entry["response"]
+        return response
+
+    def put(self, body: dict[str, Any], response: dict[str, Any]) -> None:
+        path = self._path(body)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "body": body,
+            "fetchedAt": datetime.now(TZ).isoformat(),
+            "expiresAt": self._expires_at(body),
+            "response": response,
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle, ensure_ascii=False)
+        os.replace(tmp, path)
 
 
 def simplify(report: dict[str, Any]) -> list[dict[str, list[str]]]:
@@ -141,58 +326,279 @@ def self_test() -> None:
         raise AssertionError("expected ValueError")
     except ValueError:
         pass
+
+    bodies = report_bodies({"startDate": "a", "endDate": "b"}, {"startDate": "c", "endDate": "d"})
+    assert list(bodies) == [
+        "totals", "prev", "daily", "pages", "articles", "source", "device", "landing", "events"
+    ]
+    assert bodies["prev"]["dateRanges"] == [{"startDate": "c", "endDate": "d"}]
+    planned = plan_requests(bodies)
+    assert len(planned) == 8, len(planned)
+    assert planned[0][1] == ["totals", "prev"]
+    assert [r.get("name") for r in planned[0][0]["dateRanges"]] == ["totals", "prev"]
+    assert "name" not in bodies["totals"]["dateRanges"][0]
+    self_test_token_cache()
+    self_test_mint_access_token()
+    self_test_fake_server()
     print("self-test ok")
 
 
-def build_report(token: str, week_label: str, start: date, end: date) -> dict[str, Any]:
-    start_s = start.isoformat()
-    end_s = end.isoformat()
-    prev_label, prev_start, prev_end = previous_iso_week(start)
-    range_this = {"startDate": start_s, "endDate": end_s}
-    range_prev = {"startDate": prev_start.isoformat(), "endDate": prev_end.isoformat()}
+def self_test_token_cache() -> None:
+    minted: list[str] = []
+    now = time.time()
 
-    tot = run_report(
-        token,
-        {
-            "dateRanges": [range_this],
-            "metrics": [
-                {"name": "activeUsers"},
-                {"name": "sessions"},
-                {"name": "screenPageViews"},
-                {"name": "engagedSessions"},
-            ],
-        },
-    )
-    prev = run_report(
-        token,
-        {
-            "dateRanges": [range_prev],
-            "metrics": [
-                {"name": "activeUsers"},
-                {"name": "sessions"},
-                {"name": "screenPageViews"},
-                {"name": "engagedSessions"},
-            ],
-        },
-    )
-    daily = run_report(
-        token,
-        {
+    def fake_mint(info: dict[str, Any]) -> tuple[str, float]:
+        minted.append(info["client_email"])
+        return f"tok-{len(minted)}", now + 3600
+
+    sa = {"client_email": "a@example.iam.gserviceaccount.com", "private_key_id": "k1"}
+    with tempfile.TemporaryDirectory() as tmp:
+        tokens = TokenCache(Path(tmp))
+        assert tokens.token(sa, fake_mint) == "tok-1" and not tokens.hit
+        assert tokens.token(sa, fake_mint) == "tok-1" and tokens.hit
+        assert tokens.token({**sa, "private_key_id": "k2"}, fake_mint) == "tok-2"
+        (entry,) = [p for p in Path(tmp).iterdir() if "tok-1" in p.read_text(encoding="utf-8")]
+        if os.name == "posix":
+            assert entry.stat().st_mode & 0o777 == 0o600, oct(entry.stat().st_mode)
+        assert "private_key" not in entry.read_text(encoding="utf-8")
+        assert TokenCache(Path(tmp), min_ttl=3700).token(sa, fake_mint) == "tok-3"  # near expiry: re-mint
+        stale_formats = [
+            "[]",
+            '"tok"',
+            '{"expiresAt": 9e12}',
+            '{"token": "", "expiresAt": 9e12}',
+            '{"token": 1, "expiresAt": 9e12}',
+            '{"token": "t", "expiresAt": "soon"}',
+        ]
+        for bad in stale_formats:
+            entry.write_text(bad, encoding="utf-8")
+            assert tokens.get(sa) is None, bad
+        assert tokens.token(sa, fake_mint) == "tok-4" and not tokens.hit
+    assert len(minted) == 4, minted
+
+
+def self_test_mint_access_token() -> None:
+    """Real mint_access_token against stand-in google-auth modules (no network)."""
+    import types
+
+    calls: list[tuple[str, Any]] = []
+
+    class Credentials:
+        def __init__(self, info: dict[str, Any], scopes: list[str]) -> None:
+            self.info = info
+            self.token: str | None = None
+            self.expiry: datetime | None = None
+            calls.append(("init", list(scopes)))
+
+        @classmethod
+        def from_service_account_info(cls, info: dict[str, Any], scopes: list[str]) -> Credentials:
+            return cls(info, scopes)
+
+        def refresh(self, request: Any) -> None:
+            calls.append(("refresh", type(request).__name__))
+            self.token = f"minted-{self.info['client_email']}"
+            self.expiry = datetime(2030, 1, 1, 12, 0, 0)  # naive UTC, as google-auth reports it
+
+    class Request:
+        pass
+
+    service_account = types.ModuleType("google.oauth2.service_account")
+    service_account.Credentials = Credentials  # type: ignore[attr-defined]
+    oauth2 = types.ModuleType("google.oauth2")
+    oauth2.service_account = service_account  # type: ignore[attr-defined]
+    transport_requests = types.ModuleType("google.auth.transport.requests")
+    transport_requests.Request = Request  # type: ignore[attr-defined]
+    stubs = {
+        "google": types.ModuleType("google"),
+        "google.oauth2": oauth2,
+        "google.oauth2.service_account": service_account,
+        "google.auth": types.ModuleType("google.auth"),
+        "google.auth.transport": types.ModuleType("google.auth.transport"),
+        "google.auth.transport.requests": transport_requests,
+    }
+    saved = {name: sys.modules.get(name) for name in stubs}
+    sys.modules.update(stubs)
+    try:
+        token, expiry = mint_access_token({"client_email": "a@example.iam.gserviceaccount.com"})
+        with tempfile.TemporaryDirectory() as tmp:
+            cached = TokenCache(Path(tmp)).token({"client_email": "b@example.iam.gserviceaccount.com"}, mint_access_token)
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+    assert token == "minted-a@example.iam.gserviceaccount.com", token
+    assert expiry == datetime(2030, 1, 1, 12, tzinfo=timezone.utc).timestamp(), expiry
+    assert cached == "minted-b@example.iam.gserviceaccount.com", cached
+    assert calls[:2] == [("init", list(SCOPES)), ("refresh", "Request")], calls
+
+
+class _FakeGA4Handler(BaseHTTPRequestHandler):
+    """Minimal Data API stand-in: one row per date range, metric value = range index + 1."""
+
+    calls: list[str] = []
+    failures_left = 0
+
+    def do_POST(self) -> None:  # noqa: N802 (http.server API)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        method = self.path.rsplit(":", 1)[-1]
+        type(self).calls.append(method)
+        if type(self).failures_left > 0:
+            type(self).failures_left -= 1
+            self.send_error(503)
+            return
+        if method == "batchRunReports":
+            payload: dict[str, Any] = {"reports": [self._report(r) for r in body.get("requests") or []]}
+        elif method == "runReport":
+            payload = self._report(body)
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    @staticmethod
+    def _report(body: dict[str, Any]) -> dict[str, Any]:
+        ranges = body.get("dateRanges") or []
+        dims = [d["name"] for d in body.get("dimensions") or []]
+        multi = len(ranges) > 1
+        headers = [{"name": d} for d in dims] + ([{"name": "dateRange"}] if multi else [])
+        rows = []
+        for i, rng in enumerate(ranges):
+            weeks = [""]
+            if "isoYearIsoWeek" in dims:
+                first = date.fromisoformat(rng["startDate"])
+                last = date.fromisoformat(rng["endDate"])
+                weeks = sorted(
+                    {
+                        "%04d%02d" % (first + timedelta(days=n)).isocalendar()[:2]
+                        for n in range((last - first).days + 1)
+                    }
+                )
+            for week in weeks:
+                values = [{"value": week if d == "isoYearIsoWeek" else "x"} for d in dims]
+                if multi:
+                    values.append({"value": rng.get("name") or f"date_range_{i}"})
+                metric = str(i + 1 + (int(week[-2:]) if week else 0))
+                rows.append(
+                    {
+                        "dimensionValues": values,
+                        "metricValues": [{"value": metric} for _ in body.get("metrics") or []],
+                    }
+                )
+        return {"dimensionHeaders": headers, "rows": rows}
+
+
+@contextmanager
+def _fake_api() -> Iterator[None]:
+    """Serve _FakeGA4Handler on localhost and point API_BASE at it."""
+    global API_BASE
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeGA4Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    saved = API_BASE
+    API_BASE = f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+    _FakeGA4Handler.calls = []
+    try:
+        yield
+    finally:
+        API_BASE = saved
+        server.shutdown()
+        server.server_close()
+
+
+def self_test_fake_server() -> None:
+    default_client().sleep = lambda _s: None
+    with _fake_api():
+        report = build_report("test-token", "2026-W33", date(2026, 8, 10), date(2026, 8, 16))
+    assert _FakeGA4Handler.calls == ["batchRunReports", "batchRunReports"], _FakeGA4Handler.calls
+    with _fake_api():
+        _FakeGA4Handler.failures_left = 2
+        retried = build_report("test-token", "2026-W33", date(2026, 8, 10), date(2026, 8, 16), workers=1)
+    assert len(_FakeGA4Handler.calls) == 4, _FakeGA4Handler.calls
+    assert retried["totals"] == report["totals"]
+    assert report["totals"]["sessions"] == 1, report["totals"]
+    assert report["prevTotals"]["sessions"] == 2, report["prevTotals"]
+    assert report["pages"] == [{"d": ["x"], "m": ["1", "1", "1"]}], report["pages"]
+    assert report["articles"][0]["d"] == ["x", "x"]
+
+    # Cache: a completed week is served from disk; the next week reuses "prev".
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ReportCache(Path(tmp), today=date(2026, 9, 1))
+        with _fake_api():
+            first = build_report("t", "2026-W33", date(2026, 8, 10), date(2026, 8, 16), cache=cache)
+            assert len(_FakeGA4Handler.calls) == 2
+            again = build_report("t", "2026-W33", date(2026, 8, 10), date(2026, 8, 16), cache=cache)
+            assert len(_FakeGA4Handler.calls) == 2, "second run must be served from cache"
+            assert again["totals"] == first["totals"] and again["pages"] == first["pages"]
+            _FakeGA4Handler.calls = []
+            build_report("t", "2026-W34", date(2026, 8, 17), date(2026, 8, 23), cache=cache)
+            assert cache.hits == 10, cache.hits  # 9 from the rerun + W33 totals as W34 prev
+        recent = ReportCache(Path(tmp), today=date(2026, 8, 18))
+        assert recent._expires_at({"dateRanges": [{"startDate": "2026-08-10", "endDate": "2026-08-16"}]})
+        assert cache._expires_at({"dateRanges": [{"startDate": "2026-08-10", "endDate": "2026-08-16"}]}) is None
+
+    # Backfill: one span request per slot, split client-side into weeks.
+    with _fake_api():
+        weeks = iso_weeks_ending("2026-W34", 3)
+        reports = build_backfill("t", weeks)
+    assert len(_FakeGA4Handler.calls) == 2, _FakeGA4Handler.calls
+    assert [r["week"] for r in reports] == ["2026-W32", "2026-W33", "2026-W34"]
+    assert reports[1]["totals"]["sessions"] == 34, reports[1]["totals"]  # fake: 1 + ISO week number
+    assert reports[1]["prevTotals"] == reports[0]["totals"]
+    assert reports[0]["prevTotals"]["sessions"] == 32
+    assert reports[2]["pages"] == [{"d": ["x"], "m": ["35", "35", "35"]}], reports[2]["pages"]
+    csv_text = trend_csv(reports)
+    assert csv_text.splitlines()[0].startswith("week,startDate,endDate,activeUsers")
+    assert csv_text.splitlines()[2].startswith("2026-W33,2026-08-10,2026-08-16,34,34,34,34")
+    rows = [{"d": ["b"], "m": ["1", "5"]}, {"d": ["a"], "m": ["3", "2"]}, {"d": ["c"], "m": ["2", "9"]}]
+    ordered = order_and_limit(rows, {
+        "dimensions": [{"name": "k"}],
+        "metrics": [{"name": "x"}, {"name": "y"}],
+        "orderBys": [{"metric": {"metricName": "y"}, "desc": True}],
+        "limit": 2,
+    })
+    assert [r["d"][0] for r in ordered] == ["c", "b"]
+
+
+TOTAL_METRICS = [
+    {"name": "activeUsers"},
+    {"name": "sessions"},
+    {"name": "screenPageViews"},
+    {"name": "engagedSessions"},
+]
+TRACKED_EVENTS = [
+    "quiz_hub_view",
+    "quiz_session_start",
+    "quiz_session_complete",
+    "quiz_start",
+    "chunk_recovery_reload",
+    "article_to_quiz_click",
+]
+
+
+def report_bodies(range_this: dict[str, str], range_prev: dict[str, str]) -> dict[str, dict[str, Any]]:
+    """runReport bodies for one ISO week, keyed by their slot in the output JSON."""
+    return {
+        "totals": {"dateRanges": [range_this], "metrics": TOTAL_METRICS},
+        "prev": {"dateRanges": [range_prev], "metrics": TOTAL_METRICS},
+        "daily": {
             "dateRanges": [range_this],
             "dimensions": [{"name": "date"}],
-            "metrics": [
-                {"name": "activeUsers"},
-                {"name": "sessions"},
-                {"name": "screenPageViews"},
-                {"name": "engagedSessions"},
-            ],
+            "metrics": TOTAL_METRICS,
             "orderBys": [{"dimension": {"dimensionName": "date"}}],
             "limit": 10,
         },
-    )
-    pages = run_report(
-        token,
-        {
+        "pages": {
             "dateRanges": [range_this],
             "dimensions": [{"name": "pagePath"}],
             "metrics": [
@@ -203,10 +609,7 @@ def build_report(token: str, week_label: str, start: date, end: date) -> dict[st
             "orderBys": [{"metric": {"metricName": "screenPageViews"}, "desc": True}],
             "limit": 20,
         },
-    )
-    articles = run_report(
-        token,
-        {
+        "articles": {
             "dateRanges": [range_this],
             "dimensionFilter": {
                 "filter": {
@@ -223,10 +626,7 @@ def build_report(token: str, week_label: str, start: date, end: date) -> dict[st
             "orderBys": [{"dimension": {"dimensionName": "date"}}],
             "limit": 50,
         },
-    )
-    source = run_report(
-        token,
-        {
+        "source": {
             "dateRanges": [range_this],
             "dimensions": [{"name": "sessionSource"}, {"name": "sessionMedium"}],
             "metrics": [
@@ -237,10 +637,7 @@ def build_report(token: str, week_label: str, start: date, end: date) -> dict[st
             "orderBys": [{"metric": {"metricName": "sessions"}, "desc": True}],
             "limit": 15,
         },
-    )
-    device = run_report(
-        token,
-        {
+        "device": {
             "dateRanges": [range_this],
             "dimensions": [{"name": "deviceCategory"}],
             "metrics": [
@@ -251,10 +648,7 @@ def build_report(token: str, week_label: str, start: date, end: date) -> dict[st
             "orderBys": [{"metric": {"metricName": "sessions"}, "desc": True}],
             "limit": 10,
         },
-    )
-    landing = run_report(
-        token,
-        {
+        "landing": {
             "dateRanges": [range_this],
             "dimensions": [{"name": "landingPage"}],
             "metrics": [
@@ -265,61 +659,311 @@ def build_report(token: str, week_label: str, start: date, end: date) -> dict[st
             "orderBys": [{"metric": {"metricName": "sessions"}, "desc": True}],
             "limit": 15,
         },
-    )
-    events = run_report(
-        token,
-        {
+        "events": {
             "dateRanges": [range_this],
             "dimensions": [{"name": "eventName"}],
             "metrics": [{"name": "eventCount"}, {"name": "totalUsers"}],
             "dimensionFilter": {
                 "filter": {
                     "fieldName": "eventName",
-                    "inListFilter": {
-                        "values": [
-                            "quiz_hub_view",
-                            "quiz_session_start",
-                            "quiz_session_complete",
-                            "quiz_start",
-                            "chunk_recovery_reload",
-                            "article_to_quiz_click",
-                        ]
-                    },
+                    "inListFilter": {"values": TRACKED_EVENTS},
                 }
             },
             "orderBys": [{"metric": {"metricName": "eventCount"}, "desc": True}],
             "limit": 20,
         },
-    )
+    }
+
+
+def _merge_key(body: dict[str, Any]) -> str | None:
+    """Bodies with the same key differ only in their single date range."""
+    if len(body.get("dateRanges") or []) != 1 or body.get("dimensions") or "limit" in body:
+        # A shared limit/ordering would apply across ranges, so only metric-only totals merge.
+        return None
+    rest = {k: v for k, v in body.items() if k != "dateRanges"}
+    return json.dumps(rest, sort_keys=True)
+
+
+def plan_requests(bodies: dict[str, dict[str, Any]]) -> list[tuple[dict[str, Any], list[str]]]:
+    """Merge compatible bodies into multi-range requests.
+
+    Returns (request body, slot names) pairs. A merged request names each
+    date range after its slot so split_response can route rows back.
+    """
+    planned: list[tuple[dict[str, Any], list[str]]] = []
+    open_groups: dict[str, int] = {}
+    for name, body in bodies.items():
+        key = _merge_key(body)
+        index = open_groups.get(key) if key is not None else None
+        if index is not None and len(planned[index][1]) < MAX_DATE_RANGES:
+            merged, names = planned[index]
+            merged["dateRanges"].append({**body["dateRanges"][0], "name": name})
+            names.append(name)
+            continue
+        if key is not None:
+            open_groups[key] = len(planned)
+            planned.append(({**body, "dateRanges": [{**body["dateRanges"][0], "name": name}]}, [name]))
+        else:
+            planned.append((body, [name]))
+    return planned
+
+
+def split_response(report: dict[str, Any], names: list[str]) -> dict[str, dict[str, Any]]:
+    """Split a multi-range response into one runReport-shaped response per slot."""
+    headers = report.get("dimensionHeaders") or []
+    index = next((i for i, h in enumerate(headers) if h.get("name") == "dateRange"), None)
+    if index is None:
+        if len(names) != 1:
+            raise RuntimeError(f"multi-range response for {names} has no dateRange dimension")
+        return {names[0]: report}
+    out: dict[str, dict[str, Any]] = {
+        name: {
+            "dimensionHeaders": headers[:index] + headers[index + 1 :],
+            "metricHeaders": report.get("metricHeaders") or [],
+            "rows": [],
+        }
+        for name in names
+    }
+    for row in report.get("rows") or []:
+        dims = list(row.get("dimensionValues") or [])
+        range_name = str(dims.pop(index).get("value", ""))
+        if range_name in out:
+            out[range_name]["rows"].append({**row, "dimensionValues": dims})
+    for part in out.values():
+        part["rowCount"] = len(part["rows"])
+    return out
 
-    tot_rows = simplify(tot)
-    prev_rows = simplify(prev)
+
+def fetch_reports(
+    token: str,
+    bodies: dict[str, dict[str, Any]],
+    *,
+    workers: int = DEFAULT_WORKERS,
+    cache: ReportCache | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Plan, batch and issue the reports; results keep the input keys.
+
+    Cached bodies are answered locally; the rest are planned, grouped into
+    batchRunReports calls of up to MAX_BATCH_REQUESTS and run concurrently.
+    Responses are cached per original (single-range) body, so a later
+    week's "prev" reuses this week's "totals".
+    """
+    results: dict[str, dict[str, Any]] = {}
+    if cache is not None:
+        for name, body in bodies.items():
+            hit = cache.get(body)
+            if hit is not None:
+                results[name] = hit
+    missing = {name: body for name, body in bodies.items() if name not in results}
+    if not missing:
+        return {name: results[name] for name in bodies}
+
+    planned = plan_requests(missing)
+    batches = [planned[i : i + MAX_BATCH_REQUESTS] for i in range(0, len(planned), MAX_BATCH_REQUESTS)]
+
+    def run_batch(batch: list[tuple[dict[str, Any], list[str]]]) -> dict[str, dict[str, Any]]:
+        reports = batch_run_reports(token, [body for body, _names in batch])
+        out: dict[str, dict[str, Any]] = {}
+        for (_body, names), report in zip(batch, reports):
+            out.update(split_response(report, names))
+        return out
+
+    fetched: dict[str, dict[str, Any]] = {}
+    if workers <= 1 or len(batches) <= 1:
+        for batch in batches:
+            fetched.update(run_batch(batch))
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            for part in pool.map(run_batch, batches):
+                fetched.update(part)
+    if cache is not None:
+        for name, response in fetched.items():
+            cache.put(missing[name], response)
+    results.update(fetched)
+    return {name: results[name] for name in bodies}
+
+
+def assemble_report(
+    week_label: str,
+    start: date,
+    end: date,
+    rows: dict[str, list[dict[str, list[str]]]],
+) -> dict[str, Any]:
+    """Weekly JSON from simplified rows per slot (see report_bodies)."""
+    prev_label, prev_start, prev_end = previous_iso_week(start)
     return {
         "week": week_label,
         "timezone": "Asia/Tokyo",
-        "startDate": start_s,
-        "endDate": end_s,
+        "startDate": start.isoformat(),
+        "endDate": end.isoformat(),
         "prevWeek": prev_label,
         "prevStartDate": prev_start.isoformat(),
         "prevEndDate": prev_end.isoformat(),
         "fetchedAt": datetime.now(TZ).isoformat(),
         "propertyId": PROPERTY_ID,
-        "totals": totals_from(tot_rows),
-        "prevTotals": totals_from(prev_rows),
-        "daily": simplify(daily),
-        "pages": simplify(pages),
-        "articles": simplify(articles),
-        "source": simplify(source),
-        "device": simplify(device),
-        "landing": simplify(landing),
-        "events": simplify(events),
+        "totals": totals_from(rows["totals"]),
+        "prevTotals": totals_from(rows["prev"]),
+        "daily": rows["daily"],
+        "pages": rows["pages"],
+        "articles": rows["articles"],
+        "source": rows["source"],
+        "device": rows["device"],
+        "landing": rows["landing"],
+        "events": rows["events"],
     }
 
 
+def build_report(
+    token: str,
+    week_label: str,
+    start: date,
+    end: date,
+    *,
+    workers: int = DEFAULT_WORKERS,
+    cache: ReportCache | None = None,
+) -> dict[str, Any]:
+    _prev_label, prev_start, prev_end = previous_iso_week(start)
+    range_this = {"startDate": start.isoformat(), "endDate": end.isoformat()}
+    range_prev = {"startDate": prev_start.isoformat(), "endDate": prev_end.isoformat()}
+
+    res = fetch_reports(token, report_bodies(range_this, range_prev), workers=workers, cache=cache)
+    return assemble_report(week_label, start, end, {name: simplify(r) for name, r in res.items()})
+
+
+def iso_weeks_ending(last_label: str, count: int) -> list[tuple[str, date, date]]:
+    """`count` consecutive ISO weeks, oldest first, ending with last_label."""
+    _start, last_end = parse_iso_week(last_label)
+    weeks: list[tuple[str, date, date]] = []
+    for back in range(count - 1, -1, -1):
+        end = last_end - timedelta(days=7 * back)
+        start = end - timedelta(days=6)
+        iso = start.isocalendar()
+        weeks.append((f"{iso.year}-W{iso.week:02d}", start, end))
+    return weeks
+
+
+def order_and_limit(rows: list[dict[str, list[str]]], body: dict[str, Any]) -> list[dict[str, list[str]]]:
+    """Apply a body's orderBys and limit client-side to simplified rows."""
+    dim_names = [d["name"] for d in body.get("dimensions") or []]
+    met_names = [m["name"] for m in body.get("metrics") or []]
+    out = list(rows)
+    # Stable sorts applied in reverse give multi-key ordering.
+    for order in reversed(body.get("orderBys") or []):
+        desc = bool(order.get("desc"))
+        if "metric" in order:
+            i = met_names.index(order["metric"]["metricName"])
+            out.sort(key=lambda r: float(r["m"][i] or 0), reverse=desc)
+        elif "dimension" in order:
+            i = dim_names.index(order["dimension"]["dimensionName"])
+            out.sort(key=lambda r: r["d"][i], reverse=desc)
+    limit = body.get("limit")
+    return out[: int(limit)] if limit else out
+
+
+def build_backfill(
+    token: str,
+    weeks: list[tuple[str, date, date]],
+    *,
+    workers: int = DEFAULT_WORKERS,
+    cache: ReportCache | None = None,
+) -> list[dict[str, Any]]:
+    """Weekly reports for consecutive `weeks` from one span request per slot.
+
+    Each slot's body gains a leading isoYearIsoWeek dimension over the whole
+    span (totals start one week earlier to supply the first prevTotals), so
+    weekly user counts stay de-duplicated per week. Rows are split by week,
+    then the original orderBys/limit are applied per week client-side.
+    """
+    first_start = weeks[0][1]
+    last_end = weeks[-1][2]
+    prev_first = previous_iso_week(first_start)[1]
+    span = {"startDate": first_start.isoformat(), "endDate": last_end.isoformat()}
+    span_with_prev = {"startDate": prev_first.isoformat(), "endDate": last_end.isoformat()}
+
+    weekly_bodies = report_bodies(span, span)
+    weekly_bodies.pop("prev")
+    weekly_bodies["totals"]["dateRanges"] = [span_with_prev]
+    span_bodies: dict[str, dict[str, Any]] = {}
+    for name, body in weekly_bodies.items():
+        span_body = {k: v for k, v in body.items() if k not in ("orderBys", "limit")}
+        span_body["dimensions"] = [{"name": "isoYearIsoWeek"}] + list(body.get("dimensions") or [])
+        span_body["limit"] = BACKFILL_ROW_LIMIT
+        span_bodies[name] = span_body
+
+    res = fetch_reports(token, span_bodies, workers=workers, cache=cache)
+
+    by_week: dict[str, dict[str, list[dict[str, list[str]]]]] = {}
+    for name, response in res.items():
+        for row in simplify(response):
+            raw = row["d"][0]
+            label = f"{raw[:4]}-W{raw[4:]}"
+            by_week.setdefault(label, {}).setdefault(name, []).append({"d": row["d"][1:], "m": row["m"]})
+
+    reports: list[dict[str, Any]] = []
+    for label, start, end in weeks:
+        prev_label = previous_iso_week(start)[0]
+        this = by_week.get(label, {})
+        rows = {name: order_and_limit(this.get(name, []), weekly_bodies[name]) for name in weekly_bodies}
+        # totals span one extra week back, so the previous week's totals are always present.
+        rows["prev"] = by_week.get(prev_label, {}).get("totals", [])
+        reports.append(assemble_report(label, start, end, rows))
+    return reports
+
+
+TREND_TOTALS = ["activeUsers", "sessions", "screenPageViews", "engagedSessions"]
+
+
+def trend_csv(reports: list[dict[str, Any]]) -> str:
+    """One row per week: totals plus tracked event counts."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(["week", "startDate", "endDate", *TREND_TOTALS, *TRACKED_EVENTS])
+    for report in reports:
+        events = {row["d"][0]: row["m"][0] for row in report.get("events") or [] if row["d"]}
+        writer.writerow(
+            [
+                report["week"],
+                report["startDate"],
+                report["endDate"],
+                *(report["totals"][k] for k in TREND_TOTALS),
+                *(events.get(name, "0") for name in TRACKED_EVENTS),
+            ]
+        )
+    return buf.getvalue()
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="GA4 ISO-week telemetry fetch")
     parser.add_argument("--week", help="ISO week like 2026-W33 (default: last completed week in JST)")
     parser.add_argument("--out", help="Write JSON to this path")
+    parser.add_argument(
+        "--weeks",
+        type=int,
+        default=1,
+        help="Backfill this many weeks ending at --week (writes per-week JSON + trend.csv to --out-dir)",
+    )
+    parser.add_argument("--out-dir", default="artifacts/ga4-backfill", help="Output directory for --weeks > 1")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent batchRunReports requests (default {DEFAULT_WORKERS}; 1 = sequential)",
+    )
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR), help=f"Report cache (default {CACHE_DIR})")
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help="Seconds to keep responses for ranges still settling (default 3600)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch; do not read or write the cache")
+    parser.add_argument(
+        "--token-cache-dir",
+        default=str(TOKEN_CACHE_DIR),
+        help=f"Access-token cache, files are mode 0600 (default {TOKEN_CACHE_DIR})",
+    )
+    parser.add_argument("--no-token-cache", action="store_true", help="Mint a fresh access token every run")
+    add_profile_argument(parser)
     parser.add_argument("--self-test", action="store_true")
     args = parser.parse_args()
 
@@ -336,11 +980,35 @@ def main() -> int:
     else:
         week_label, start, end = last_completed_iso_week(today)
 
-    from google.auth.transport.requests import Request
+    info = load_service_account_info()
+    if args.no_token_cache:
+        token, _expiry = mint_access_token(info)
+    else:
+        tokens = TokenCache(Path(args.token_cache_dir))
+        token = tokens.token(info)
+        print(f"token {'cached' if tokens.hit else 'minted'} ({tokens.root})", file=sys.stderr)
+    cache = None if args.no_cache else ReportCache(Path(args.cache_dir), ttl=args.cache_ttl, today=today)
 
-    creds = load_credentials()
-    creds.refresh(Request())
-    report = build_report(creds.token, week_label, start, end)
+    if args.weeks > 1:
+        weeks = iso_weeks_ending(week_label, args.weeks)
+        reports = build_backfill(token, weeks, workers=args.workers, cache=cache)
+        out_dir = Path(args.out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for weekly in reports:
+            (out_dir / f"ga4-{weekly['week']}.json").write_text(
+                json.dumps(weekly, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+        (out_dir / "trend.csv").write_text(trend_csv(reports), encoding="utf-8")
+        if cache is not None:
+            print(f"cache {cache.hits} hit / {cache.misses} miss ({cache.root})", file=sys.stderr)
+        print(default_client().metrics_line(), file=sys.stderr)
+        print(f"ok {weeks[0][0]}..{weeks[-1][0]} ({len(reports)} weeks) -> {out_dir}", file=sys.stderr)
+        return 0
+
+    report = build_report(token, week_label, start, end, workers=args.workers, cache=cache)
+    if cache is not None:
+        print(f"cache {cache.hits} hit / {cache.misses} miss ({cache.root})", file=sys.stderr)
+    print(default_client().metrics_line(), file=sys.stderr)
 
     if args.out:
         out_path = Path(args.out)
@@ -367,7 +1035,7 @@ def main() -> int:
 
 if __name__ == "__main__":
     try:
-        raise SystemExit(main())
+        raise SystemExit(run_profiled(main))
     except Exception as exc:
         print(f"error: {exc}", file=sys.stderr)
         raise SystemExit(1)
@@ -0,0 +1,436 @@
+"""Keep-alive HTTP client shared by the telemetry scripts.
+
+Connections are pooled per scheme/host/port so repeated calls to the same
+API (GA4 Data API, Slack, Supabase REST) reuse one TLS session. Idempotent
+requests (GET/HEAD/OPTIONS/PUT/DELETE, or idempotent=True) are retried on
+429/5xx and dropped connections with full-jitter backoff (honouring a
+numeric Retry-After). Other requests (POST, PATCH) are resent only when the
+failure happened before the request was written, since a timeout or 5xx
+after that may follow a delivered request. Applies one default timeout and
+records per-request timings. Standard library only; environment proxies are
+not applied.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import random
+import select
+import socket
+import ssl
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_RETRY_AFTER = 60.0
+MAX_IDLE_PER_HOST = 8
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Raised when a pooled keep-alive connection was closed by the server.
+CONNECTION_ERRORS = (http.client.HTTPException, ConnectionError, socket.timeout, OSError)
+
+PoolKey = tuple[str, str, int]
+
+
+class _NotSent(ConnectionError):
+    """Connection failed before the request was written; safe to resend."""
+
+
+class HttpError(RuntimeError):
+    def __init__(self, status: int, body: bytes, url: str) -> None:
+        self.status = status
+        self.body = body
+        self.detail = body.decode("utf-8", errors="replace")
+        super().__init__(f"HTTP {status} {url}: {self.detail[:400]}")
+
+
+@dataclass(frozen=True)
+class Response:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+@dataclass(frozen=True)
+class Timing:
+    method: str
+    host: str
+    path: str
+    status: int | None
+    seconds: float
+    attempt: int
+    reused: bool
+
+
+class HttpClient:
+    def __init__(
+        self,
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_idle_per_host: int = MAX_IDLE_PER_HOST,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_idle_per_host = max_idle_per_host
+        self.sleep = sleep
+        self.timings: list[Timing] = []
+        self.connections_opened = 0
+        self._idle: dict[PoolKey, list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+
+    def _connect(self, key: PoolKey, timeout: float) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _checkout(self, key: PoolKey, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            return self._connect(key, timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            try:
+                # An idle socket is readable only when the server closed it (EOF).
+                dropped = bool(select.select([conn.sock], [], [], 0)[0])
+                conn.sock.settimeout(timeout)
+            except (OSError, ValueError):
+                dropped = True
+            if dropped:
+                conn.close()
+                return self._connect(key, timeout), False
+        return conn, True
+
+    def _checkin(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    def _exchange(
+        conn: http.client.HTTPConnection,
+        method: str,
+        target: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        try:
+            conn.request(method, target, body=body, headers=headers)
+        except CONNECTION_ERRORS as exc:
+            conn.close()
+            raise _NotSent(f"{type(exc).__name__}: {exc}") from exc
+        try:
+            raw = conn.getresponse()
+            return raw, raw.read()
+        except CONNECTION_ERRORS:
+            conn.close()
+            raise
+
+    def _send(
+        self,
+        key: PoolKey,
+        method: str,
+        target: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        timeout: float,
+        idempotent: bool,
+    ) -> tuple[Response, bool]:
+        """One exchange; a stale pooled connection is replaced once by a fresh one."""
+        conn, reused = self._checkout(key, timeout)
+        try:
+            raw, data = self._exchange(conn, method, target, body, headers)
+        except CONNECTION_ERRORS as exc:
+            if not reused or not (idempotent or isinstance(exc, _NotSent)):
+                raise
+            conn, reused = self._connect(key, timeout), False
+            raw, data = self._exchange(conn, method, target, body, headers)
+        response = Response(raw.status, {k.lower(): v for k, v in raw.getheaders()}, data)
+        if raw.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        return response, reused
+
+    def _delay(self, attempt: int, response: Response | None) -> float:
+        delay = random.uniform(0, self.backoff * (2**attempt))
+        retry_after = (response.headers.get("retry-after") or "").strip() if response else ""
+        if retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER))
+        return delay
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        json_body: Any = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+        retries: int | None = None,
+        idempotent: bool | None = None,
+    ) -> Response:
+        """Send a request; raises HttpError for a non-2xx final response.
+
+        idempotent defaults to the method's semantics; pass True for a POST
+        that is safe to repeat (e.g. a read-only query).
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url!r}")
+        key: PoolKey = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        send_headers = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            send_headers.setdefault("Content-Type", "application/json")
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(retries + 1):
+            started = time.perf_counter()
+            response: Response | None = None
+            reused = False
+            try:
+                response, reused = self._send(key, method, target, body, send_headers, timeout, idempotent)
+            except CONNECTION_ERRORS as exc:
+                self._record(method, key, parts.path, None, started, attempt, reused)
+                if attempt == retries or not (idempotent or isinstance(exc, _NotSent)):
+                    raise
+                self.sleep(self._delay(attempt, None))
+                continue
+            self._record(method, key, parts.path, response.status, started, attempt, reused)
+            if 200 <= response.status < 300:
+                return response
+            if response.status not in RETRYABLE_STATUS or attempt == retries or not idempotent:
+                raise HttpError(response.status, response.body, url)
+            self.sleep(self._delay(attempt, response))
+        raise AssertionError("unreachable")
+
+    def post_json(self, url: str, payload: Any, **kwargs: Any) -> Response:
+        return self.request("POST", url, json_body=payload, **kwargs)
+
+    def _record(
+        self,
+        method: str,
+        key: PoolKey,
+        path: str,
+        status: int | None,
+        started: float,
+        attempt: int,
+        reused: bool,
+    ) -> None:
+        timing = Timing(method, key[1], path, status, time.perf_counter() - started, attempt, reused)
+        with self._lock:
+            self.timings.append(timing)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            timings = list(self.timings)
+        seconds = [t.seconds for t in timings]
+        return {
+            "requests": len(timings),
+            "retries": sum(1 for t in timings if t.attempt > 0),
+            "connectionsOpened": self.connections_opened,
+            "reusedConnections": sum(1 for t in timings if t.reused),
+            "totalSeconds": round(sum(seconds), 3),
+            "maxSeconds": round(max(seconds), 3) if seconds else 0.0,
+        }
+
+    def metrics_line(self) -> str:
+        m = self.metrics()
+        return (
+            f"http {m['requests']} requests ({m['retries']} retries), "
+            f"{m['connectionsOpened']} connections, {m['reusedConnections']} reused, "
+            f"total {m['totalSeconds']}s, max {m['maxSeconds']}s"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+_default: HttpClient | None = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> HttpClient:
+    """Process-wide client so separate calls in one run share connections."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient()
+        return _default
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+    connections: set[int] = set()
+    slow_hits = 0
+
+    def do_POST(self) -> None:  # noqa: N802 (http.server API)
+        type(self).connections.add(id(self.connection))
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = self.rfile.read(length)
+        if self.path == "/slow":
+            # Delivered, but the answer comes after the client's timeout.
+            type(self).slow_hits += 1
+            time.sleep(0.3)
+            try:
+                self._reply(200, payload)
+            except BrokenPipeError:  # the client has given up
+                self.close_connection = True
+            return
+        if type(self).failures_left > 0:
+            type(self).failures_left -= 1
+            self._reply(503, b"busy", {"Retry-After": "0"})
+            return
+        if self.path == "/bad":
+            self._reply(400, b"bad request")
+            return
+        self._reply(200, payload)
+        if self.path == "/drop":
+            # Close without "Connection: close", like an idle keep-alive timeout.
+            self.close_connection = True
+
+    def _reply(self, status: int, data: bytes, extra: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def self_test() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    client = HttpClient(sleep=lambda _s: None)
+    try:
+        for i in range(3):
+            assert client.post_json(f"{base}/echo", {"n": i}).json() == {"n": i}
+        assert client.connections_opened == 1, client.connections_opened
+        assert len(_StubHandler.connections) == 1
+
+        _StubHandler.failures_left = 2
+        assert client.post_json(f"{base}/echo", {"retry": True}, idempotent=True).json() == {"retry": True}
+        assert client.metrics()["retries"] == 2
+
+        # POST is not idempotent: a 5xx or a timeout after sending is not retried.
+        _StubHandler.failures_left = 1
+        try:
+            client.post_json(f"{base}/echo", {})
+            raise AssertionError("expected HttpError")
+        except HttpError as exc:
+            assert exc.status == 503
+        assert client.metrics()["retries"] == 2
+        try:
+            client.post_json(f"{base}/slow", {}, timeout=0.1)
+            raise AssertionError("expected timeout")
+        except CONNECTION_ERRORS:
+            pass
+        assert _StubHandler.slow_hits == 1, _StubHandler.slow_hits
+        assert client.metrics()["retries"] == 2
+
+        # ...but a connection that fails before anything is written is.
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            closed_port = probe.getsockname()[1]
+        refused = HttpClient(sleep=lambda _s: None, retries=2)
+        try:
+            refused.post_json(f"http://127.0.0.1:{closed_port}/echo", {})
+            raise AssertionError("expected connection error")
+        except CONNECTION_ERRORS:
+            pass
+        assert refused.metrics()["requests"] == 3, refused.timings
+
+        try:
+            client.post_json(f"{base}/bad", {})
+            raise AssertionError("expected HttpError")
+        except HttpError as exc:
+            assert exc.status == 400 and exc.detail == "bad request"
+
+        _StubHandler.failures_left = 10
+        try:
+            client.post_json(f"{base}/echo", {}, retries=1, idempotent=True)
+            raise AssertionError("expected HttpError")
+        except HttpError as exc:
+            assert exc.status == 503
+        _StubHandler.failures_left = 0
+
+        # Server drops idle keep-alive sockets: the client reconnects transparently.
+        client.close()
+        client2 = HttpClient(sleep=lambda _s: None)
+        client2.post_json(f"{base}/drop", {})
+        assert client2.post_json(f"{base}/echo", {"again": 1}).json() == {"again": 1}
+        assert client2.metrics()["requests"] == 2, client2.timings
+        assert client2.connections_opened == 2
+        client2.close()
+        assert "requests" in client.metrics_line()
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    print("self-test ok")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Shared telemetry HTTP client")
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args()
+    if args.self_test:
+        self_test()
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        raise SystemExit(1)
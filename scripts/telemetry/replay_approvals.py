@@ -0,0 +1,247 @@
+"""Replay archived #fa-telemetry Slack threads through the approval rules.
+
+Input: Slack message exports as JSON Lines (one message object per line;
+directories are expanded to *.jsonl). Messages are filtered the same way
+as api/telemetry-approve.ts (no bots/subtypes, other channel, or
+top-level posts), and every reply that parses as a command is classified
+in timestamp order with the message time as "now". The thread's week comes
+from the Facts root post ("id: telemetry-notify 2026-W34"), giving the
+branch telemetry/<week>.
+
+Slack does not record PR files or state; pass --files-json / --pr-state
+for the whole replay, or enrich lines with "branch", "files", "pr_state".
+
+Outputs one decision per command (JSON Lines, --out or stdout) and
+per-week action counts on stderr (--summary writes them as JSON). Files
+are replayed in parallel (--jobs).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from approve_command import (
+    ALLOWLIST_PATH,
+    APPROVERS_PATH,
+    CHANNEL_ID,
+    TEST_APPROVERS,
+    TEST_FILES,
+    TEST_REVIEW_TIME,
+    RuleEngine,
+    parse_command,
+)
+
+ROOT_WEEK_RE = re.compile(r"telemetry-notify (\d{4}-W\d{2})")
+
+Summary = dict[str, Counter[str]]
+
+
+def iter_messages(path: Path) -> Iterator[dict[str, Any]]:
+    with path.open(encoding="utf-8") as handle:
+        for lineno, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{lineno}: {exc}") from exc
+            if isinstance(message, dict):
+                yield message
+
+
+def collect_commands(path: Path) -> tuple[list[dict[str, Any]], dict[str, str], int]:
+    """Stream one archive; returns (command messages, thread_ts -> week, ignored count)."""
+    commands: list[dict[str, Any]] = []
+    thread_weeks: dict[str, str] = {}
+    ignored = 0
+    for message in iter_messages(path):
+        ts = str(message.get("ts") or "")
+        text = str(message.get("text") or "")
+        week_match = ROOT_WEEK_RE.search(text)
+        if week_match and ts and message.get("thread_ts", ts) == ts:
+            thread_weeks[ts] = week_match.group(1)
+        channel = message.get("channel")
+        if (
+            message.get("bot_id")
+            or message.get("subtype")
+            or (channel and channel != CHANNEL_ID)
+            or not message.get("thread_ts")
+            or message.get("thread_ts") == ts
+            or not message.get("user")
+            or not ts
+            or parse_command(text) is None
+        ):
+            ignored += 1
+            continue
+        commands.append(message)
+    commands.sort(key=lambda m: float(m["ts"]))
+    return commands, thread_weeks, ignored
+
+
+def replay_file(
+    path: Path, engine: RuleEngine, defaults: dict[str, Any]
+) -> tuple[list[dict[str, Any]], Summary, int]:
+    commands, thread_weeks, ignored = collect_commands(path)
+    decisions: list[dict[str, Any]] = []
+    summary: Summary = {}
+    for message in commands:
+        thread_ts = str(message["thread_ts"])
+        thread_week = thread_weeks.get(thread_ts)
+        branch = message.get("branch") or (f"telemetry/{thread_week}" if thread_week else "")
+        result = engine.classify(
+            command=str(message["text"]),
+            now=datetime.fromtimestamp(float(message["ts"]), tz=timezone.utc),
+            slack_user=str(message["user"]),
+            branch=str(branch),
+            files=message.get("files", defaults["files"]),
+            pr_state=str(message.get("pr_state", defaults["pr_state"])),
+        )
+        week = result["week"] or thread_week or "unknown"
+        summary.setdefault(week, Counter())[result["action"]] += 1
+        decisions.append(
+            {"file": path.name, "ts": message["ts"], "thread_ts": thread_ts, "user": message["user"], **result}
+        )
+    return decisions, summary, ignored
+
+
+def resolve_paths(inputs: list[str]) -> list[Path]:
+    paths: list[Path] = []
+    for item in inputs:
+        p = Path(item)
+        paths.extend(sorted(p.glob("*.jsonl")) if p.is_dir() else [p])
+    return paths
+
+
+def replay(
+    paths: list[Path], engine: RuleEngine, defaults: dict[str, Any], jobs: int = 1
+) -> tuple[list[dict[str, Any]], Summary, int]:
+    """Replay every archive (in parallel when jobs > 1); decisions keep input file order."""
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            parts = list(pool.map(replay_file, paths, [engine] * len(paths), [defaults] * len(paths)))
+    else:
+        parts = [replay_file(path, engine, defaults) for path in paths]
+    decisions: list[dict[str, Any]] = []
+    summary: Summary = {}
+    ignored = 0
+    for part_decisions, part_summary, part_ignored in parts:
+        decisions.extend(part_decisions)
+        for week, counts in part_summary.items():
+            summary.setdefault(week, Counter()).update(counts)
+        ignored += part_ignored
+    return decisions, summary, ignored
+
+
+def format_summary(summary: Summary, ignored: int) -> str:
+    lines = []
+    for week in sorted(summary):
+        counts = summary[week]
+        detail = ", ".join(f"{action} {n}" for action, n in sorted(counts.items()))
+        lines.append(f"{week}: {sum(counts.values())} commands ({detail})")
+    total = sum(sum(c.values()) for c in summary.values())
+    lines.append(f"total {total} commands, {ignored} other messages ignored")
+    return "\n".join(lines)
+
+
+def self_test() -> None:
+    user = TEST_APPROVERS["slack"][0]
+    review = TEST_REVIEW_TIME.timestamp()
+    root_ts = f"{review - 3600:.6f}"
+
+    def msg(offset: float, text: str, **extra: Any) -> dict[str, Any]:
+        return {"ts": f"{review + offset:.6f}", "thread_ts": root_ts, "user": user, "text": text, **extra}
+
+    thread_a = [
+        {"ts": root_ts, "bot_id": "B1", "text": "*週次テレメトリ*\nid: telemetry-notify 2026-W34"},
+        msg(30, "APPROVE-DOC"),
+        msg(10, "HOLD"),
+        msg(20, "looks good"),
+        msg(40, "APPROVE T-03"),
+        msg(50, "APPROVE-DOC", user="U092F515HNG"),
+        msg(60, "APPROVE-DOC", subtype="message_changed"),
+        msg(7 * 86400, "APPROVE-DOC"),
+    ]
+    thread_b = [msg(0, "SKIP T-01", thread_ts="1.0"), msg(5, "HOLD", channel="C000OTHER")]
+    engine = RuleEngine.from_config(TEST_APPROVERS, set())
+    defaults = {"files": TEST_FILES, "pr_state": "OPEN"}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, rows in (("a.jsonl", thread_a), ("b.jsonl", thread_b)):
+            (Path(tmp) / name).write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+        paths = resolve_paths([tmp])
+        decisions, summary, ignored = replay(paths, engine, defaults, jobs=2)
+        sequential = replay(paths, engine, defaults, jobs=1)
+    assert (decisions, summary, ignored) == sequential
+    actions = [(d["file"], d["command"], d["action"]) for d in decisions]
+    assert actions == [
+        ("a.jsonl", "HOLD", "record_hold"),
+        ("a.jsonl", "APPROVE-DOC", "merge_doc"),
+        ("a.jsonl", "APPROVE T-03", "l1_denied"),
+        ("a.jsonl", "APPROVE-DOC", "refuse"),
+        ("a.jsonl", "APPROVE-DOC", "stale"),
+        ("b.jsonl", "SKIP T-01", "record_skip"),
+    ], actions
+    assert summary["2026-W34"] == Counter(record_hold=1, merge_doc=1, l1_denied=1, refuse=1, stale=1), summary
+    assert summary["unknown"] == Counter(record_skip=1)
+    assert ignored == 4, ignored  # root post, chatter, edit, other channel
+    assert "2026-W34: 5 commands" in format_summary(summary, ignored)
+    print("self-test ok")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay archived Slack approval threads through approve_command")
+    parser.add_argument("archives", nargs="*", help="Slack message JSONL files or directories of *.jsonl")
+    parser.add_argument("--out", help="Write decisions as JSON Lines (default stdout)")
+    parser.add_argument("--summary", help="Write per-week action counts as JSON")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel files (1 = sequential)")
+    parser.add_argument("--files-json", default="[]", help="PR files assumed for every APPROVE-DOC")
+    parser.add_argument("--pr-state", default="", help="PR state assumed for every APPROVE-DOC")
+    parser.add_argument("--approvers", default=str(APPROVERS_PATH))
+    parser.add_argument("--allowlist", default=str(ALLOWLIST_PATH))
+    parser.add_argument("--self-test", action="store_true")
+    args = parser.parse_args()
+
+    if args.self_test:
+        self_test()
+        return 0
+    if not args.archives:
+        raise SystemExit("need archive paths or --self-test")
+
+    files = json.loads(args.files_json)
+    if not isinstance(files, list) or not all(isinstance(x, str) for x in files):
+        raise SystemExit("--files-json must be a JSON array of strings")
+    engine = RuleEngine.load(Path(args.approvers), Path(args.allowlist))
+    paths = resolve_paths(args.archives)
+    decisions, summary, ignored = replay(paths, engine, {"files": files, "pr_state": args.pr_state}, jobs=args.jobs)
+
+    lines = "".join(json.dumps(d, ensure_ascii=False) + "\n" for d in decisions)
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(lines, encoding="utf-8")
+    else:
+        sys.stdout.write(lines)
+    if args.summary:
+        Path(args.summary).write_text(
+            json.dumps({week: dict(c) for week, c in sorted(summary.items())}, ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+    print(format_summary(summary, ignored), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except Exception as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        raise SystemExit(1)
@@ -2,18 +2,31 @@
 """
 public 以下の PNG の白〜薄灰背景をアルファ透過（再実行可）。
 例: python scripts/transparent_public_png.py F2favicon.png airplane.png
-Pillow 必須: pip install Pillow
+    python scripts/transparent_public_png.py --dir public/images --jobs 4
+    python scripts/transparent_public_png.py --bench F2icon.png
+Pillow 必須: pip install Pillow（NumPy があれば配列演算で一括処理、無ければ画素ループ）
 """
 from __future__ import annotations
 
-import sys
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List
 
 try:
     from PIL import Image
 except ImportError:
     raise SystemExit("Pillow が必要です: pip install Pillow") from None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+
 
 def should_be_transparent(r: int, g: int, b: int) -> bool:
     mx = max(r, g, b)
@@ -29,10 +42,22 @@ def should_be_transparent(r: int, g: int, b: int) -> bool:
     return False
 
 
-def process_file(path: Path) -> None:
-    if not path.is_file():
-        raise SystemExit(f"見つかりません: {path}")
-    img = Image.open(path).convert("RGBA")
+def transparent_mask(rgb: "np.ndarray") -> "np.ndarray":
+    """should_be_transparent の配列版。rgb は (h, w, 3) uint8、戻り値は (h, w) bool。"""
+    rgb = rgb.astype(np.int32)
+    mx = rgb.max(axis=2)
+    mn = rgb.min(axis=2)
+    # 明度は r+g+b の整数和で比較（light >= 232 ⇔ total >= 696 等、float 誤差なし）
+    total = rgb.sum(axis=2)
+    sat = np.zeros(mx.shape, dtype=np.float64)
+    np.divide(mx - mn, mx, out=sat, where=mx > 0)
+    white = (total >= 696) & (sat <= 0.18)
+    gray = (total >= 300) & (total <= 714) & (sat <= 0.14)
+    return white | gray
+
+
+def apply_transparency_loop(img: Image.Image) -> Image.Image:
+    img = img.convert("RGBA")
     px = img.load()
     w, h = img.size
     for y in range(h):
@@ -40,16 +65,81 @@ def process_file(path: Path) -> None:
             r, g, b, a = px[x, y]
             if should_be_transparent(r, g, b):
                 px[x, y] = (r, g, b, 0)
+    return img
+
+
+def apply_transparency(img: Image.Image) -> Image.Image:
+    """背景画素の alpha を 0 にした RGBA 画像を返す（RGB は変更しない）。"""
+    if np is None:
+        return apply_transparency_loop(img)
+    arr = np.array(img.convert("RGBA"))
+    arr[..., 3][transparent_mask(arr[..., :3])] = 0
+    return Image.fromarray(arr, "RGBA")
+
+
+def process_file(path: Path) -> None:
+    if not path.is_file():
+        raise SystemExit(f"見つかりません: {path}")
+    with Image.open(path) as src:
+        img = apply_transparency(src)
     img.save(path, "PNG", optimize=True)
     print(f"OK: {path}")
 
 
+def process_many(paths: List[Path], jobs: int) -> None:
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            process_file(path)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        # list() で例外を呼び出し側へ伝播させる
+        list(pool.map(process_file, paths))
+
+
+def bench(paths: List[Path], repeat: int) -> None:
+    """画素ループと配列版の所要時間を比較し、出力一致を確認する（ファイルは書き換えない）。"""
+    if np is None:
+        raise SystemExit("--bench には NumPy が必要です: pip install numpy")
+    for path in paths:
+        with Image.open(path) as src:
+            src.load()
+            timings = {}
+            results = {}
+            for name, fn in (("loop", apply_transparency_loop), ("numpy", apply_transparency)):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    results[name] = fn(src.copy())
+                timings[name] = (time.perf_counter() - start) / repeat
+        same = results["loop"].tobytes() == results["numpy"].tobytes()
+        w, h = results["numpy"].size
+        print(
+            f"{path.name} {w}x{h}: loop {timings['loop'] * 1000:.1f}ms, "
+            f"numpy {timings['numpy'] * 1000:.1f}ms "
+            f"(x{timings['loop'] / max(timings['numpy'], 1e-9):.1f}) identical={same}"
+        )
+        if not same:
+            raise SystemExit(f"出力が一致しません: {path}")
+
+
 def main() -> None:
-    root = Path(__file__).resolve().parent.parent
-    public = root / "public"
-    names = sys.argv[1:] if len(sys.argv) > 1 else ["F2favicon.png", "airplane.png"]
-    for name in names:
-        process_file(public / name)
+    parser = argparse.ArgumentParser(description="PNG の白〜薄灰背景をアルファ透過")
+    parser.add_argument("names", nargs="*", help="public/ からの相対パス（既定: F2favicon.png airplane.png）")
+    parser.add_argument("--dir", help="このディレクトリ直下の *.png を一括処理")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="並列プロセス数（1=逐次）")
+    parser.add_argument("--bench", action="store_true", help="ループ版との速度比較と出力一致確認のみ")
+    parser.add_argument("--repeat", type=int, default=3, help="--bench の反復回数")
+    args = parser.parse_args()
+
+    if args.dir:
+        paths = sorted(Path(args.dir).glob("*.png"))
+    else:
+        names = args.names or ["F2favicon.png", "airplane.png"]
+        paths = [PUBLIC_DIR / name for name in names]
+
+    if args.bench:
+        bench(paths, args.repeat)
+        return
+    process_many(paths, args.jobs)
 
 
 if __name__ == "__main__":